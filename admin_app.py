@@ -1,6 +1,7 @@
 # admin_app.py
 import streamlit as st
 import requests
+from services import http_transport
 from database import db_handler
 import json
 from pathlib import Path
@@ -8,6 +9,9 @@ from crm_components import render_crm_article_list, render_crm_snapshot_list
 from compact_article_view import render_compact_article_list
 from apple_article_view import render_apple_article_view
 
+# Keep-alive session shared by every call to the API
+api_session = http_transport.get_session("api")
+
 # --- Page Config ---
 st.set_page_config(page_title="The Lowdown Admin", layout="wide")
 
@@ -72,17 +76,51 @@ API_URL = "http://127.0.0.1:8003"
 
 # --- Note: Using Railway API, no local DB needed ---
 
+def sync_collection(name):
+    """
+    Keeps a local copy of /articles or /snapshots in session state and brings
+    it up to date from the /{name}/changes feed, so a rerun only transfers the
+    rows that changed. Returns the active rows in list order with ranks.
+    """
+    cache = st.session_state.setdefault("collection_cache", {})
+    state = cache.get(name, {"revision": 0, "items": {}})
+    response = api_session.get(f"{API_URL}/{name}/changes", params={"since": state["revision"]})
+    response.raise_for_status()
+    delta = response.json()
+
+    items = {} if delta["full_resync"] else dict(state["items"])
+    for item in delta["changes"]:
+        if item.get("status") == "archived":
+            items.pop(item["id"], None)
+        else:
+            items[item["id"]] = item
+    for item_id in delta["deleted"]:
+        items.pop(item_id, None)
+    cache[name] = {"revision": delta["revision"], "items": items}
+
+    # Same order as the API: positionless rows first, then (position, id).
+    ordered = sorted(items.values(), key=lambda i: (i.get("position") is not None, i.get("position") or 0, i["id"]))
+    for rank, item in enumerate(ordered, start=1):
+        item["rank"] = rank
+    return ordered
+
 # Function to fetch articles from Railway API
 def fetch_articles_from_api():
     """Fetch articles from Railway API instead of local database"""
     try:
-        response = requests.get(f"{API_URL}/articles")
-        response.raise_for_status()
-        return response.json()
+        return sync_collection("articles")
     except requests.exceptions.RequestException as e:
         st.error(f"Failed to fetch articles from Railway: {e}")
         return []
 
+def fetch_snapshots_from_api():
+    """Fetch snapshots from the backend API"""
+    try:
+        return sync_collection("snapshots")
+    except requests.exceptions.RequestException as e:
+        st.error(f"Failed to fetch snapshots: {e}")
+        return []
+
 # --- Styling ---
 st.markdown("""<style>
 html, body, [class*="st-"], [class*="css-"] { font-family: 'Helvetica', 'Arial', sans-serif; }
@@ -106,21 +144,16 @@ def move_article(article_id, direction):
     except ValueError:
         return # Article not in the list
 
-    # Determine the new index
+    # Determine the new 1-based rank
     if direction == 'up' and current_index > 0:
-        new_index = current_index - 1
-        # Swap with the article above
-        ordered_ids[current_index], ordered_ids[new_index] = ordered_ids[new_index], ordered_ids[current_index]
+        new_rank = current_index
     elif direction == 'down' and current_index < len(ordered_ids) - 1:
-        new_index = current_index + 1
-        # Swap with the article below
-        ordered_ids[current_index], ordered_ids[new_index] = ordered_ids[new_index], ordered_ids[current_index]
+        new_rank = current_index + 2
     else:
         return # Can't move further
 
-    # Update the position for all articles based on the new order
-    for index, an_id in enumerate(ordered_ids):
-        db_handler.update_article(an_id, position=index)
+    # Positions are sparse, so only the moved article is rewritten
+    db_handler.update_article_position(article_id, new_rank)
     st.rerun()
 
 # --- Military-Themed Header ---
@@ -159,18 +192,16 @@ with col_import:
         if urls:
             success_count = 0
             with st.spinner(f"Importing {len(urls)} articles..."):
-                for url in urls:
-                    try:
-                        response = requests.post(f"{API_URL}/articles", json={"url": url, "title": url, "source": "manual_add"})
-                        response.raise_for_status()
-                        success_count += 1
-                    except requests.exceptions.HTTPError as e:
-                        if e.response.status_code == 409:
-                            st.toast(f"Article already exists: {url.split('/')[-1][:30]}...", icon="⚠️")
-                        else:
-                            st.error(f"Failed to add {url}: {e}")
-                    except requests.exceptions.RequestException as e:
-                        st.error(f"Failed to add {url}: {e}")
+                try:
+                    response = api_session.post(f"{API_URL}/articles/bulk", json={"urls": urls, "source": "manual_add"})
+                    response.raise_for_status()
+                    imported = response.json()
+                    success_count = imported["created"] + imported["unarchived"]
+                    for result in imported["results"]:
+                        if result["status"] in ("conflict", "duplicate"):
+                            st.toast(f"Article already exists: {result['url'].split('/')[-1][:30]}...", icon="⚠️")
+                except requests.exceptions.RequestException as e:
+                    st.error(f"Failed to import articles: {e}")
             
             if success_count > 0:
                 st.toast(f"✅ Successfully imported {success_count} article(s)!", icon="✅")
@@ -188,14 +219,13 @@ with col_admin:
                 
                 if accepted_articles:
                     success_count = 0
-                    for article in accepted_articles:
-                        try:
-                            response = requests.patch(f"{API_URL}/articles/{article['id']}", 
-                                                    json={"status": "archived"})
-                            if response.status_code == 200:
-                                success_count += 1
-                        except Exception as e:
-                            st.error(f"Failed to archive article {article['id']}: {e}")
+                    try:
+                        response = api_session.patch(f"{API_URL}/articles/status", 
+                                                json={"ids": [a['id'] for a in accepted_articles], "status": "archived"})
+                        if response.status_code == 200:
+                            success_count = response.json()["updated"]
+                    except Exception as e:
+                        st.error(f"Failed to archive articles: {e}")
                     
                     if success_count > 0:
                         st.toast(f"✅ Successfully archived {success_count} article(s)!", icon="✅")
@@ -206,9 +236,11 @@ with col_admin:
     with col_admin2:
         if st.button("🔄 Summarize", help="Summarize all pending articles", use_container_width=True):
             try:
-                response = requests.post(f"{API_URL}/batch-summarize")
-                if response.status_code == 200:
-                    st.toast("✅ Batch summarization started!", icon="✅")
+                response = api_session.post(f"{API_URL}/batch-summarize")
+                if response.status_code == 202:
+                    job = response.json()
+                    st.session_state.summarize_job_id = job["id"]
+                    st.toast(f"✅ Queued {job['total']} article(s) for summarization (job #{job['id']})", icon="✅")
                     st.rerun()
                 else:
                     st.error("Failed to start batch summarization")
@@ -219,6 +251,18 @@ with col_admin:
         if st.button("📊 Refresh", help="Refresh article data", use_container_width=True):
             st.rerun()
     
+    # Progress of the last queued summarize job
+    if st.session_state.get("summarize_job_id"):
+        try:
+            job = api_session.get(f"{API_URL}/jobs/{st.session_state.summarize_job_id}").json()
+            counts = job["counts"]
+            st.progress(job["progress"], text=f"Summarize job #{job['id']}: {counts['done']} done, "
+                                              f"{counts['failed']} failed, {counts['queued'] + counts['running']} remaining")
+            if job["status"] in ("completed", "partial", "failed"):
+                del st.session_state.summarize_job_id
+        except (requests.exceptions.RequestException, KeyError):
+            del st.session_state.summarize_job_id
+    
 # Article Order section moved to bottom of page
 
 # --- Session State Initialization ---
@@ -260,7 +304,6 @@ with tab1:
     """, unsafe_allow_html=True)
     
     # Apple-Inspired Article Management Interface (Full Width)
-    articles = fetch_articles_from_api()
     render_apple_article_view(articles, API_URL)
     
     # Article Order Section - At Bottom
@@ -272,8 +315,8 @@ with tab1:
     if summarized_articles:
         st.markdown(f"**{len(summarized_articles)} articles ready for export**")
         
-        # Sort by position for display
-        sorted_articles = sorted(summarized_articles, key=lambda x: x.get('position', 999))
+        # Sort by rank for display
+        sorted_articles = sorted(summarized_articles, key=lambda x: x.get('rank', 999))
         
         # Enhanced article order display with grouped controls (Apple UI principles)
         for i, article in enumerate(sorted_articles[:10]):  # Show top 10
@@ -285,9 +328,9 @@ with tab1:
                 with subcol1:
                     if i > 0 and st.button("↑", key=f"bottom_up_{article['id']}", help="Move Up"):
                         try:
-                            current_position = article.get('position', i + 1)
-                            new_position = current_position - 1
-                            response = requests.patch(f"{API_URL}/articles/{article['id']}/position", 
+                            current_rank = article.get('rank', i + 1)
+                            new_position = current_rank - 1
+                            response = api_session.patch(f"{API_URL}/articles/{article['id']}/position", 
                                                     json={"item_id": article['id'], "new_position": new_position})
                             if response.status_code == 200:
                                 st.rerun()
@@ -296,9 +339,9 @@ with tab1:
                 with subcol2:
                     if i < len(sorted_articles) - 1 and st.button("↓", key=f"bottom_down_{article['id']}", help="Move Down"):
                         try:
-                            current_position = article.get('position', i + 1)
-                            new_position = current_position + 1
-                            response = requests.patch(f"{API_URL}/articles/{article['id']}/position", 
+                            current_rank = article.get('rank', i + 1)
+                            new_position = current_rank + 1
+                            response = api_session.patch(f"{API_URL}/articles/{article['id']}/position", 
                                                     json={"item_id": article['id'], "new_position": new_position})
                             if response.status_code == 200:
                                 st.rerun()
@@ -343,16 +386,6 @@ with tab2:
     st.markdown("<div class='military-header'>📸 SNAPSHOT COMMAND CENTER</div>", unsafe_allow_html=True)
     st.markdown("Create concise 1-sentence highlights for quick scanning. Perfect for rapid news consumption.")
     
-    def fetch_snapshots_from_api():
-        """Fetch snapshots from the backend API"""
-        try:
-            response = requests.get(f"{API_URL}/snapshots")
-            response.raise_for_status()
-            return response.json()
-        except requests.exceptions.RequestException as e:
-            st.error(f"Failed to fetch snapshots: {e}")
-            return []
-    
     # Input section in sidebar-style layout
     col1, col2 = st.columns([1, 3])
 
@@ -370,18 +403,16 @@ with tab2:
                 if urls:
                     success_count = 0
                     with st.spinner(f"Importing {len(urls)} snapshots..."):
-                        for url in urls:
-                            try:
-                                response = requests.post(f"{API_URL}/snapshots", json={"url": url, "source": "manual_add"})
-                                response.raise_for_status()
-                                success_count += 1
-                            except requests.exceptions.HTTPError as e:
-                                if e.response.status_code == 409:
-                                    st.toast(f"Snapshot already exists: {url.split('/')[-1][:30]}...", icon="⚠️")
-                                else:
-                                    st.error(f"Failed to add {url}: {e}")
-                            except requests.exceptions.RequestException as e:
-                                st.error(f"Failed to add {url}: {e}")
+                        try:
+                            response = api_session.post(f"{API_URL}/snapshots/bulk", json={"urls": urls, "source": "manual_add"})
+                            response.raise_for_status()
+                            imported = response.json()
+                            success_count = imported["created"] + imported["unarchived"]
+                            for result in imported["results"]:
+                                if result["status"] in ("conflict", "duplicate"):
+                                    st.toast(f"Snapshot already exists: {result['url'].split('/')[-1][:30]}...", icon="⚠️")
+                        except requests.exceptions.RequestException as e:
+                            st.error(f"Failed to import snapshots: {e}")
                     
                     if success_count > 0:
                         st.toast(f"✅ Successfully imported {success_count} snapshot(s)!", icon="✅")
@@ -395,16 +426,13 @@ with tab2:
             if not pending_snapshots:
                 st.toast("No pending snapshots to highlight.", icon="👍")
             else:
-                progress_bar = st.progress(0, text="Processing snapshots...")
-                for i, snapshot in enumerate(pending_snapshots):
-                    try:
-                        requests.post(f"{API_URL}/highlight", json={"snapshot_id": snapshot['id']})
-                    except Exception as e:
-                        # Update status to failed if highlighting fails
-                        pass
-                    progress_bar.progress((i + 1) / len(pending_snapshots), text=f"Processed {i+1}/{len(pending_snapshots)}")
-                st.success("✅ Batch highlighting complete!")
-                st.rerun()
+                try:
+                    response = api_session.post(f"{API_URL}/batch-highlight", json={"snapshot_ids": [s['id'] for s in pending_snapshots]})
+                    response.raise_for_status()
+                    job = response.json()
+                    st.success(f"✅ Queued {job['total']} snapshot(s) for highlighting (job #{job['id']}). Refresh to see results.")
+                except requests.exceptions.RequestException as e:
+                    st.error(f"Failed to queue highlighting: {e}")
 
     with col2:
         # CRM-style snapshot list
@@ -440,13 +468,12 @@ with tab2:
                 
                 # Archive button for accepted snapshots
                 if st.button("📦 Archive All Accepted Snapshots", type="secondary", key="snapshot_archive_btn"):
-                    for snapshot in accepted_snapshots:
-                        try:
-                            response = requests.patch(f"{API_URL}/snapshots/{snapshot['id']}", json={"status": "archived"})
-                            if response.status_code == 200:
-                                st.success(f"📦 Archived snapshot #{snapshot['id']}")
-                        except requests.exceptions.RequestException as e:
-                            st.error(f"❌ Error archiving snapshot #{snapshot['id']}: {e}")
+                    try:
+                        response = api_session.patch(f"{API_URL}/snapshots/status", json={"ids": [s['id'] for s in accepted_snapshots], "status": "archived"})
+                        if response.status_code == 200:
+                            st.success(f"📦 Archived {response.json()['updated']} snapshot(s)")
+                    except requests.exceptions.RequestException as e:
+                        st.error(f"❌ Error archiving snapshots: {e}")
                     st.toast("Snapshots archived!", icon="📦")
                     st.rerun()
             else:
@@ -565,7 +592,7 @@ with tab3:
                 with st.spinner(f"Researching {threat_to_research}..."):
                     try:
                         # Call the threat research endpoint
-                        response = requests.post(
+                        response = api_session.post(
                             f"{API_URL}/research-threat",
                             json={"threat_name": threat_to_research},
                             timeout=60
@@ -670,18 +697,11 @@ with tab4:
     
     # Get accepted content counts
     try:
-        articles_response = requests.get(f"{API_URL}/articles")
-        snapshots_response = requests.get(f"{API_URL}/snapshots")
+        all_articles = fetch_articles_from_api()
+        all_snapshots = fetch_snapshots_from_api()
         
-        if articles_response.status_code == 200 and snapshots_response.status_code == 200:
-            all_articles = articles_response.json()
-            all_snapshots = snapshots_response.json()
-            
-            accepted_articles = [a for a in all_articles if a['status'] == 'accepted']
-            accepted_snapshots = [s for s in all_snapshots if s['status'] == 'accepted']
-        else:
-            accepted_articles = []
-            accepted_snapshots = []
+        accepted_articles = [a for a in all_articles if a['status'] == 'accepted']
+        accepted_snapshots = [s for s in all_snapshots if s['status'] == 'accepted']
     except requests.exceptions.RequestException:
         accepted_articles = []
         accepted_snapshots = []
@@ -726,26 +746,44 @@ with tab4:
             index=0,
             help="Choose the tone and style for your teleprompter script"
         )
+        regenerate = st.checkbox("🔁 Regenerate", value=False,
+                                 help="Write a new script even if one was already generated for this content")
         
         # Generate script button
         if st.button("🎤 Generate Teleprompter Script", type="primary"):
             with st.spinner("🤖 AI is generating your teleprompter script..."):
                 try:
-                    # Call the Fork API
-                    response = requests.post(
-                        f"{API_URL}/generate-teleprompter",
+                    # Stream the script from the API so it appears as it is written
+                    response = api_session.post(
+                        f"{API_URL}/generate-teleprompter/stream",
                         json={
                             "include_intro": include_intro,
                             "include_outro": include_outro,
                             "host_name": host_name,
                             "show_name": show_name,
-                            "style": style
+                            "style": style,
+                            "refresh": regenerate
                         },
+                        stream=True,
                         timeout=120
                     )
                     
                     if response.status_code == 200:
-                        script_data = response.json()
+                        script_data = {"success": False, "error": "The script stream ended early"}
+
+                        def script_deltas():
+                            for event, data in http_transport.iter_sse(response):
+                                if event == "delta":
+                                    yield data["text"]
+                                elif event == "done":
+                                    script_data.update(data)
+                                elif event == "error":
+                                    script_data["error"] = data["detail"]
+
+                        live_script = st.empty()
+                        with live_script.container(height=600):
+                            st.write_stream(script_deltas())
+                        live_script.empty()
                         
                         if script_data["success"]:
                             # Display script metrics
@@ -856,12 +894,8 @@ with tab5:
         
         # Get accepted snapshots for export
         try:
-            snapshots_response = requests.get(f"{API_URL}/snapshots")
-            if snapshots_response.status_code == 200:
-                all_snapshots = snapshots_response.json()
-                accepted_snapshots = [s for s in all_snapshots if s['status'] == 'accepted']
-            else:
-                accepted_snapshots = []
+            all_snapshots = fetch_snapshots_from_api()
+            accepted_snapshots = [s for s in all_snapshots if s['status'] == 'accepted']
         except requests.exceptions.RequestException:
             accepted_snapshots = []
         
@@ -887,13 +921,12 @@ with tab5:
                 
                 # Archive button for accepted snapshots
                 if st.button("📦 Archive All Accepted Snapshots", type="secondary", key="export_archive_btn"):
-                    for snapshot in accepted_snapshots:
-                        try:
-                            response = requests.patch(f"{API_URL}/snapshots/{snapshot['id']}", json={"status": "archived"})
-                            if response.status_code == 200:
-                                st.success(f"📦 Archived snapshot #{snapshot['id']}")
-                        except requests.exceptions.RequestException as e:
-                            st.error(f"❌ Error archiving snapshot #{snapshot['id']}: {e}")
+                    try:
+                        response = api_session.patch(f"{API_URL}/snapshots/status", json={"ids": [s['id'] for s in accepted_snapshots], "status": "archived"})
+                        if response.status_code == 200:
+                            st.success(f"📦 Archived {response.json()['updated']} snapshot(s)")
+                    except requests.exceptions.RequestException as e:
+                        st.error(f"❌ Error archiving snapshots: {e}")
                     st.toast("Snapshots archived!", icon="📦")
                     st.rerun()
             else:
@@ -3,8 +3,14 @@
 
 import streamlit as st
 import requests
+from services import http_transport
 from typing import List, Dict, Any
 import json
+from article_search import search_article_ids
+
+# Keep-alive session shared by every call to the API
+api_session = http_transport.get_session("api")
+
 
 def render_apple_article_view(articles: List[Dict[str, Any]], api_url: str):
     """
@@ -357,15 +363,12 @@ def render_apple_main_content(articles: List[Dict[str, Any]], api_url: str):
         key="search_input"
     )
     
-    # Apply search filter
+    # Apply search filter (server-side full-text search, ranked by relevance)
     filtered_articles = articles
     if search_query:
-        filtered_articles = [
-            article for article in articles
-            if (search_query.lower() in article.get('title', '').lower() or
-                search_query.lower() in article.get('summary', '').lower() or
-                search_query.lower() in article.get('source', '').lower())
-        ]
+        matching_ids = search_article_ids(search_query, api_url)
+        articles_by_id = {article['id']: article for article in articles}
+        filtered_articles = [articles_by_id[i] for i in matching_ids if i in articles_by_id]
     
     # Bulk actions toolbar (if articles are selected)
     if st.session_state.selected_articles:
@@ -452,7 +455,7 @@ def render_article_rows(articles: List[Dict[str, Any]], api_url: str):
             
             with col2:
                 # Position number
-                st.markdown(f'<div class="apple-position">{article.get("position", i+1)}</div>', 
+                st.markdown(f'<div class="apple-position">{article.get("rank", i+1)}</div>', 
                            unsafe_allow_html=True)
             
             with col3:
@@ -506,7 +509,7 @@ def render_article_edit_modal(article: Dict[str, Any], api_url: str):
     # Compact header with close button
     col_header, col_close = st.columns([4, 1])
     with col_header:
-        st.markdown(f"**✏️ Edit Article #{article.get('position', 'N/A')}**")
+        st.markdown(f"**✏️ Edit Article #{article.get('rank', 'N/A')}**")
     with col_close:
         if st.button("❌", key=f"close_{article['id']}", help="Close edit modal"):
             # Clear the edit state
@@ -657,7 +660,7 @@ def render_article_edit_modal(article: Dict[str, Any], api_url: str):
     if action_taken == 'resummarize':
         # Trigger AI re-summarization
         try:
-            response = requests.post(f"{api_url}/articles/{article['id']}/resummarize")
+            response = api_session.post(f"{api_url}/articles/{article['id']}/resummarize")
             if response.status_code == 200:
                 st.success("🤖 AI is re-summarizing the article...")
                 st.info("Refresh the page in a few moments to see the new summary.")
@@ -689,7 +692,7 @@ def render_article_edit_modal(article: Dict[str, Any], api_url: str):
             if st.button("🤖 Summarize Manual Content", type="primary"):
                 try:
                     # Send manual content for summarization
-                    response = requests.post(f"{api_url}/articles/{article['id']}/summarize-manual", 
+                    response = api_session.post(f"{api_url}/articles/{article['id']}/summarize-manual", 
                                            json={"content": manual_content.strip()})
                     if response.status_code == 200:
                         st.success("✅ Manual content submitted for AI summarization!")
@@ -741,14 +744,13 @@ def render_article_edit_modal(article: Dict[str, Any], api_url: str):
 def bulk_update_status(article_ids: List[int], new_status: str, api_url: str):
     """Update status for multiple articles"""
     try:
-        for article_id in article_ids:
-            response = requests.patch(f"{api_url}/articles/{article_id}", 
-                                    json={"status": new_status})
-            if response.status_code != 200:
-                st.error(f"Failed to update article {article_id}")
-                return
+        response = api_session.patch(f"{api_url}/articles/status", 
+                                json={"ids": list(article_ids), "status": new_status})
+        if response.status_code != 200:
+            st.error("Failed to update articles")
+            return
         
-        st.success(f"Updated {len(article_ids)} articles to {new_status}")
+        st.success(f"Updated {response.json()['updated']} articles to {new_status}")
         st.session_state.selected_articles = set()
         st.rerun()
         
@@ -760,7 +762,7 @@ def bulk_resummarize(article_ids: List[int], api_url: str):
     try:
         for article_id in article_ids:
             # Trigger re-summarization (implementation depends on your API)
-            response = requests.post(f"{api_url}/articles/{article_id}/resummarize")
+            response = api_session.post(f"{api_url}/articles/{article_id}/resummarize")
             if response.status_code != 200:
                 st.error(f"Failed to re-summarize article {article_id}")
                 return
@@ -775,7 +777,7 @@ def bulk_resummarize(article_ids: List[int], api_url: str):
 def update_article(article_id: int, updates: Dict[str, Any], api_url: str):
     """Update a single article"""
     try:
-        response = requests.patch(f"{api_url}/articles/{article_id}", json=updates)
+        response = api_session.patch(f"{api_url}/articles/{article_id}", json=updates)
         if response.status_code != 200:
             st.error("Failed to update article")
         
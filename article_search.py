@@ -0,0 +1,33 @@
+# Article Search
+# Server-side full-text search shared by the article views
+
+import streamlit as st
+import requests
+from services import http_transport
+from typing import List
+
+# Keep-alive session shared by every call to the API
+api_session = http_transport.get_session("api")
+
+# /search returns at most 100 results per request
+SEARCH_PAGE_SIZE = 100
+
+
+def search_article_ids(query: str, api_url: str) -> List[int]:
+    """Returns IDs of every active article matching the query, best match first, paging through /search."""
+    ids = []
+    offset = 0
+    try:
+        while True:
+            response = api_session.get(f"{api_url}/search",
+                                       params={"q": query, "kind": "article",
+                                               "limit": SEARCH_PAGE_SIZE, "offset": offset})
+            response.raise_for_status()
+            found = response.json()
+            ids.extend(result['id'] for result in found['results'])
+            offset += SEARCH_PAGE_SIZE
+            if not found['results'] or offset >= found['total']:
+                return ids
+    except requests.exceptions.RequestException as e:
+        st.error(f"Search failed: {e}")
+        return []
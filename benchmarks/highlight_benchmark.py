@@ -0,0 +1,78 @@
+# benchmarks/highlight_benchmark.py
+#
+# Wall-clock time and OpenAI request count for highlighting a day's snapshots
+# one request per snapshot (JOB_WORKERS at a time, as the job queue used to)
+# against ai_service.get_ai_highlights_batch_async. OpenAI is replaced by a
+# stub whose latency is a fixed per-request overhead plus a per-output-token
+# decode time, the two costs batching trades off.
+#
+#   python -m benchmarks.highlight_benchmark [snapshots] [overhead_ms] [ms_per_token]
+import asyncio
+import json
+import os
+import re
+import sys
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from services import ai_service, job_queue, llm_cache  # noqa: E402
+
+TOKENS_PER_HIGHLIGHT = 45
+PARAGRAPH = ("The program office confirmed the next test flight of the hypersonic demonstrator is scheduled for "
+             "the spring, after two delays caused by booster supply problems. ")
+CONTENT = "\n".join(PARAGRAPH + f"Detail {n} adds budget figures and the contractor's schedule." for n in range(40))
+
+
+class StubCompletions:
+    def __init__(self, overhead: float, per_token: float):
+        self.overhead, self.per_token, self.requests = overhead, per_token, 0
+
+    async def create(self, **request):
+        self.requests += 1
+        prompt = request["messages"][1]["content"]
+        ids = re.findall(r"### Article id=(\d+)", prompt)
+        await asyncio.sleep(self.overhead + self.per_token * TOKENS_PER_HIGHLIGHT * max(1, len(ids)))
+        if ids:
+            content = json.dumps({"highlights": [{"id": int(i), "highlight": f"🚩 Highlight {i}. ([more](u))"} for i in ids]})
+        else:
+            content = "🚩 Highlight. ([more](u))"
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))], usage=None)
+
+
+async def _singles(items, workers: int):
+    limit = asyncio.Semaphore(workers)
+
+    async def one(item):
+        async with limit:
+            return await ai_service.get_ai_highlight_async(item["content"], item["url"])
+    return await asyncio.gather(*(one(item) for item in items))
+
+
+def run(count: int = 40, overhead_ms: int = 600, ms_per_token: int = 15):
+    # Measure the LLM path; the cache would answer the second pass locally.
+    llm_cache.LLM_CACHE_ENABLED = False
+    os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+    stub = StubCompletions(overhead_ms / 1000, ms_per_token / 1000)
+    ai_service.get_async_openai_client = lambda api_key: SimpleNamespace(chat=SimpleNamespace(completions=stub))
+    items = [{"id": n, "content": CONTENT + f" Snapshot {n}.", "url": f"https://example.com/{n}"} for n in range(count)]
+
+    results = {}
+    for label, highlight_all in (("per-item", lambda: _singles(items, job_queue.JOB_WORKERS)),
+                                 ("batched", lambda: ai_service.get_ai_highlights_batch_async(items))):
+        stub.requests = 0
+        start = time.perf_counter()
+        asyncio.run(highlight_all())
+        results[label] = (time.perf_counter() - start, stub.requests)
+
+    print(f"{count} snapshots, {overhead_ms} ms per request + {ms_per_token} ms per output token, "
+          f"{job_queue.JOB_WORKERS} workers for per-item, up to {ai_service.HIGHLIGHT_BATCH_MAX_ITEMS} per batch")
+    print(f"{'mode':<10} {'seconds':>8} {'requests':>9}")
+    for label, (elapsed, requests_made) in results.items():
+        print(f"{label:<10} {elapsed:>8.2f} {requests_made:>9}")
+
+
+if __name__ == "__main__":
+    run(*(int(arg) for arg in sys.argv[1:4]))
@@ -0,0 +1,88 @@
+# benchmarks/returning_benchmark.py
+#
+# Per-call latency of the db_handler write paths with INSERT/UPDATE ... RETURNING,
+# versus the SELECT-after-write fallback used on SQLite < 3.35, versus the
+# previous pattern of committing and then re-reading through get_article_by_id
+# on a second pooled connection.
+#
+#   python -m benchmarks.returning_benchmark [iterations]
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from database import db_handler  # noqa: E402
+
+
+def _time_calls(fn, iterations: int):
+    timings = []
+    for i in range(iterations):
+        start = time.perf_counter()
+        fn(i)
+        timings.append((time.perf_counter() - start) * 1_000_000)
+    return timings
+
+
+def _previous_add_article(url: str, title: str):
+    conn = db_handler.get_db_connection()
+    cursor = conn.cursor()
+    cursor.execute("SELECT * FROM Articles WHERE url = ?", (url,))
+    cursor.fetchone()
+    position = db_handler._position_after_last(cursor, 'Articles')
+    cursor.execute("INSERT INTO Articles (url, title, position) VALUES (?, ?, ?)", (url, title, position))
+    conn.commit()
+    article_id = cursor.lastrowid
+    conn.close()
+    return db_handler.get_article_by_id(article_id)
+
+
+def _previous_update_article(article_id: int, title: str, status: str):
+    conn = db_handler.get_db_connection()
+    cursor = conn.cursor()
+    cursor.execute("UPDATE Articles SET title = ?, status = ?, updated_at = CURRENT_TIMESTAMP WHERE id = ?",
+                   (title, status, article_id))
+    conn.commit()
+    conn.close()
+    return db_handler.get_article_by_id(article_id)
+
+
+MODES = {
+    "previous (re-read)": (False, _previous_add_article, _previous_update_article),
+    "SELECT after write": (False, db_handler.add_article, db_handler.update_article),
+    "RETURNING": (True, db_handler.add_article, db_handler.update_article),
+}
+
+
+def run(iterations: int = 2000):
+    results = {}
+    for label, (has_returning, add_fn, update_fn) in MODES.items():
+        with tempfile.TemporaryDirectory() as tmp:
+            db_handler.DB_PATH = str(Path(tmp) / "bench.db")
+            db_handler.HAS_RETURNING = has_returning
+            db_handler.init_db()
+
+            inserted = []
+            add = _time_calls(
+                lambda i: inserted.append(add_fn(f"http://bench.example/{i}", title=f"Article {i}")["id"]),
+                iterations,
+            )
+            update = _time_calls(
+                lambda i: update_fn(inserted[i], title=f"Edited {i}", status="summarized"),
+                iterations,
+            )
+            results[label] = {"add_article": add, "update_article": update}
+            db_handler.close_db_pools()
+
+    print(f"SQLite {db_handler.sqlite3.sqlite_version}, {iterations} calls each (microseconds per call)")
+    print(f"{'mode':<20} {'operation':<16} {'median':>8} {'p95':>8}")
+    for label, ops in results.items():
+        for op, timings in ops.items():
+            p95 = statistics.quantiles(timings, n=20)[-1]
+            print(f"{label:<20} {op:<16} {statistics.median(timings):>8.1f} {p95:>8.1f}")
+
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 2000)
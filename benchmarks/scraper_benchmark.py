@@ -0,0 +1,76 @@
+# benchmarks/scraper_benchmark.py
+#
+# Throughput of web_scraper.fetch_many against the previous one-URL-at-a-time
+# fetch_and_parse_url loop. A local stub HTTP server answers every request
+# after a fixed delay (standing in for a news site's latency) with a
+# realistically sized article page, spread over a few hostnames so the
+# per-host limit comes into play.
+#
+#   python -m benchmarks.scraper_benchmark [urls] [latency_ms]
+import asyncio
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from services import http_cache, web_scraper  # noqa: E402
+
+HOSTS = ("127.0.0.1", "localhost", "127.0.0.2", "127.0.0.3")
+PARAGRAPH = "<p>" + "The program office confirmed the next test flight is scheduled for the spring. " * 6 + "</p>"
+PAGE = ("<html><head><title>Stub</title><script>var x = 1;</script></head><body>"
+        "<nav>Home | World | Defense</nav><article><h1>Stub article</h1>" + PARAGRAPH * 60 +
+        "</article><footer>Copyright</footer></body></html>").encode("utf-8")
+
+
+def _start_stub_server(latency: float):
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            time.sleep(latency)
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(PAGE)))
+            self.end_headers()
+            self.wfile.write(PAGE)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("0.0.0.0", 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def run(count: int = 100, latency_ms: int = 200):
+    # Measure the network path; the HTTP cache would serve the second pass locally.
+    http_cache.HTTP_CACHE_ENABLED = False
+    server = _start_stub_server(latency_ms / 1000)
+    port = server.server_address[1]
+    urls = [f"http://{HOSTS[i % len(HOSTS)]}:{port}/story/{i}" for i in range(count)]
+    results = {}
+    try:
+        start = time.perf_counter()
+        sequential = [web_scraper.fetch_and_parse_url(url) for url in urls]
+        results["sequential"] = (time.perf_counter() - start, sum(text is not None for text in sequential))
+
+        start = time.perf_counter()
+        batched = asyncio.run(web_scraper.fetch_many(urls))
+        results["fetch_many"] = (time.perf_counter() - start, sum(text is not None for text in batched.values()))
+    finally:
+        server.shutdown()
+        web_scraper.shutdown()
+
+    print(f"{count} URLs over {len(HOSTS)} hosts, {latency_ms} ms server latency, "
+          f"{web_scraper.MAX_CONCURRENCY} global / {web_scraper.PER_HOST_CONCURRENCY} per-host slots, "
+          f"{web_scraper.PARSE_WORKERS} parse workers")
+    print(f"{'mode':<12} {'seconds':>8} {'urls/s':>8} {'ok':>5}")
+    for label, (elapsed, ok) in results.items():
+        print(f"{label:<12} {elapsed:>8.2f} {count / elapsed:>8.1f} {ok:>5}")
+
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 100,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 200)
@@ -3,8 +3,13 @@
 
 import streamlit as st
 import requests
+from services import http_transport
 from typing import List, Dict, Any
 
+# Keep-alive session shared by every call to the API
+api_session = http_transport.get_session("api")
+
+
 def render_compact_article_list(articles: List[Dict[str, Any]], api_url: str):
     """
     Render articles in a compact, table-like view with maximum information density
@@ -14,7 +19,7 @@ def render_compact_article_list(articles: List[Dict[str, Any]], api_url: str):
         return
     
     # Sort articles by position
-    sorted_articles = sorted(articles, key=lambda x: x.get('position', 999))
+    sorted_articles = sorted(articles, key=lambda x: x.get('rank', 999))
     
     # Compact CSS for dense layout
     st.markdown("""
@@ -143,7 +148,7 @@ def render_compact_article_list(articles: List[Dict[str, Any]], api_url: str):
     # Render each article in compact format
     for index, article in enumerate(sorted_articles):
         article_id = article['id']
-        position = article.get('position', index + 1)
+        position = article.get('rank', index + 1)
         title = article.get('title', 'Untitled')
         status = article.get('status', 'pending')
         source = article.get('source', 'manual')
@@ -194,7 +199,7 @@ def render_compact_article_list(articles: List[Dict[str, Any]], api_url: str):
                 if st.button("↑", key=f"up_compact_{article_id}", help="Move Up"):
                     if position > 1:
                         try:
-                            response = requests.patch(f"{api_url}/articles/{article_id}/position", 
+                            response = api_session.patch(f"{api_url}/articles/{article_id}/position", 
                                                     json={"item_id": article_id, "new_position": position - 1})
                             if response.status_code == 200:
                                 st.rerun()
@@ -204,7 +209,7 @@ def render_compact_article_list(articles: List[Dict[str, Any]], api_url: str):
             with action_col2:
                 if st.button("↓", key=f"down_compact_{article_id}", help="Move Down"):
                     try:
-                        response = requests.patch(f"{api_url}/articles/{article_id}/position", 
+                        response = api_session.patch(f"{api_url}/articles/{article_id}/position", 
                                                 json={"item_id": article_id, "new_position": position + 1})
                         if response.status_code == 200:
                             st.rerun()
@@ -215,7 +220,7 @@ def render_compact_article_list(articles: List[Dict[str, Any]], api_url: str):
                 if status == 'summarized':
                     if st.button("✅", key=f"accept_compact_{article_id}", help="Accept"):
                         try:
-                            response = requests.patch(f"{api_url}/articles/{article_id}", 
+                            response = api_session.patch(f"{api_url}/articles/{article_id}", 
                                                     json={"status": "accepted"})
                             if response.status_code == 200:
                                 st.rerun()
@@ -224,7 +229,7 @@ def render_compact_article_list(articles: List[Dict[str, Any]], api_url: str):
                 elif status == 'accepted':
                     if st.button("📝", key=f"unaccept_compact_{article_id}", help="Un-accept"):
                         try:
-                            response = requests.patch(f"{api_url}/articles/{article_id}", 
+                            response = api_session.patch(f"{api_url}/articles/{article_id}", 
                                                     json={"status": "summarized"})
                             if response.status_code == 200:
                                 st.rerun()
@@ -234,7 +239,7 @@ def render_compact_article_list(articles: List[Dict[str, Any]], api_url: str):
             with action_col4:
                 if st.button("🗑️", key=f"archive_compact_{article_id}", help="Archive"):
                     try:
-                        response = requests.patch(f"{api_url}/articles/{article_id}", 
+                        response = api_session.patch(f"{api_url}/articles/{article_id}", 
                                                 json={"status": "archived"})
                         if response.status_code == 200:
                             st.rerun()
@@ -270,12 +275,12 @@ def render_compact_article_list(articles: List[Dict[str, Any]], api_url: str):
                     if st.button("📝 Process Manual Content", key=f"process_manual_{article_id}"):
                         if manual_content.strip():
                             try:
-                                response = requests.post(f"{api_url}/summarize-manual", 
+                                response = api_session.post(f"{api_url}/summarize-manual", 
                                                        json={"content": manual_content.strip()})
                                 if response.status_code == 200:
                                     summary_data = response.json()
                                     # Update article with new summary
-                                    update_response = requests.patch(f"{api_url}/articles/{article_id}", 
+                                    update_response = api_session.patch(f"{api_url}/articles/{article_id}", 
                                                                    json={
                                                                        "summary": summary_data["summary"],
                                                                        "status": "summarized"
@@ -3,8 +3,13 @@
 
 import streamlit as st
 import requests
+from services import http_transport
 from typing import List, Dict, Any
 
+# Keep-alive session shared by every call to the API
+api_session = http_transport.get_session("api")
+
+
 def render_crm_article_list(articles: List[Dict[str, Any]], api_url: str):
     """
     Render articles in a modern CRM-style list interface with drag-and-drop functionality
@@ -202,7 +207,7 @@ def render_article_card(article: Dict[str, Any], index: int, api_url: str):
             url = article.get('url', '')
             url_preview = url.split('/')[-1][:30] + "..." if len(url.split('/')[-1]) > 30 else url.split('/')[-1]
             
-            st.markdown(f"**#{article.get('position', index+1)} {title}**")
+            st.markdown(f"**#{article.get('rank', index+1)} {title}**")
             st.caption(f"🔗 {url_preview}")
         
         with col3:
@@ -220,10 +225,10 @@ def render_article_card(article: Dict[str, Any], index: int, api_url: str):
             with subcol1:
                 if st.button("⬆️", key=f"up_{article['id']}", help="Move Up"):
                     # Simple position update via API
-                    current_pos = article.get('position', index + 1)
+                    current_pos = article.get('rank', index + 1)
                     if current_pos > 1:
                         try:
-                            response = requests.patch(f"{api_url}/articles/{article['id']}/position", 
+                            response = api_session.patch(f"{api_url}/articles/{article['id']}/position", 
                                                     json={"item_id": article['id'], "new_position": current_pos - 1})
                             if response.status_code == 200:
                                 st.success("Moved up!")
@@ -235,9 +240,9 @@ def render_article_card(article: Dict[str, Any], index: int, api_url: str):
             with subcol2:
                 if st.button("⬇️", key=f"down_{article['id']}", help="Move Down"):
                     # Simple position update via API
-                    current_pos = article.get('position', index + 1)
+                    current_pos = article.get('rank', index + 1)
                     try:
-                        response = requests.patch(f"{api_url}/articles/{article['id']}/position", 
+                        response = api_session.patch(f"{api_url}/articles/{article['id']}/position", 
                                                 json={"item_id": article['id'], "new_position": current_pos + 1})
                         if response.status_code == 200:
                             st.success("Moved down!")
@@ -281,7 +286,7 @@ def render_article_details(article: Dict[str, Any], api_url: str):
         with col1:
             if st.button("💾 Save", key=f"save_summary_{article['id']}"):
                 try:
-                    response = requests.patch(f"{api_url}/articles/{article['id']}", 
+                    response = api_session.patch(f"{api_url}/articles/{article['id']}", 
                                             json={"summary": new_summary})
                     if response.status_code == 200:
                         st.success("Summary saved!")
@@ -311,7 +316,7 @@ def render_article_details(article: Dict[str, Any], api_url: str):
         if st.button("🤖 Summarize Manual Content", key=f"manual_sum_detail_{article['id']}"):
             if manual_content.strip() and not manual_content.startswith("Failed to scrape:"):
                 try:
-                    response = requests.post(f"{api_url}/summarize-manual", json={
+                    response = api_session.post(f"{api_url}/summarize-manual", json={
                         "article_id": article['id'],
                         "manual_content": manual_content
                     })
@@ -328,20 +333,16 @@ def render_article_details(article: Dict[str, Any], api_url: str):
     col1, col2, col3, col4, col5 = st.columns(5)
     
     with col1:
-        if st.button("🔄 Re-summarize", key=f"resum_detail_{article['id']}"):
-            try:
-                requests.post(f"{api_url}/summarize", json={"article_id": article['id']})
-                st.success("Re-summarization started!")
-                st.rerun()
-            except Exception as e:
-                st.error(f"Error: {e}")
+        regenerate = st.checkbox("🔁 Regenerate", key=f"regen_detail_{article['id']}",
+                                 help="Write a new summary even if this content was summarized before")
+        resummarize_clicked = st.button("🔄 Re-summarize", key=f"resum_detail_{article['id']}")
     
     with col2:
         current_status = article.get('status')
         if current_status != 'accepted':
             if st.button("✅ Accept", key=f"accept_detail_{article['id']}"):
                 try:
-                    response = requests.patch(f"{api_url}/articles/{article['id']}", 
+                    response = api_session.patch(f"{api_url}/articles/{article['id']}", 
                                             json={"status": "accepted"})
                     if response.status_code == 200:
                         st.success("Article accepted!")
@@ -353,7 +354,7 @@ def render_article_details(article: Dict[str, Any], api_url: str):
         else:
             if st.button("↩️ Un-accept", key=f"unaccept_detail_{article['id']}"):
                 try:
-                    response = requests.patch(f"{api_url}/articles/{article['id']}", 
+                    response = api_session.patch(f"{api_url}/articles/{article['id']}", 
                                             json={"status": "summarized"})
                     if response.status_code == 200:
                         st.success("Article un-accepted!")
@@ -366,7 +367,7 @@ def render_article_details(article: Dict[str, Any], api_url: str):
     with col3:
         if st.button("📦 Archive", key=f"archive_detail_{article['id']}"):
             try:
-                response = requests.patch(f"{api_url}/articles/{article['id']}", 
+                response = api_session.patch(f"{api_url}/articles/{article['id']}", 
                                         json={"status": "archived"})
                 if response.status_code == 200:
                     st.success("Article archived!")
@@ -379,7 +380,7 @@ def render_article_details(article: Dict[str, Any], api_url: str):
     with col4:
         if st.button("🗑️ Delete", key=f"delete_detail_{article['id']}"):
             try:
-                response = requests.delete(f"{api_url}/articles/{article['id']}")
+                response = api_session.delete(f"{api_url}/articles/{article['id']}")
                 if response.status_code == 200:
                     st.success("Article deleted!")
                     st.rerun()
@@ -400,6 +401,47 @@ def render_article_details(article: Dict[str, Any], api_url: str):
             if st.button("⬇️", key=f"down_detail_{article['id']}", help="Move Down"):
                 # Move down logic would go here
                 pass
+    
+    # Streamed below the action row, where the summary has the expander's full width
+    if resummarize_clicked:
+        stream_resummarize(article['id'], api_url, regenerate)
+
+def stream_resummarize(article_id: int, api_url: str, refresh: bool):
+    """
+    Re-summarizes an article through /summarize/stream, writing the summary
+    as it is generated, then reruns so the saved article is shown.
+    """
+    try:
+        response = api_session.post(f"{api_url}/summarize/stream",
+                                    json={"article_id": article_id, "refresh": refresh},
+                                    stream=True, timeout=120)
+    except Exception as e:
+        st.error(f"Error: {e}")
+        return
+    if response.status_code != 200:
+        st.error("Failed to re-summarize article")
+        return
+    
+    result = {"error": "The summary stream ended early"}
+    
+    def summary_deltas():
+        for event, data in http_transport.iter_sse(response):
+            if event == "delta":
+                yield data["text"]
+            elif event == "done":
+                result["error"] = None
+            elif event == "error":
+                result["error"] = data["detail"]
+    
+    live_summary = st.empty()
+    with live_summary.container():
+        st.write_stream(summary_deltas())
+    
+    if result["error"]:
+        live_summary.empty()
+        st.error(f"Re-summarization failed: {result['error']}")
+    else:
+        st.rerun()
 
 def render_crm_snapshot_list(snapshots: List[Dict[str, Any]], api_url: str):
     """
@@ -525,7 +567,7 @@ def render_snapshot_card(snapshot: Dict[str, Any], index: int, api_url: str):
             url_preview = url.split('/')[-1][:30] + "..." if len(url.split('/')[-1]) > 30 else url.split('/')[-1]
             highlight_preview = (snapshot.get('highlight', '')[:50] + "...") if len(snapshot.get('highlight', '')) > 50 else snapshot.get('highlight', 'No highlight yet')
             
-            st.markdown(f"**#{snapshot.get('position', index+1)} Snapshot**")
+            st.markdown(f"**#{snapshot.get('rank', index+1)} Snapshot**")
             st.caption(f"🔗 {url_preview}")
             st.caption(f"🚩 {highlight_preview}")
         
@@ -544,10 +586,10 @@ def render_snapshot_card(snapshot: Dict[str, Any], index: int, api_url: str):
             with subcol1:
                 if st.button("⬆️", key=f"up_snap_{snapshot['id']}", help="Move Up"):
                     # Simple position update via API
-                    current_pos = snapshot.get('position', index + 1)
+                    current_pos = snapshot.get('rank', index + 1)
                     if current_pos > 1:
                         try:
-                            response = requests.patch(f"{api_url}/snapshots/{snapshot['id']}/position", 
+                            response = api_session.patch(f"{api_url}/snapshots/{snapshot['id']}/position", 
                                                     json={"item_id": snapshot['id'], "new_position": current_pos - 1})
                             if response.status_code == 200:
                                 st.success("Moved up!")
@@ -559,9 +601,9 @@ def render_snapshot_card(snapshot: Dict[str, Any], index: int, api_url: str):
             with subcol2:
                 if st.button("⬇️", key=f"down_snap_{snapshot['id']}", help="Move Down"):
                     # Simple position update via API
-                    current_pos = snapshot.get('position', index + 1)
+                    current_pos = snapshot.get('rank', index + 1)
                     try:
-                        response = requests.patch(f"{api_url}/snapshots/{snapshot['id']}/position", 
+                        response = api_session.patch(f"{api_url}/snapshots/{snapshot['id']}/position", 
                                                 json={"item_id": snapshot['id'], "new_position": current_pos + 1})
                         if response.status_code == 200:
                             st.success("Moved down!")
@@ -605,7 +647,7 @@ def render_snapshot_details(snapshot: Dict[str, Any], api_url: str):
         with col1:
             if st.button("💾 Save", key=f"save_highlight_{snapshot['id']}"):
                 try:
-                    response = requests.patch(f"{api_url}/snapshots/{snapshot['id']}", 
+                    response = api_session.patch(f"{api_url}/snapshots/{snapshot['id']}", 
                                             json={"highlight": new_highlight})
                     if response.status_code == 200:
                         st.success("Highlight saved!")
@@ -635,7 +677,7 @@ def render_snapshot_details(snapshot: Dict[str, Any], api_url: str):
         if st.button("🚩 Generate Highlight from Manual Content", key=f"manual_highlight_detail_{snapshot['id']}"):
             if manual_content.strip() and not manual_content.startswith("Failed to scrape:"):
                 try:
-                    response = requests.post(f"{api_url}/highlight-manual", json={
+                    response = api_session.post(f"{api_url}/highlight-manual", json={
                         "snapshot_id": snapshot['id'],
                         "manual_content": manual_content
                     })
@@ -652,9 +694,11 @@ def render_snapshot_details(snapshot: Dict[str, Any], api_url: str):
     col1, col2, col3, col4, col5 = st.columns(5)
     
     with col1:
+        regenerate = st.checkbox("🔁 Regenerate", key=f"regen_snap_detail_{snapshot['id']}",
+                                 help="Write a new highlight even if this content was highlighted before")
         if st.button("🔄 Re-highlight", key=f"rehighlight_detail_{snapshot['id']}"):
             try:
-                requests.post(f"{api_url}/highlight", json={"snapshot_id": snapshot['id']})
+                api_session.post(f"{api_url}/highlight", json={"snapshot_id": snapshot['id'], "refresh": regenerate})
                 st.success("Re-highlighting started!")
                 st.rerun()
             except Exception as e:
@@ -665,7 +709,7 @@ def render_snapshot_details(snapshot: Dict[str, Any], api_url: str):
         if current_status != 'accepted':
             if st.button("✅ Accept", key=f"accept_snap_detail_{snapshot['id']}"):
                 try:
-                    response = requests.patch(f"{api_url}/snapshots/{snapshot['id']}", 
+                    response = api_session.patch(f"{api_url}/snapshots/{snapshot['id']}", 
                                             json={"status": "accepted"})
                     if response.status_code == 200:
                         st.success("Snapshot accepted!")
@@ -677,7 +721,7 @@ def render_snapshot_details(snapshot: Dict[str, Any], api_url: str):
         else:
             if st.button("↩️ Un-accept", key=f"unaccept_snap_detail_{snapshot['id']}"):
                 try:
-                    response = requests.patch(f"{api_url}/snapshots/{snapshot['id']}", 
+                    response = api_session.patch(f"{api_url}/snapshots/{snapshot['id']}", 
                                             json={"status": "highlighted"})
                     if response.status_code == 200:
                         st.success("Snapshot un-accepted!")
@@ -690,7 +734,7 @@ def render_snapshot_details(snapshot: Dict[str, Any], api_url: str):
     with col3:
         if st.button("📦 Archive", key=f"archive_snap_detail_{snapshot['id']}"):
             try:
-                response = requests.patch(f"{api_url}/snapshots/{snapshot['id']}", 
+                response = api_session.patch(f"{api_url}/snapshots/{snapshot['id']}", 
                                         json={"status": "archived"})
                 if response.status_code == 200:
                     st.success("Snapshot archived!")
@@ -703,7 +747,7 @@ def render_snapshot_details(snapshot: Dict[str, Any], api_url: str):
     with col4:
         if st.button("🗑️ Delete", key=f"delete_snap_detail_{snapshot['id']}"):
             try:
-                response = requests.delete(f"{api_url}/snapshots/{snapshot['id']}")
+                response = api_session.delete(f"{api_url}/snapshots/{snapshot['id']}")
                 if response.status_code == 200:
                     st.success("Snapshot deleted!")
                     st.rerun()
@@ -0,0 +1,71 @@
+# database/async_db.py
+#
+# Async access to the database for `async def` request handlers.
+# db_handler stays the single implementation of every query; this module only
+# decides where a call runs so the event loop is never blocked on SQLite:
+#   - reads go to a small thread pool sized like the connection pool, and
+#   - writes go to one dedicated writer thread, since SQLite only admits one
+#     writer at a time and queueing them here is cheaper than busy-waiting.
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Dict, Any, List
+
+from database import db_handler
+
+_executors: Dict[str, ThreadPoolExecutor] = {}
+
+
+def _executor(kind: str) -> ThreadPoolExecutor:
+    executor = _executors.get(kind)
+    if executor is None:
+        if kind == "reader":
+            executor = ThreadPoolExecutor(max_workers=db_handler.DB_POOL_SIZE, thread_name_prefix="db-reader")
+        else:
+            executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="db-writer")
+        _executors[kind] = executor
+    return executor
+
+
+async def _run(kind: str, fn, *args, **kwargs):
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_executor(kind), functools.partial(fn, *args, **kwargs))
+
+
+async def read(fn, *args, **kwargs):
+    """Runs a read-only db_handler function on the reader pool."""
+    return await _run("reader", fn, *args, **kwargs)
+
+
+async def write(fn, *args, **kwargs):
+    """Runs a mutating db_handler function on the writer thread."""
+    return await _run("writer", fn, *args, **kwargs)
+
+
+def shutdown():
+    """Waits for queued work and stops the executors. They are recreated on next use."""
+    while _executors:
+        _, executor = _executors.popitem()
+        executor.shutdown(wait=True)
+
+
+# --- Articles ---
+async def get_article_by_id(article_id: int) -> Optional[Dict[str, Any]]:
+    return await read(db_handler.get_article_by_id, article_id)
+
+async def get_articles_by_status(status: str) -> List[Dict[str, Any]]:
+    return await read(db_handler.get_articles_by_status, status)
+
+async def update_article(article_id: int, **update_data) -> Optional[Dict[str, Any]]:
+    return await write(db_handler.update_article, article_id, **update_data)
+
+
+# --- Snapshots ---
+async def get_snapshot_by_id(snapshot_id: int) -> Optional[Dict[str, Any]]:
+    return await read(db_handler.get_snapshot_by_id, snapshot_id)
+
+async def get_snapshots_by_status(status: str) -> List[Dict[str, Any]]:
+    return await read(db_handler.get_snapshots_by_status, status)
+
+async def update_snapshot_highlight(snapshot_id: int, highlight: str, original_content: str) -> bool:
+    return await write(db_handler.update_snapshot_highlight, snapshot_id, highlight, original_content)
@@ -0,0 +1,162 @@
+# database/connection_pool.py
+import sqlite3
+import threading
+import time
+import queue
+from typing import Dict, Any, Optional, Callable
+
+# PRAGMAs applied once to every pooled connection when it is opened.
+# WAL lets readers proceed while a writer holds the lock, and NORMAL
+# synchronous is durable enough in WAL mode while avoiding an fsync per commit.
+CONNECTION_PRAGMAS = (
+    "PRAGMA journal_mode = WAL",
+    "PRAGMA synchronous = NORMAL",
+    "PRAGMA cache_size = -16000",  # ~16 MB page cache per connection
+    "PRAGMA busy_timeout = 5000",
+    "PRAGMA temp_store = MEMORY",
+)
+
+
+class PooledConnection(sqlite3.Connection):
+    """
+    A sqlite3 connection that returns itself to its pool on close().
+    This keeps the existing `conn.close()` calls in db_handler working unchanged.
+    """
+    _pool: Optional["ConnectionPool"] = None
+    _checked_out: bool = False
+
+    def close(self):
+        if self._pool is not None and self._checked_out:
+            self._pool.release(self)
+        elif self._pool is None:
+            super().close()
+
+    def close_for_real(self):
+        super().close()
+
+    def __del__(self):
+        # A connection dropped without close() (e.g. an exception escaped a
+        # CRUD function) must not count against the pool forever.
+        if self._pool is not None and self._checked_out:
+            self._pool._forget()
+
+
+class ConnectionPool:
+    """A bounded pool of long-lived SQLite connections for one database file."""
+
+    def __init__(self, db_path: str, max_size: int = 8, timeout: float = 30.0,
+                 row_factory: Optional[Callable] = None):
+        self.db_path = db_path
+        self.max_size = max_size
+        self.timeout = timeout
+        self.row_factory = row_factory
+        self._idle: "queue.LifoQueue[PooledConnection]" = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._open_count = 0
+        self._in_use = 0
+        self._checkouts = 0
+        self._waits = 0
+        self._wait_time = 0.0
+        self._closed = False
+
+    def _open(self) -> PooledConnection:
+        conn = sqlite3.connect(
+            self.db_path,
+            factory=PooledConnection,
+            check_same_thread=False,
+            timeout=self.timeout,
+        )
+        for pragma in CONNECTION_PRAGMAS:
+            conn.execute(pragma)
+        conn.row_factory = self.row_factory
+        conn._pool = self
+        return conn
+
+    def acquire(self) -> PooledConnection:
+        """Checks out an idle connection, opening a new one if the pool is not full."""
+        conn = None
+        try:
+            conn = self._idle.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                can_open = self._open_count < self.max_size
+                if can_open:
+                    self._open_count += 1
+            if can_open:
+                try:
+                    conn = self._open()
+                except Exception:
+                    with self._lock:
+                        self._open_count -= 1
+                    raise
+            else:
+                start = time.perf_counter()
+                try:
+                    conn = self._idle.get(timeout=self.timeout)
+                except queue.Empty:
+                    raise sqlite3.OperationalError(
+                        f"Timed out after {self.timeout}s waiting for a database connection"
+                    )
+                waited = time.perf_counter() - start
+                with self._lock:
+                    self._waits += 1
+                    self._wait_time += waited
+
+        conn._checked_out = True
+        with self._lock:
+            self._in_use += 1
+            self._checkouts += 1
+        return conn
+
+    def release(self, conn: PooledConnection):
+        """Returns a connection to the pool, rolling back anything left uncommitted."""
+        conn._checked_out = False
+        with self._lock:
+            self._in_use -= 1
+            closed = self._closed
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+            # Callers sometimes swap the row factory; restore the pool default.
+            conn.row_factory = self.row_factory
+        except sqlite3.Error:
+            closed = True
+
+        if closed:
+            conn.close_for_real()
+            with self._lock:
+                self._open_count -= 1
+        else:
+            self._idle.put(conn)
+
+    def _forget(self):
+        with self._lock:
+            self._in_use -= 1
+            self._open_count -= 1
+
+    def close_all(self):
+        """Closes every idle connection. Connections still checked out are closed on release."""
+        with self._lock:
+            self._closed = True
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            conn.close_for_real()
+            with self._lock:
+                self._open_count -= 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "db_path": str(self.db_path),
+                "max_size": self.max_size,
+                "open_connections": self._open_count,
+                "in_use": self._in_use,
+                "idle": self._open_count - self._in_use,
+                "checkouts": self._checkouts,
+                "waits": self._waits,
+                "total_wait_ms": round(self._wait_time * 1000, 3),
+                "avg_wait_ms": round(self._wait_time * 1000 / self._waits, 3) if self._waits else 0.0,
+            }
@@ -0,0 +1,108 @@
+# database/content_store.py
+#
+# Content-addressed, compressed storage for scraped article bodies.
+# Articles and Snapshots keep only a content_hash; the text itself lives once
+# in ContentBlobs, keyed by the SHA-256 of the text. Reference counts are kept
+# by triggers (see migrations/0004_content_store.sql), so a blob disappears
+# when the last row pointing at it is deleted or re-pointed.
+import hashlib
+import zlib
+from typing import Optional, Dict, Any
+
+try:
+    import zstandard
+except ImportError:  # zstd is optional; zlib is always available
+    zstandard = None
+
+ZLIB_LEVEL = 6
+ZSTD_LEVEL = 10
+
+# Each blob records the codec it was written with, so both stay readable
+# regardless of whether zstandard is installed now.
+DEFAULT_CODEC = 'zstd' if zstandard is not None else 'zlib'
+
+
+def content_hash(text: str) -> str:
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+def compress(text: str, codec: str = DEFAULT_CODEC) -> bytes:
+    raw = text.encode('utf-8')
+    if codec == 'zstd':
+        return zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(raw)
+    if codec == 'zlib':
+        return zlib.compress(raw, ZLIB_LEVEL)
+    raise ValueError(f"Unknown content codec: {codec}")
+
+
+def decompress(data: bytes, codec: str) -> str:
+    if codec == 'zstd':
+        if zstandard is None:
+            raise RuntimeError("This blob is zstd-compressed but the zstandard package is not installed")
+        return zstandard.ZstdDecompressor().decompress(data).decode('utf-8')
+    if codec == 'zlib':
+        return zlib.decompress(data).decode('utf-8')
+    raise ValueError(f"Unknown content codec: {codec}")
+
+
+def store_content(cursor, text: Optional[str]) -> Optional[str]:
+    """
+    Makes sure `text` is stored and returns its hash for a content_hash column.
+    Identical bodies are only compressed and written once. Runs in the
+    caller's transaction; the refcount is bumped when a row points at the hash.
+    """
+    if not text:
+        return None
+    digest = content_hash(text)
+    cursor.execute("SELECT 1 FROM ContentBlobs WHERE hash = ?", (digest,))
+    if cursor.fetchone() is None:
+        data = compress(text)
+        cursor.execute(
+            "INSERT INTO ContentBlobs (hash, codec, data, raw_size, stored_size) VALUES (?, ?, ?, ?, ?)",
+            (digest, DEFAULT_CODEC, data, len(text.encode('utf-8')), len(data))
+        )
+    return digest
+
+
+def load_content(cursor, digest: Optional[str]) -> Optional[str]:
+    """Decompresses the body stored under `digest`, or None if there is none."""
+    if not digest:
+        return None
+    cursor.execute("SELECT codec, data FROM ContentBlobs WHERE hash = ?", (digest,))
+    row = cursor.fetchone()
+    if row is None:
+        return None
+    return decompress(row['data'], row['codec'])
+
+
+def hydrate(cursor, row: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """Fills in original_content on a detail row from its content_hash."""
+    if row and row.get('content_hash'):
+        row['original_content'] = load_content(cursor, row['content_hash'])
+    return row
+
+
+def store_stats(cursor) -> Dict[str, Any]:
+    """Reports how many bytes compression and de-duplication save."""
+    cursor.execute("""
+        SELECT COUNT(*) AS blobs,
+               COALESCE(SUM(refcount), 0) AS references_,
+               COALESCE(SUM(raw_size * refcount), 0) AS logical_bytes,
+               COALESCE(SUM(raw_size), 0) AS unique_bytes,
+               COALESCE(SUM(stored_size), 0) AS stored_bytes
+        FROM ContentBlobs
+    """)
+    row = cursor.fetchone()
+    logical = row['logical_bytes']
+    stored = row['stored_bytes']
+    return {
+        "codec": DEFAULT_CODEC,
+        "blobs": row['blobs'],
+        "references": row['references_'],
+        "logical_bytes": logical,
+        "unique_bytes": row['unique_bytes'],
+        "stored_bytes": stored,
+        "bytes_saved": logical - stored,
+        "dedup_saved_bytes": logical - row['unique_bytes'],
+        "compression_ratio": round(logical / stored, 2) if stored else None,
+    }
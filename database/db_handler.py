@@ -1,8 +1,15 @@
 # database/db_handler.py
 import sqlite3
 from pathlib import Path
+import importlib.util
 import json
-from typing import Optional, Dict, Any, List
+import re
+import threading
+from typing import Optional, Dict, Any, List, Tuple
+
+from database.connection_pool import ConnectionPool
+from database import content_store
+from database.url_canonicalizer import url_hash
 
 # Define the path to the database file - ensure it works on Railway
 import os
@@ -21,16 +28,164 @@ def dict_factory(cursor, row):
         d[col[0]] = row[idx]
     return d
 
-def get_db_connection():
-    """Establishes a connection to the SQLite database."""
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = dict_factory
-    return conn
+# Connection pools are keyed by database path so that pointing DB_PATH at a
+# different file (e.g. in tests) transparently gets its own set of connections.
+DB_POOL_SIZE = int(os.getenv('LOWDOWN_DB_POOL_SIZE', '8'))
+_pools: Dict[str, ConnectionPool] = {}
+_pools_lock = threading.Lock()
+
+def _get_pool(db_path=None) -> ConnectionPool:
+    path = str(db_path or DB_PATH)
+    pool = _pools.get(path)
+    if pool is None:
+        with _pools_lock:
+            pool = _pools.get(path)
+            if pool is None:
+                pool = ConnectionPool(path, max_size=DB_POOL_SIZE, row_factory=dict_factory)
+                _pools[path] = pool
+    return pool
+
+def get_db_connection(db_path=None):
+    """
+    Checks out a pooled connection to the SQLite database (or to `db_path`,
+    for side databases such as the HTTP cache).
+    Calling close() on it returns it to the pool rather than closing the file.
+    """
+    return _get_pool(db_path).acquire()
+
+def close_db_pools():
+    """Closes all pooled connections. Called on application shutdown."""
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.close_all()
+
+def get_pool_stats() -> List[Dict[str, Any]]:
+    """Returns checkout, wait-time and open-connection stats for each pool."""
+    return [pool.stats() for pool in list(_pools.values())]
+
 
+# INSERT/UPDATE ... RETURNING (SQLite >= 3.35) hands back the written row from
+# the write itself. Older libraries fall back to a SELECT on the same cursor.
+HAS_RETURNING = sqlite3.sqlite_version_info >= (3, 35, 0)
+
+def _write_returning(cursor, table: str, sql: str, params, row_id: Optional[int] = None) -> Optional[Dict[str, Any]]:
+    """
+    Runs a single-row INSERT or UPDATE and returns the row as written, or None
+    if no row matched. `row_id` identifies the row for the UPDATE fallback.
+    """
+    if HAS_RETURNING:
+        cursor.execute(f"{sql} RETURNING *", params)
+        rows = cursor.fetchall()
+        return rows[0] if rows else None
+    cursor.execute(sql, params)
+    if cursor.rowcount == 0:
+        return None
+    cursor.execute(f"SELECT * FROM {table} WHERE id = ?", (row_id if row_id is not None else cursor.lastrowid,))
+    return cursor.fetchone()
+
+
+MIGRATIONS_DIR = Path(__file__).parent / "migrations"
+
+def _split_sql_statements(script: str) -> List[str]:
+    """Splits a SQL script into complete statements (trigger bodies stay intact)."""
+    statements = []
+    buffer = ""
+    for line in script.splitlines(keepends=True):
+        buffer += line
+        if sqlite3.complete_statement(buffer):
+            statement = buffer.strip()
+            if statement.rstrip(';').strip():
+                statements.append(statement)
+            buffer = ""
+    leftover = "\n".join(l for l in buffer.splitlines() if not l.strip().startswith('--')).strip()
+    if leftover:
+        raise sqlite3.ProgrammingError(f"Incomplete SQL statement: {leftover[:80]}")
+    return statements
+
+def _list_migrations() -> List[Dict[str, Any]]:
+    """
+    Returns migration files named NNNN_description.sql or NNNN_description.py,
+    ordered by version. Python migrations are for data moves SQL can't express.
+    """
+    migrations = []
+    if not MIGRATIONS_DIR.exists():
+        return migrations
+    paths = list(MIGRATIONS_DIR.glob("[0-9][0-9][0-9][0-9]_*.sql")) + list(MIGRATIONS_DIR.glob("[0-9][0-9][0-9][0-9]_*.py"))
+    for path in sorted(paths, key=lambda p: p.name):
+        migrations.append({"version": int(path.name[:4]), "name": path.stem, "path": path})
+    return migrations
+
+def _load_python_migration(path: Path):
+    """Imports a Python migration file and returns its upgrade(conn) function."""
+    spec = importlib.util.spec_from_file_location(f"lowdown_migration_{path.stem}", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.upgrade
+
+def apply_migrations(conn) -> List[str]:
+    """
+    Applies every migration newer than the recorded schema_version, each in
+    its own transaction. A Python migration's upgrade(conn) runs inside that
+    transaction and must not commit. Returns the names of the migrations applied.
+    """
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS schema_version (
+            version INTEGER PRIMARY KEY,
+            name TEXT NOT NULL,
+            applied_at DATETIME DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    conn.commit()
 
+    applied = []
+    for migration in _list_migrations():
+        if migration["path"].suffix == ".py":
+            upgrade = _load_python_migration(migration["path"])
+        else:
+            statements = _split_sql_statements(migration["path"].read_text())
+            upgrade = None
+        # Take the write lock first so two processes booting at once can't
+        # both decide the same migration is pending.
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute("SELECT 1 AS done FROM schema_version WHERE version = ?",
+                               (migration["version"],)).fetchone()
+            if row:
+                conn.rollback()
+                continue
+            if upgrade is not None:
+                upgrade(conn)
+            else:
+                for statement in statements:
+                    conn.execute(statement)
+            conn.execute("INSERT INTO schema_version (version, name) VALUES (?, ?)",
+                         (migration["version"], migration["name"]))
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        print(f"Applied migration {migration['name']}")
+        applied.append(migration["name"])
+    return applied
+
+def get_schema_version() -> int:
+    conn = get_db_connection()
+    try:
+        row = conn.execute("SELECT MAX(version) AS version FROM schema_version").fetchone()
+        return row['version'] or 0
+    except sqlite3.OperationalError:
+        return 0
+    finally:
+        conn.close()
 
 def init_db():
-    """Initializes the database from the schema.sql file."""
+    """
+    Initializes the database. The baseline schema.sql is only run on a
+    database that has never been versioned; after that, schema changes are
+    applied once each from database/migrations.
+    """
     try:
         print(f"Initializing database at: {DB_PATH}")
         schema_path = Path(__file__).parent / "schema.sql"
@@ -42,92 +197,479 @@ def init_db():
         conn = get_db_connection()
         cursor = conn.cursor()
         try:
-            with open(schema_path, 'r') as f:
-                cursor.executescript(f.read())
+            cursor.execute("SELECT name FROM sqlite_master WHERE type = 'table' AND name = 'schema_version'")
+            if not cursor.fetchone():
+                with open(schema_path, 'r') as f:
+                    cursor.executescript(f.read())
+                conn.commit()
+            apply_migrations(conn)
+            backfilled = _backfill_positions(cursor)
             conn.commit()
-            conn.close()
+            if backfilled:
+                print(f"Assigned positions to legacy rows: {backfilled}")
             print("Database initialized successfully")
             return True
         except Exception as e:
             print(f"ERROR: Failed to initialize database: {e}")
             return False
+        finally:
+            conn.close()
     except Exception as e:
         print(f"ERROR: Failed to initialize database: {e}")
         return False
 
+# --- Content Store ---
+# Scraped bodies live compressed in ContentBlobs (see content_store.py);
+# Articles/Snapshots only carry content_hash and original_content stays NULL.
+_SEARCH_ROWID_OFFSET = {'Articles': 0, 'Snapshots': 1}
+
+def _set_content(cursor, table: str, item_id: int, text: Optional[str], archived: bool = False) -> int:
+    """
+    Points a row (in the archive table if `archived`) at the stored blob for
+    `text` and feeds the body to the search index. Runs in the caller's
+    transaction; returns the rows updated.
+    """
+    digest = content_store.store_content(cursor, text)
+    if archived:
+        cursor.execute(f"UPDATE {ARCHIVE_TABLES[table]} SET content_hash = ? WHERE id = ?", (digest, item_id))
+    else:
+        cursor.execute(f"UPDATE {table} SET content_hash = ?, original_content = NULL WHERE id = ?", (digest, item_id))
+    updated = cursor.rowcount
+    cursor.execute("UPDATE SearchIndex SET original_content = ? WHERE rowid = ?",
+                   (text, item_id * 2 + _SEARCH_ROWID_OFFSET[table]))
+    return updated
+
+def get_content_store_stats() -> Dict[str, Any]:
+    """Reports blob count, references and bytes saved by compression and de-duplication."""
+    conn = get_db_connection()
+    try:
+        return content_store.store_stats(conn.cursor())
+    finally:
+        conn.close()
+
+# --- Archive (hot/cold split) ---
+# Archived rows live in ArchivedArticles/ArchivedSnapshots (migration 0008)
+# and keep their id; the working tables hold only the current issue's rows.
+ARCHIVE_TABLES = {'Articles': 'ArchivedArticles', 'Snapshots': 'ArchivedSnapshots'}
+_ARCHIVE_COLUMNS = {
+    'Articles': "id, url, url_hash, title, source, summary, content_hash, created_at",
+    'Snapshots': "id, url, url_hash, title, source, highlight, content_hash, created_at",
+}
+
+def _archive_rows(cursor, table: str, ids: List[int]) -> int:
+    """Moves rows from a working table into its archive table. Returns rows moved."""
+    if not ids:
+        return 0
+    columns = _ARCHIVE_COLUMNS[table]
+    placeholders = ','.join(['?'] * len(ids))
+    cursor.execute(
+        f"""INSERT INTO {ARCHIVE_TABLES[table]} ({columns}, status, updated_at)
+            SELECT {columns}, 'archived', CURRENT_TIMESTAMP FROM {table} WHERE id IN ({placeholders})""",
+        list(ids)
+    )
+    moved = cursor.rowcount
+    cursor.execute(f"DELETE FROM {table} WHERE id IN ({placeholders})", list(ids))
+    return moved
+
+def _unarchive_row(cursor, table: str, item_id: int, position: int, status: str = 'pending') -> bool:
+    """Moves an archived row back into its working table. Returns False if it wasn't archived."""
+    columns = _ARCHIVE_COLUMNS[table]
+    archive = ARCHIVE_TABLES[table]
+    cursor.execute(
+        f"""INSERT INTO {table} ({columns}, status, position, updated_at)
+            SELECT {columns}, ?, ?, CURRENT_TIMESTAMP FROM {archive} WHERE id = ?""",
+        (status, position, item_id)
+    )
+    if cursor.rowcount == 0:
+        return False
+    cursor.execute(f"DELETE FROM {archive} WHERE id = ?", (item_id,))
+    return True
+
+def _is_archived(cursor, table: str, item_id: int) -> bool:
+    cursor.execute(f"SELECT 1 FROM {ARCHIVE_TABLES[table]} WHERE id = ?", (item_id,))
+    return cursor.fetchone() is not None
+
+def _fetch_archived(cursor, table: str, item_id: int) -> Optional[Dict[str, Any]]:
+    cursor.execute(f"SELECT * FROM {ARCHIVE_TABLES[table]} WHERE id = ?", (item_id,))
+    return content_store.hydrate(cursor, cursor.fetchone())
+
+# Columns an edit can change on an archived row; position and tags only exist in the working tables.
+_ARCHIVE_EDITABLE = {
+    'Articles': ['url', 'title', 'source', 'summary'],
+    'Snapshots': ['url', 'title', 'source', 'highlight'],
+}
+
+def _update_archived_row(cursor, table: str, item_id: int, update_data: Dict[str, Any],
+                         content_given: bool, content: Optional[str]):
+    """
+    Applies an edit to an archived row where it is, so it keeps its
+    archived_at and the working list's revision and change feed are left
+    alone. Returns the updated (unhydrated) row.
+    """
+    archive = ARCHIVE_TABLES[table]
+    if content_given:
+        _set_content(cursor, table, item_id, content, archived=True)
+    fields, values = [], []
+    for key, value in update_data.items():
+        if key in _ARCHIVE_EDITABLE[table]:
+            fields.append(f"{key} = ?")
+            values.append(value)
+            if key == 'url':
+                fields.append("url_hash = ?")
+                values.append(url_hash(value))
+    if fields:
+        cursor.execute(f"UPDATE {archive} SET {', '.join(fields)}, updated_at = CURRENT_TIMESTAMP WHERE id = ?",
+                       values + [item_id])
+    cursor.execute(f"SELECT * FROM {archive} WHERE id = ?", (item_id,))
+    return cursor.fetchone()
+
+# --- Bulk Import ---
+BULK_IMPORT_MAX = 500
+
+def _bulk_add(table: str, urls: List[str], source: str, title_from_url: bool) -> List[Dict[str, Any]]:
+    """
+    Adds many URLs to Articles or Snapshots in one transaction. URLs are
+    de-duplicated by canonical url_hash, existing and archived rows are looked
+    up in one query each, the batch gets a contiguous run of positions after
+    the last active row (in paste order), and inserts use executemany. Returns
+    one {url, status, id} result per input URL, where status is 'created',
+    'unarchived', 'conflict', 'duplicate' or 'invalid'.
+    """
+    archive = ARCHIVE_TABLES[table]
+    results: List[Dict[str, Any]] = []
+    digests: List[Optional[str]] = []
+    batch: Dict[str, str] = {}  # url_hash -> first URL submitted with it, in paste order
+    for raw in urls:
+        url = (raw or "").strip()
+        digest = url_hash(url) if url else None
+        if not url:
+            results.append({"url": raw, "status": "invalid", "id": None})
+        elif digest in batch:
+            results.append({"url": url, "status": "duplicate", "id": None})
+        else:
+            batch[digest] = url
+            results.append({"url": url, "status": None, "id": None})
+        digests.append(digest)
+    if not batch:
+        return results
+
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    try:
+        hashes = list(batch)
+        placeholders = ','.join(['?'] * len(hashes))
+        cursor.execute(f"SELECT id, url_hash FROM {table} WHERE url_hash IN ({placeholders})", hashes)
+        active = {row['url_hash']: row['id'] for row in cursor.fetchall()}
+        cursor.execute(f"SELECT id, url_hash FROM {archive} WHERE url_hash IN ({placeholders})", hashes)
+        archived = {row['url_hash']: row['id'] for row in cursor.fetchall()}
+
+        pending = [digest for digest in hashes if digest not in active]
+        start = _position_after_last(cursor, table)
+        positions = {digest: start + i * POSITION_GAP for i, digest in enumerate(pending)}
+
+        columns = _ARCHIVE_COLUMNS[table]
+        cursor.executemany(
+            f"""INSERT INTO {table} ({columns}, status, position, updated_at)
+                SELECT {columns}, 'pending', ?, CURRENT_TIMESTAMP FROM {archive} WHERE id = ?""",
+            [(positions[digest], archived[digest]) for digest in pending if digest in archived]
+        )
+        cursor.executemany(
+            f"DELETE FROM {archive} WHERE id = ?",
+            [(archived[digest],) for digest in pending if digest in archived]
+        )
+        cursor.executemany(
+            f"INSERT INTO {table} (url, url_hash, title, source, status, position) VALUES (?, ?, ?, ?, 'pending', ?)",
+            [(batch[digest], digest, batch[digest] if title_from_url else "", source, positions[digest])
+             for digest in pending if digest not in archived]
+        )
+
+        new_ids = {}
+        if pending:
+            placeholders = ','.join(['?'] * len(pending))
+            cursor.execute(f"SELECT id, url_hash FROM {table} WHERE url_hash IN ({placeholders})", pending)
+            new_ids = {row['url_hash']: row['id'] for row in cursor.fetchall()}
+        conn.commit()
+    except sqlite3.Error as e:
+        print(f"Database error in bulk add to {table}: {e}")
+        conn.rollback()
+        conn.close()
+        raise
+    conn.close()
+
+    for result, digest in zip(results, digests):
+        if result['status'] is not None:
+            continue
+        if digest in active:
+            result.update(status="conflict", id=active[digest])
+        elif digest in archived:
+            result.update(status="unarchived", id=new_ids.get(digest))
+        else:
+            result.update(status="created", id=new_ids.get(digest))
+    return results
+
+def bulk_add_articles(urls: List[str], source: str = "Manual") -> List[Dict[str, Any]]:
+    """Bulk version of add_article. New articles are titled with their URL until summarized."""
+    return _bulk_add('Articles', urls, source, title_from_url=True)
+
+def bulk_add_snapshots(urls: List[str], source: str = "Manual") -> List[Dict[str, Any]]:
+    """Bulk version of add_snapshot."""
+    return _bulk_add('Snapshots', urls, source, title_from_url=False)
+
+# --- Bulk Status ---
+BULK_STATUS_MAX = 1000
+
+def _bulk_set_status(table: str, list_fields, ids: List[int], status: str) -> List[Dict[str, Any]]:
+    """
+    Sets `status` on many rows of Articles or Snapshots in one transaction and
+    returns the affected rows (list fields only). Archiving moves the rows to
+    the archive table; any other status brings archived rows back first, in
+    the given order, at the end of the list (articles) or the top (snapshots),
+    as the single-row updates do.
+    """
+    ids = list(dict.fromkeys(ids))
+    if not ids:
+        return []
+    archive = ARCHIVE_TABLES[table]
+    placeholders = ','.join(['?'] * len(ids))
+
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    try:
+        if status == 'archived':
+            cursor.execute(f"SELECT id FROM {table} WHERE id IN ({placeholders})", ids)
+            moving = [row['id'] for row in cursor.fetchall()]
+            _archive_rows(cursor, table, moving)
+            columns = ', '.join(f for f in list_fields if f != 'position')
+            placeholders = ','.join(['?'] * len(moving))
+            cursor.execute(f"SELECT {columns} FROM {archive} WHERE id IN ({placeholders}) ORDER BY id", moving)
+            rows = cursor.fetchall()
+        else:
+            cursor.execute(f"SELECT id FROM {archive} WHERE id IN ({placeholders})", ids)
+            found = {row['id'] for row in cursor.fetchall()}
+            restoring = [item_id for item_id in ids if item_id in found]
+            if restoring:
+                if table == 'Snapshots':
+                    start = _position_before_first(cursor, table) - (len(restoring) - 1) * POSITION_GAP
+                else:
+                    start = _position_after_last(cursor, table)
+                columns = _ARCHIVE_COLUMNS[table]
+                cursor.executemany(
+                    f"""INSERT INTO {table} ({columns}, status, position, updated_at)
+                        SELECT {columns}, ?, ?, CURRENT_TIMESTAMP FROM {archive} WHERE id = ?""",
+                    [(status, start + i * POSITION_GAP, item_id) for i, item_id in enumerate(restoring)]
+                )
+                cursor.executemany(f"DELETE FROM {archive} WHERE id = ?", [(item_id,) for item_id in restoring])
+
+            sql = f"UPDATE {table} SET status = ?, updated_at = CURRENT_TIMESTAMP WHERE id IN ({placeholders})"
+            columns = ', '.join(list_fields)
+            if HAS_RETURNING:
+                cursor.execute(f"{sql} RETURNING {columns}", [status] + ids)
+                rows = sorted(cursor.fetchall(), key=lambda row: row['id'])
+            else:
+                cursor.execute(sql, [status] + ids)
+                cursor.execute(f"SELECT {columns} FROM {table} WHERE id IN ({placeholders}) ORDER BY id", ids)
+                rows = cursor.fetchall()
+        conn.commit()
+        return rows
+    except sqlite3.Error as e:
+        print(f"Database error in bulk status update on {table}: {e}")
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+def bulk_update_article_status(article_ids: List[int], status: str) -> List[Dict[str, Any]]:
+    """Bulk version of update_article(id, status=...)."""
+    return _bulk_set_status('Articles', ARTICLE_LIST_FIELDS, article_ids, status)
+
+def bulk_update_snapshot_status(snapshot_ids: List[int], status: str) -> List[Dict[str, Any]]:
+    """Bulk version of update_snapshot(id, status=...)."""
+    return _bulk_set_status('Snapshots', SNAPSHOT_LIST_FIELDS, snapshot_ids, status)
+
+def get_collection_revision(table: str) -> int:
+    """Returns the write counter for Articles or Snapshots, used to build list ETags."""
+    conn = get_db_connection()
+    try:
+        row = conn.execute("SELECT revision FROM CollectionRevisions WHERE collection = ?", (table,)).fetchone()
+        return row['revision'] if row else 0
+    finally:
+        conn.close()
+
+# --- Change Feed ---
+# ChangeLog (migration 0007) is written by triggers, so every mutating
+# function here -- adds, updates, moves, deletes, rebalances -- is covered.
+CHANGE_LOG_RETENTION_DAYS = 7
+
+def _current_change_revision(cursor) -> int:
+    cursor.execute("SELECT seq FROM sqlite_sequence WHERE name = 'ChangeLog'")
+    row = cursor.fetchone()
+    return row['seq'] if row else 0
+
+def fetch_changes(table: str, since: int) -> Dict[str, Any]:
+    """
+    Returns the rows of `table` changed after revision `since` plus the ids
+    deleted since then. With since=0, or a revision older than the pruned
+    tombstones, every active row is returned and full_resync is set so the
+    client replaces its cache instead of patching it.
+    """
+    list_fields = ARTICLE_LIST_FIELDS if table == 'Articles' else SNAPSHOT_LIST_FIELDS
+    columns = ', '.join(list_fields)
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    try:
+        # One read transaction so the revision and rows come from the same snapshot.
+        cursor.execute("BEGIN")
+        revision = _current_change_revision(cursor)
+        cursor.execute("SELECT pruned_through FROM ChangeLogState WHERE id = 1")
+        pruned_through = cursor.fetchone()['pruned_through']
+
+        if since <= 0 or since < pruned_through:
+            cursor.execute(f"SELECT {columns} FROM {table} WHERE status != 'archived' ORDER BY {_LIST_ORDER[table]}")
+            return {"revision": revision, "full_resync": True, "changes": cursor.fetchall(), "deleted": []}
+
+        cursor.execute(
+            f"""SELECT {columns} FROM {table} WHERE id IN (
+                    SELECT item_id FROM ChangeLog WHERE collection = ? AND op = 'upsert' AND revision > ?
+                ) ORDER BY {_LIST_ORDER[table]}""",
+            (table, since)
+        )
+        changes = cursor.fetchall()
+        cursor.execute(
+            "SELECT item_id FROM ChangeLog WHERE collection = ? AND op = 'delete' AND revision > ? ORDER BY revision",
+            (table, since)
+        )
+        deleted = [row['item_id'] for row in cursor.fetchall()]
+        return {"revision": revision, "full_resync": False, "changes": changes, "deleted": deleted}
+    finally:
+        conn.close()
+
+def prune_change_log(retention_days: int = CHANGE_LOG_RETENTION_DAYS) -> int:
+    """Drops tombstones older than the retention window. Returns how many were removed."""
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    try:
+        cutoff = f"{-int(retention_days):+d} days"
+        cursor.execute(
+            "SELECT MAX(revision) AS through FROM ChangeLog WHERE op = 'delete' AND changed_at < datetime('now', ?)",
+            (cutoff,)
+        )
+        through = cursor.fetchone()['through']
+        if through is None:
+            return 0
+        cursor.execute("DELETE FROM ChangeLog WHERE op = 'delete' AND revision <= ?", (through,))
+        removed = cursor.rowcount
+        cursor.execute("UPDATE ChangeLogState SET pruned_through = MAX(pruned_through, ?) WHERE id = 1", (through,))
+        conn.commit()
+        return removed
+    except sqlite3.Error as e:
+        print(f"Database error in prune_change_log: {e}")
+        return 0
+    finally:
+        conn.close()
+
 # --- Article Functions ---
-def fetch_all_articles() -> List[Dict[str, Any]]:
-    """Fetches all non-archived articles from the database, ordered by position."""
+# Columns returned by the list endpoints. original_content is deliberately
+# left out; it is only loaded for single-item reads.
+ARTICLE_LIST_FIELDS = ('id', 'url', 'title', 'source', 'summary', 'status', 'position', 'created_at', 'updated_at')
+SNAPSHOT_LIST_FIELDS = ('id', 'url', 'title', 'source', 'highlight', 'status', 'position', 'created_at', 'updated_at')
+
+def _fetch_active_page(table: str, list_fields, limit: Optional[int] = None,
+                       after: Optional[Tuple[int, int]] = None,
+                       fields: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+    """
+    Fetches active rows in list order using keyset pagination on (position, id).
+    `after` is the (position, id) of the last row of the previous page.
+    id and position are always returned so the caller can build the next cursor.
+    """
+    columns = ['id', 'position'] + [f for f in (fields or list_fields) if f in list_fields and f not in ('id', 'position')]
+    order = _LIST_ORDER[table]
+    where = "status != 'archived'"
+    params: List[Any] = []
+
     conn = get_db_connection()
     cursor = conn.cursor()
-    cursor.execute("SELECT * FROM Articles WHERE status != 'archived' ORDER BY position ASC")
-    articles = cursor.fetchall()
+    rank_base = 0
+    if after is not None:
+        after_position, after_id = after
+        cursor.execute(
+            f"SELECT COUNT(*) AS seen FROM {table} WHERE {where} AND (position < ? OR (position = ? AND id <= ?))",
+            (after_position, after_position, after_id)
+        )
+        rank_base = cursor.fetchone()['seen']
+        where += " AND (position > ? OR (position = ? AND id > ?))"
+        params += [after_position, after_position, after_id]
+
+    sql = f"""
+        SELECT {', '.join(columns)}, ? + ROW_NUMBER() OVER (ORDER BY {order}) AS rank
+        FROM {table} WHERE {where} ORDER BY {order}
+    """
+    if limit is not None:
+        sql += " LIMIT ?"
+        params.append(limit)
+    cursor.execute(sql, [rank_base] + params)
+    rows = cursor.fetchall()
     conn.close()
-    return articles
+    return rows
+
+def fetch_all_articles(limit: Optional[int] = None, after: Optional[Tuple[int, int]] = None,
+                       fields: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+    """Fetches non-archived articles ordered by position, optionally one keyset page at a time."""
+    return _fetch_active_page('Articles', ARTICLE_LIST_FIELDS, limit=limit, after=after, fields=fields)
 
 def get_articles_by_status(status: str):
     """Fetches all articles with the specified status."""
     conn = get_db_connection()
     cursor = conn.cursor()
-    cursor.execute("SELECT * FROM Articles WHERE status = ? ORDER BY position", (status,))
+    if status == 'archived':
+        cursor.execute("SELECT * FROM ArchivedArticles ORDER BY archived_at DESC")
+    else:
+        cursor.execute("SELECT * FROM Articles WHERE status = ? ORDER BY position", (status,))
     articles = cursor.fetchall()
     conn.close()
     return articles
 
 def add_article(url: str, title: str = "", source: str = "", summary: str = "", status: str = "pending", position: Optional[int] = None) -> Optional[Dict[str, Any]]:
     """
-    Adds a new article. If an article with the same URL exists and is
-    archived, it un-archives it by setting its status to 'pending' and
-    moving it to the top of the list. Otherwise, it returns None for conflicts.
+    Adds a new article. If an article with the same URL is archived, it is
+    moved back from ArchivedArticles as 'pending' at the end of the list,
+    keeping its id. An active duplicate returns None for conflicts.
     """
     conn = get_db_connection()
     cursor = conn.cursor()
 
-    # Check if an article with this URL already exists
-    cursor.execute("SELECT * FROM Articles WHERE url = ?", (url,))
+    # An active article with the same canonical URL is a conflict
+    digest = url_hash(url)
+    cursor.execute("SELECT id FROM Articles WHERE url_hash = ?", (digest,))
+    if cursor.fetchone():
+        conn.close()
+        return None
+
+    # If it was archived, move it back after the last active article and
+    # return the now-active article.
+    cursor.execute("SELECT id FROM ArchivedArticles WHERE url_hash = ?", (digest,))
     existing_article = cursor.fetchone()
 
     if existing_article:
-        # If it exists and is archived, un-archive it.
-        if existing_article['status'] == 'archived':
-            # Get the highest position to move this article to the top.
-            cursor.execute("SELECT MAX(position) as max_pos FROM Articles WHERE status != 'archived'")
-            max_pos_row = cursor.fetchone()
-            max_pos = max_pos_row['max_pos'] if max_pos_row and max_pos_row['max_pos'] is not None else 0
-            new_position = max_pos + 1
-
-            # Update status to 'pending' and set new position
-            cursor.execute(
-                "UPDATE Articles SET status = 'pending', position = ?, updated_at = CURRENT_TIMESTAMP WHERE id = ?",
-                (new_position, existing_article['id'])
-            )
-            conn.commit()
-            
-            # Return the now-active article
-            updated_article = get_article_by_id(existing_article['id'])
-            conn.close()
-            return updated_article
-        else:
-            # Article exists and is already active, so it's a conflict.
-            conn.close()
-            return None
+        _unarchive_row(cursor, 'Articles', existing_article['id'], _position_after_last(cursor, 'Articles'))
+        conn.commit()
+        cursor.execute("SELECT * FROM Articles WHERE id = ?", (existing_article['id'],))
+        updated_article = content_store.hydrate(cursor, cursor.fetchone())
+        conn.close()
+        return updated_article
     else:
         # Article doesn't exist, so create it.
         if position is None:
-            cursor.execute("SELECT MAX(position) as max_pos FROM Articles")
-            max_pos_row = cursor.fetchone()
-            max_pos = max_pos_row['max_pos'] if max_pos_row and max_pos_row['max_pos'] is not None else 0
-            position = max_pos + 1
+            position = _position_after_last(cursor, 'Articles')
 
         try:
-            cursor.execute(
-                "INSERT INTO Articles (url, title, source, summary, status, position) VALUES (?, ?, ?, ?, ?, ?)",
-                (url, title, source, summary, status, position),
+            new_article = _write_returning(
+                cursor, 'Articles',
+                "INSERT INTO Articles (url, url_hash, title, source, summary, status, position) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (url, digest, title, source, summary, status, position),
             )
             conn.commit()
-            article_id = cursor.lastrowid
             conn.close()
-            return get_article_by_id(article_id)
+            return new_article
         except sqlite3.IntegrityError:  # Safeguard
             conn.close()
             return None
@@ -136,7 +678,9 @@ def get_article_by_id(article_id: int) -> Optional[Dict[str, Any]]:
     conn = get_db_connection()
     cursor = conn.cursor()
     cursor.execute("SELECT * FROM Articles WHERE id = ?", (article_id,))
-    article = cursor.fetchone()
+    article = content_store.hydrate(cursor, cursor.fetchone())
+    if article is None:
+        article = _fetch_archived(cursor, 'Articles', article_id)
     conn.close()
     return article
 
@@ -144,23 +688,23 @@ def update_article_summary(article_id: int, summary: str, original_content: str)
     conn = get_db_connection()
     cursor = conn.cursor()
     try:
-        cursor.execute(
+        if _set_content(cursor, 'Articles', article_id, original_content) == 0:
+            conn.close()
+            return None
+        updated_article = _write_returning(
+            cursor, 'Articles',
             """UPDATE Articles 
-               SET summary = ?, original_content = ?, status = 'summarized', updated_at = CURRENT_TIMESTAMP
+               SET summary = ?, status = 'summarized', updated_at = CURRENT_TIMESTAMP
                WHERE id = ?""",
-            (summary, original_content, article_id)
+            (summary, article_id),
+            row_id=article_id
         )
         conn.commit()
     except sqlite3.Error:
         conn.close()
         return None
 
-    if cursor.rowcount == 0:
-        conn.close()
-        return None
-
-    cursor.execute("SELECT * FROM Articles WHERE id = ?", (article_id,))
-    updated_article = cursor.fetchone()
+    updated_article = content_store.hydrate(cursor, updated_article)
     conn.close()
     return updated_article
 
@@ -170,49 +714,76 @@ def update_article(article_id: int, **update_data) -> Optional[Dict[str, Any]]:
     if not update_data:
         return get_article_by_id(article_id)
 
+    # The body goes to the content store rather than an inline column.
+    content_given = 'original_content' in update_data
+    content = update_data.pop('original_content', None)
+
     conn = get_db_connection()
     cursor = conn.cursor()
 
     fields = []
     values = []
     for key, value in update_data.items():
-        if key in ['url', 'title', 'source', 'original_content', 'summary', 'status', 'tags', 'position']:
+        if key in ['url', 'title', 'source', 'summary', 'status', 'tags', 'position']:
             fields.append(f"{key} = ?")
             values.append(value)
+            if key == 'url':
+                fields.append("url_hash = ?")
+                values.append(url_hash(value))
 
-    if not fields:
+    if not fields and not content_given:
         conn.close()
         return get_article_by_id(article_id)
 
-    fields.append("updated_at = CURRENT_TIMESTAMP")
-    
-    sql = f"UPDATE Articles SET {', '.join(fields)} WHERE id = ?"
-    values.append(article_id)
-
     try:
-        cursor.execute(sql, tuple(values))
+        archived = _is_archived(cursor, 'Articles', article_id)
+        if archived and update_data.get('status', 'archived') == 'archived':
+            # Edits to an archived row are made in the archive table; it only
+            # moves when its status changes.
+            updated_article = _update_archived_row(cursor, 'Articles', article_id, update_data, content_given, content)
+        else:
+            if archived:
+                _unarchive_row(cursor, 'Articles', article_id, _position_after_last(cursor, 'Articles'))
+            # Content first, so the row returned by the field update already
+            # carries the new content_hash.
+            if content_given and _set_content(cursor, 'Articles', article_id, content) == 0:
+                conn.close()
+                return None
+            if fields:
+                fields.append("updated_at = CURRENT_TIMESTAMP")
+                values.append(article_id)
+                updated_article = _write_returning(
+                    cursor, 'Articles', f"UPDATE Articles SET {', '.join(fields)} WHERE id = ?", tuple(values), row_id=article_id
+                )
+            else:
+                cursor.execute("SELECT * FROM Articles WHERE id = ?", (article_id,))
+                updated_article = cursor.fetchone()
+            if updated_article is not None and update_data.get('status') == 'archived':
+                _archive_rows(cursor, 'Articles', [article_id])
+                cursor.execute("SELECT * FROM ArchivedArticles WHERE id = ?", (article_id,))
+                updated_article = cursor.fetchone()
+        if updated_article is None:
+            conn.close()
+            return None
         conn.commit()
     except sqlite3.Error:
         conn.close()
         return None
 
-    if cursor.rowcount == 0:
-        conn.close()
-        return None
-
-    cursor.execute("SELECT * FROM Articles WHERE id = ?", (article_id,))
-    updated_article = cursor.fetchone()
+    updated_article = content_store.hydrate(cursor, updated_article)
     conn.close()
     return updated_article
 
 
 def delete_article(article_id: int) -> bool:
-    """Deletes an article by its ID and re-indexes the positions of remaining articles."""
+    """Deletes an article by its ID. Remaining positions are sparse, so nothing is renumbered."""
     conn = get_db_connection()
     cursor = conn.cursor()
     try:
-        # Delete the article itself
+        # Delete the article itself, wherever it lives
         cursor.execute("DELETE FROM Articles WHERE id = ?", (article_id,))
+        if cursor.rowcount == 0:
+            cursor.execute("DELETE FROM ArchivedArticles WHERE id = ?", (article_id,))
         
         if cursor.rowcount == 0:
             conn.close()
@@ -222,13 +793,6 @@ def delete_article(article_id: int) -> bool:
         # If it's added in the future, uncomment the line below:
         # cursor.execute("DELETE FROM NewsletterArticles WHERE article_id = ?", (article_id,))
 
-        # Re-index the positions of the remaining non-archived articles
-        cursor.execute("SELECT id FROM Articles WHERE status != 'archived' ORDER BY position ASC")
-        remaining_articles = cursor.fetchall()
-        
-        for i, article in enumerate(remaining_articles):
-            cursor.execute("UPDATE Articles SET position = ? WHERE id = ?", (i + 1, article['id']))
-            
         conn.commit()
         conn.close()
         return True
@@ -238,79 +802,65 @@ def delete_article(article_id: int) -> bool:
         return False
 
 # --- Snapshot Functions ---
-def fetch_all_snapshots():
-    """Fetches all non-archived snapshots from the database, ordered by position."""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    cursor.execute("SELECT * FROM Snapshots WHERE status != 'archived' ORDER BY position ASC, created_at DESC")
-    snapshots = cursor.fetchall()
-    conn.close()
-    return snapshots
+def fetch_all_snapshots(limit: Optional[int] = None, after: Optional[Tuple[int, int]] = None,
+                        fields: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+    """Fetches non-archived snapshots ordered by position, optionally one keyset page at a time."""
+    return _fetch_active_page('Snapshots', SNAPSHOT_LIST_FIELDS, limit=limit, after=after, fields=fields)
 
 def get_snapshots_by_status(status: str):
     """Fetches all snapshots with the specified status."""
     conn = get_db_connection()
     cursor = conn.cursor()
-    cursor.execute("SELECT * FROM Snapshots WHERE status = ? ORDER BY position", (status,))
+    if status == 'archived':
+        cursor.execute("SELECT * FROM ArchivedSnapshots ORDER BY archived_at DESC")
+    else:
+        cursor.execute("SELECT * FROM Snapshots WHERE status = ? ORDER BY position", (status,))
     snapshots = cursor.fetchall()
     conn.close()
     return snapshots
 
 def add_snapshot(url: str, title: str = "", source: str = "", highlight: str = "", status: str = "pending", position: Optional[int] = None) -> Optional[Dict[str, Any]]:
     """
-    Adds a new snapshot. If a snapshot with the same URL exists and is
-    archived, it un-archives it by setting its status to 'pending' and
-    moving it to the top of the list. Otherwise, it returns None for conflicts.
+    Adds a new snapshot. If a snapshot with the same URL is archived, it is
+    moved back from ArchivedSnapshots as 'pending' at the top of the list,
+    keeping its id. An active duplicate returns None for conflicts.
     """
     conn = get_db_connection()
     cursor = conn.cursor()
     
-    # Check if URL already exists
-    cursor.execute("SELECT * FROM Snapshots WHERE url = ?", (url,))
+    # An active snapshot with the same canonical URL is a conflict
+    digest = url_hash(url)
+    cursor.execute("SELECT id FROM Snapshots WHERE url_hash = ?", (digest,))
+    if cursor.fetchone():
+        conn.close()
+        return None
+
+    cursor.execute("SELECT id FROM ArchivedSnapshots WHERE url_hash = ?", (digest,))
     existing = cursor.fetchone()
     
     if existing:
-        if existing['status'] == 'archived':
-            # Un-archive and move to top
-            cursor.execute(
-                "UPDATE Snapshots SET status = 'pending', position = 1, updated_at = CURRENT_TIMESTAMP WHERE url = ?",
-                (url,)
-            )
-            # Shift other snapshots down
-            cursor.execute(
-                "UPDATE Snapshots SET position = position + 1 WHERE url != ? AND position >= 1",
-                (url,)
-            )
-            conn.commit()
-            
-            # Return the updated snapshot
-            cursor.execute("SELECT * FROM Snapshots WHERE url = ?", (url,))
-            updated_snapshot = cursor.fetchone()
-            conn.close()
-            return updated_snapshot
-        else:
-            # URL already exists and is not archived
-            conn.close()
-            return None
+        # Un-archive and move to top, ahead of the first active snapshot
+        _unarchive_row(cursor, 'Snapshots', existing['id'], _position_before_first(cursor, 'Snapshots'))
+        conn.commit()
+        
+        # Return the updated snapshot
+        cursor.execute("SELECT * FROM Snapshots WHERE id = ?", (existing['id'],))
+        updated_snapshot = content_store.hydrate(cursor, cursor.fetchone())
+        conn.close()
+        return updated_snapshot
     
     # Determine position
     if position is None:
-        cursor.execute("SELECT MAX(position) as max_pos FROM Snapshots WHERE status != 'archived'")
-        result = cursor.fetchone()
-        position = (result['max_pos'] or 0) + 1
+        position = _position_after_last(cursor, 'Snapshots')
     
-    # Insert new snapshot
+    # Insert new snapshot and return it
     try:
-        cursor.execute(
-            "INSERT INTO Snapshots (url, title, source, highlight, status, position) VALUES (?, ?, ?, ?, ?, ?)",
-            (url, title, source, highlight, status, position)
+        new_snapshot = _write_returning(
+            cursor, 'Snapshots',
+            "INSERT INTO Snapshots (url, url_hash, title, source, highlight, status, position) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (url, digest, title, source, highlight, status, position)
         )
         conn.commit()
-        snapshot_id = cursor.lastrowid
-        
-        # Return the newly created snapshot
-        cursor.execute("SELECT * FROM Snapshots WHERE id = ?", (snapshot_id,))
-        new_snapshot = cursor.fetchone()
         conn.close()
         return new_snapshot
     except sqlite3.Error as e:
@@ -322,7 +872,9 @@ def get_snapshot_by_id(snapshot_id: int) -> Optional[Dict[str, Any]]:
     conn = get_db_connection()
     cursor = conn.cursor()
     cursor.execute("SELECT * FROM Snapshots WHERE id = ?", (snapshot_id,))
-    snapshot = cursor.fetchone()
+    snapshot = content_store.hydrate(cursor, cursor.fetchone())
+    if snapshot is None:
+        snapshot = _fetch_archived(cursor, 'Snapshots', snapshot_id)
     conn.close()
     return snapshot
 
@@ -332,11 +884,13 @@ def update_snapshot_highlight(snapshot_id: int, highlight: str, original_content
     cursor = conn.cursor()
     try:
         cursor.execute(
-            "UPDATE Snapshots SET highlight = ?, original_content = ?, status = 'highlighted', updated_at = CURRENT_TIMESTAMP WHERE id = ?",
-            (highlight, original_content, snapshot_id)
+            "UPDATE Snapshots SET highlight = ?, status = 'highlighted', updated_at = CURRENT_TIMESTAMP WHERE id = ?",
+            (highlight, snapshot_id)
         )
-        conn.commit()
         success = cursor.rowcount > 0
+        if success:
+            _set_content(cursor, 'Snapshots', snapshot_id, original_content)
+            conn.commit()
         conn.close()
         return success
     except sqlite3.Error as e:
@@ -349,66 +903,79 @@ def update_snapshot(snapshot_id: int, **update_data) -> Optional[Dict[str, Any]]
     if not update_data:
         return get_snapshot_by_id(snapshot_id)
 
+    # The body goes to the content store rather than an inline column.
+    content_given = 'original_content' in update_data
+    content = update_data.pop('original_content', None)
+
     conn = get_db_connection()
     cursor = conn.cursor()
 
     fields = []
     values = []
     for key, value in update_data.items():
-        if key in ['url', 'title', 'source', 'original_content', 'highlight', 'status', 'position']:
+        if key in ['url', 'title', 'source', 'highlight', 'status', 'position']:
             fields.append(f"{key} = ?")
             values.append(value)
+            if key == 'url':
+                fields.append("url_hash = ?")
+                values.append(url_hash(value))
 
-    if not fields:
+    if not fields and not content_given:
         conn.close()
         return get_snapshot_by_id(snapshot_id)
 
-    fields.append("updated_at = CURRENT_TIMESTAMP")
-    
-    sql = f"UPDATE Snapshots SET {', '.join(fields)} WHERE id = ?"
-    values.append(snapshot_id)
-
     try:
-        cursor.execute(sql, tuple(values))
+        archived = _is_archived(cursor, 'Snapshots', snapshot_id)
+        if archived and update_data.get('status', 'archived') == 'archived':
+            # Edits to an archived row are made in the archive table; it only
+            # moves when its status changes.
+            updated_snapshot = _update_archived_row(cursor, 'Snapshots', snapshot_id, update_data, content_given, content)
+        else:
+            if archived:
+                _unarchive_row(cursor, 'Snapshots', snapshot_id, _position_before_first(cursor, 'Snapshots'))
+            # Content first, so the row returned by the field update already
+            # carries the new content_hash.
+            if content_given and _set_content(cursor, 'Snapshots', snapshot_id, content) == 0:
+                conn.close()
+                return None
+            if fields:
+                fields.append("updated_at = CURRENT_TIMESTAMP")
+                values.append(snapshot_id)
+                updated_snapshot = _write_returning(
+                    cursor, 'Snapshots', f"UPDATE Snapshots SET {', '.join(fields)} WHERE id = ?", tuple(values), row_id=snapshot_id
+                )
+            else:
+                cursor.execute("SELECT * FROM Snapshots WHERE id = ?", (snapshot_id,))
+                updated_snapshot = cursor.fetchone()
+            if updated_snapshot is not None and update_data.get('status') == 'archived':
+                _archive_rows(cursor, 'Snapshots', [snapshot_id])
+                cursor.execute("SELECT * FROM ArchivedSnapshots WHERE id = ?", (snapshot_id,))
+                updated_snapshot = cursor.fetchone()
+        if updated_snapshot is None:
+            conn.close()
+            return None
         conn.commit()
     except sqlite3.Error:
         conn.close()
         return None
 
-    if cursor.rowcount == 0:
-        conn.close()
-        return None
-
-    cursor.execute("SELECT * FROM Snapshots WHERE id = ?", (snapshot_id,))
-    updated_snapshot = cursor.fetchone()
+    updated_snapshot = content_store.hydrate(cursor, updated_snapshot)
     conn.close()
     return updated_snapshot
 
 def delete_snapshot(snapshot_id: int) -> bool:
-    """Deletes a snapshot by its ID and re-indexes the positions of remaining snapshots."""
+    """Deletes a snapshot by its ID. Remaining positions are sparse, so nothing is renumbered."""
     conn = get_db_connection()
     cursor = conn.cursor()
     
     try:
-        # Get the position of the snapshot to be deleted
-        cursor.execute("SELECT position FROM Snapshots WHERE id = ?", (snapshot_id,))
-        result = cursor.fetchone()
-        if not result:
+        cursor.execute("DELETE FROM Snapshots WHERE id = ?", (snapshot_id,))
+        if cursor.rowcount == 0:
+            cursor.execute("DELETE FROM ArchivedSnapshots WHERE id = ?", (snapshot_id,))
+        if cursor.rowcount == 0:
             conn.close()
             return False
         
-        deleted_position = result['position']
-        
-        # Delete the snapshot
-        cursor.execute("DELETE FROM Snapshots WHERE id = ?", (snapshot_id,))
-        
-        # Re-index positions of remaining snapshots
-        if deleted_position:
-            cursor.execute(
-                "UPDATE Snapshots SET position = position - 1 WHERE position > ?",
-                (deleted_position,)
-            )
-        
         conn.commit()
         conn.close()
         return True
@@ -417,6 +984,51 @@ def delete_snapshot(snapshot_id: int) -> bool:
         conn.close()
         return False
 
+# --- Search Functions ---
+# bm25 weights follow the SearchIndex column order:
+# kind, item_id, status, title, body, source, original_content
+_SEARCH_WEIGHTS = "0.0, 0.0, 0.0, 10.0, 5.0, 2.0, 1.0"
+
+def _fts_match_expression(query: str) -> str:
+    """Turns free text into an FTS5 expression: every word must match, as a prefix."""
+    terms = re.findall(r"\w+", query)
+    return " ".join(f'"{term}"*' for term in terms)
+
+def search_content(query: str, kind: Optional[str] = None, include_archived: bool = False,
+                   limit: int = 20, offset: int = 0) -> Dict[str, Any]:
+    """
+    Full-text search over articles and snapshots, ranked by BM25.
+    Returns the total match count plus one page of results with snippets.
+    """
+    match = _fts_match_expression(query)
+    if not match:
+        return {"total": 0, "results": []}
+
+    filters = "SearchIndex MATCH ?"
+    params: List[Any] = [match]
+    if kind:
+        filters += " AND kind = ?"
+        params.append(kind)
+    if not include_archived:
+        filters += " AND status != 'archived'"
+
+    conn = get_db_connection()
+    try:
+        total = conn.execute(f"SELECT COUNT(*) AS total FROM SearchIndex WHERE {filters}", params).fetchone()['total']
+        results = conn.execute(f"""
+            SELECT kind, item_id AS id, title, source, status,
+                   snippet(SearchIndex, -1, '**', '**', '…', 16) AS snippet,
+                   bm25(SearchIndex, {_SEARCH_WEIGHTS}) AS score
+            FROM SearchIndex WHERE {filters}
+            ORDER BY score LIMIT ? OFFSET ?
+        """, params + [limit, offset]).fetchall()
+        return {"total": total, "results": results}
+    except sqlite3.Error as e:
+        print(f"Database error in search_content: {e}")
+        return {"total": 0, "results": []}
+    finally:
+        conn.close()
+
 # --- Threat Functions ---
 def _parse_threat_json_fields(threat: Dict[str, Any]) -> Dict[str, Any]:
     if threat:
@@ -440,7 +1052,8 @@ def add_threat(threat_data) -> Optional[Dict[str, Any]]:
     conn = get_db_connection()
     cursor = conn.cursor()
     try:
-        cursor.execute(
+        new_threat = _write_returning(
+            cursor, 'Threats',
             """
             INSERT INTO Threats (name, type, country_of_origin, description, specifications, operators)
             VALUES (?, ?, ?, ?, ?, ?)
@@ -455,17 +1068,10 @@ def add_threat(threat_data) -> Optional[Dict[str, Any]]:
             ),
         )
         conn.commit()
-        new_id = cursor.lastrowid
     except sqlite3.Error:
         conn.close()
         return None
 
-    if new_id is None:
-        conn.close()
-        return None
-
-    cursor.execute("SELECT * FROM Threats WHERE id = ?", (new_id,))
-    new_threat = cursor.fetchone()
     conn.close()
     return _parse_threat_json_fields(new_threat)
 
@@ -485,9 +1091,6 @@ def update_threat(threat_id: int, update_data: Dict[str, Any]) -> Optional[Dict[
     if not update_data:
         return get_threat_by_id(threat_id)
 
-    conn = get_db_connection()
-    cursor = conn.cursor()
-
     fields = []
     values = []
     valid_fields = ['name', 'type', 'country_of_origin', 'description', 'specifications', 'operators', 'ioc_year', 'image_url', 'status', 'tod_summary']
@@ -500,25 +1103,23 @@ def update_threat(threat_id: int, update_data: Dict[str, Any]) -> Optional[Dict[
                 values.append(value)
 
     if not fields:
-        conn.close()
         return get_threat_by_id(threat_id)
 
     fields.append("updated_at = CURRENT_TIMESTAMP")
     sql = f"UPDATE Threats SET {', '.join(fields)} WHERE id = ?"
     values.append(threat_id)
 
+    conn = get_db_connection()
+    cursor = conn.cursor()
     try:
-        cursor.execute(sql, tuple(values))
+        updated_threat = _write_returning(cursor, 'Threats', sql, tuple(values), row_id=threat_id)
         conn.commit()
     except sqlite3.Error:
         conn.close()
         return None
 
-    if cursor.rowcount == 0:
-        conn.close()
-        return None
-
-    return get_threat_by_id(threat_id)
+    conn.close()
+    return _parse_threat_json_fields(updated_threat)
 
 
 def delete_threat(threat_id: int) -> bool:
@@ -552,7 +1153,8 @@ def add_podcast_episode(episode_data) -> Optional[Dict[str, Any]]:
     conn = get_db_connection()
     cursor = conn.cursor()
     try:
-        cursor.execute(
+        new_episode = _write_returning(
+            cursor, 'PodcastEpisodes',
             """
             INSERT INTO PodcastEpisodes (title, podcast_url, description, published_date, image_url)
             VALUES (?, ?, ?, ?, ?)
@@ -566,17 +1168,10 @@ def add_podcast_episode(episode_data) -> Optional[Dict[str, Any]]:
             ),
         )
         conn.commit()
-        new_id = cursor.lastrowid
     except sqlite3.Error:
         conn.close()
         return None
 
-    if new_id is None:
-        conn.close()
-        return None
-
-    cursor.execute("SELECT * FROM PodcastEpisodes WHERE id = ?", (new_id,))
-    new_episode = cursor.fetchone()
     conn.close()
     return new_episode
 
@@ -596,9 +1191,6 @@ def update_podcast_episode(episode_id: int, update_data: Dict[str, Any]) -> Opti
     if not update_data:
         return get_podcast_episode_by_id(episode_id)
 
-    conn = get_db_connection()
-    cursor = conn.cursor()
-
     fields = []
     values = []
     valid_fields = ['title', 'podcast_url', 'description', 'published_date', 'image_url']
@@ -608,25 +1200,23 @@ def update_podcast_episode(episode_id: int, update_data: Dict[str, Any]) -> Opti
             values.append(value)
 
     if not fields:
-        conn.close()
         return get_podcast_episode_by_id(episode_id)
 
     fields.append("updated_at = CURRENT_TIMESTAMP")
     sql = f"UPDATE PodcastEpisodes SET {', '.join(fields)} WHERE id = ?"
     values.append(episode_id)
 
+    conn = get_db_connection()
+    cursor = conn.cursor()
     try:
-        cursor.execute(sql, tuple(values))
+        updated_episode = _write_returning(cursor, 'PodcastEpisodes', sql, tuple(values), row_id=episode_id)
         conn.commit()
     except sqlite3.Error:
         conn.close()
         return None
 
-    if cursor.rowcount == 0:
-        conn.close()
-        return None
-
-    return get_podcast_episode_by_id(episode_id)
+    conn.close()
+    return updated_episode
 
 
 def delete_podcast_episode(episode_id: int) -> bool:
@@ -710,10 +1300,8 @@ def archive_newsletter_issue(issue_id: int) -> bool:
         # Update the newsletter issue status to 'archived'
         cursor.execute("UPDATE NewsletterIssues SET status = 'archived' WHERE id = ?", (issue_id,))
         
-        # Update the status of all associated articles to 'archived'
-        if article_ids:
-            placeholders = ','.join(['?'] * len(article_ids))
-            cursor.execute(f"UPDATE Articles SET status = 'archived' WHERE id IN ({placeholders})", article_ids)
+        # Move all associated articles to the archive
+        _archive_rows(cursor, 'Articles', article_ids)
         
         conn.commit()
         return True
@@ -765,137 +1353,449 @@ def fetch_full_newsletter_issue(issue_id: int):
     finally:
         conn.close()
 
-# --- Position Update Functions for Drag-and-Drop ---
-def update_article_position(article_id: int, new_position: int) -> bool:
-    """Update the position of a specific article for drag-and-drop reordering."""
+# --- Job Functions ---
+# Jobs and JobItems (migration 0010) back services/job_queue.py. Every state
+# change goes through these functions, which keep Jobs.status in step with
+# its items.
+JOB_TERMINAL_STATUSES = ('completed', 'partial', 'failed')
+
+def _refresh_job_status(cursor, job_id: int):
+    cursor.execute("""
+        SELECT COUNT(*) AS total,
+               COALESCE(SUM(status = 'queued'), 0) AS queued,
+               COALESCE(SUM(status = 'running'), 0) AS running,
+               COALESCE(SUM(status = 'done'), 0) AS done,
+               COALESCE(SUM(status = 'failed'), 0) AS failed
+        FROM JobItems WHERE job_id = ?
+    """, (job_id,))
+    counts = cursor.fetchone()
+    if counts['queued'] or counts['running']:
+        status = 'running' if counts['running'] or counts['done'] or counts['failed'] else 'queued'
+    elif counts['failed'] == 0:
+        status = 'completed'
+    else:
+        status = 'failed' if counts['done'] == 0 else 'partial'
+    finished = "CURRENT_TIMESTAMP" if status in JOB_TERMINAL_STATUSES else "NULL"
+    cursor.execute(
+        f"UPDATE Jobs SET status = ?, updated_at = CURRENT_TIMESTAMP, finished_at = {finished} WHERE id = ?",
+        (status, job_id)
+    )
+
+def create_job(kind: str, item_ids: List[int]) -> Dict[str, Any]:
+    """Queues a job with one item per id and returns it as get_job would."""
+    item_ids = list(dict.fromkeys(item_ids))
     conn = get_db_connection()
     cursor = conn.cursor()
-    
     try:
-        # First, check if the article exists
-        cursor.execute("SELECT position FROM articles WHERE id = ? AND status != 'archived'", (article_id,))
-        current_article = cursor.fetchone()
-        
-        if not current_article:
+        cursor.execute("INSERT INTO Jobs (kind, total) VALUES (?, ?)", (kind, len(item_ids)))
+        job_id = cursor.lastrowid
+        cursor.executemany(
+            "INSERT INTO JobItems (job_id, item_id) VALUES (?, ?)",
+            [(job_id, item_id) for item_id in item_ids]
+        )
+        _refresh_job_status(cursor, job_id)
+        conn.commit()
+    finally:
+        conn.close()
+    return get_job(job_id)
+
+def get_job(job_id: int) -> Optional[Dict[str, Any]]:
+    """Returns a job with per-status item counts and its items, or None."""
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    try:
+        cursor.execute("SELECT * FROM Jobs WHERE id = ?", (job_id,))
+        job = cursor.fetchone()
+        if job is None:
+            return None
+        cursor.execute(
+            "SELECT item_id, status, attempts, error, updated_at FROM JobItems WHERE job_id = ? ORDER BY id",
+            (job_id,)
+        )
+        job['items'] = cursor.fetchall()
+        counts = {status: 0 for status in ('queued', 'running', 'done', 'failed')}
+        for item in job['items']:
+            counts[item['status']] = counts.get(item['status'], 0) + 1
+        job['counts'] = counts
+        job['progress'] = round((counts['done'] + counts['failed']) / job['total'], 3) if job['total'] else 1.0
+        return job
+    finally:
+        conn.close()
+
+def _claim_job_item(cursor, job_item_id: int) -> Optional[Dict[str, Any]]:
+    return _write_returning(
+        cursor, 'JobItems',
+        """UPDATE JobItems SET status = 'running', attempts = attempts + 1, updated_at = CURRENT_TIMESTAMP
+           WHERE id = ? AND status = 'queued'""",
+        (job_item_id,), row_id=job_item_id
+    )
+
+def claim_job_items(batch_sizes: Optional[Dict[str, int]] = None) -> List[Dict[str, Any]]:
+    """
+    Marks the oldest due queued item as running and returns it with its job's
+    kind, or [] when nothing is due. If that kind is processed in batches
+    (`batch_sizes`), more due items of the same job are claimed with it, up
+    to the batch size. Called from the single writer thread, so two workers
+    can never claim the same item.
+    """
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    try:
+        cursor.execute("""
+            SELECT JobItems.id, JobItems.job_id, Jobs.kind FROM JobItems JOIN Jobs ON Jobs.id = JobItems.job_id
+            WHERE JobItems.status = 'queued' AND JobItems.next_attempt_at <= CURRENT_TIMESTAMP
+            ORDER BY JobItems.status, JobItems.next_attempt_at, JobItems.id LIMIT 1
+        """)
+        candidate = cursor.fetchone()
+        if candidate is None:
+            return []
+        job_id, kind = candidate['job_id'], candidate['kind']
+        candidate_ids = [candidate['id']]
+        extra = (batch_sizes or {}).get(kind, 1) - 1
+        if extra > 0:
+            cursor.execute("""
+                SELECT id FROM JobItems
+                WHERE job_id = ? AND id != ? AND status = 'queued' AND next_attempt_at <= CURRENT_TIMESTAMP
+                ORDER BY next_attempt_at, id LIMIT ?
+            """, (job_id, candidate['id'], extra))
+            candidate_ids += [row['id'] for row in cursor.fetchall()]
+        items = []
+        for job_item_id in candidate_ids:
+            item = _claim_job_item(cursor, job_item_id)
+            if item is not None:
+                item['kind'] = kind
+                items.append(item)
+        _refresh_job_status(cursor, job_id)
+        conn.commit()
+        return items
+    finally:
+        conn.close()
+
+def finish_job_item(job_item_id: int, error: Optional[str] = None, retry_in: Optional[float] = None) -> bool:
+    """
+    Records the outcome of a claimed item: done when there is no error,
+    queued again after `retry_in` seconds when one is given, failed otherwise.
+    """
+    if error is None:
+        status, delay = 'done', 0
+    elif retry_in is not None:
+        status, delay = 'queued', retry_in
+    else:
+        status, delay = 'failed', 0
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    try:
+        cursor.execute(
+            """UPDATE JobItems SET status = ?, error = ?, updated_at = CURRENT_TIMESTAMP,
+                      next_attempt_at = datetime('now', ?)
+               WHERE id = ?""",
+            (status, error, f"+{float(delay)} seconds", job_item_id)
+        )
+        cursor.execute("SELECT job_id FROM JobItems WHERE id = ?", (job_item_id,))
+        row = cursor.fetchone()
+        if row is None:
             return False
-        
-        current_position = current_article['position']
-        
-        # If the position hasn't changed, no need to update
-        if current_position == new_position:
-            return True
-        
-        # Get all non-archived articles ordered by position
-        cursor.execute("SELECT id, position FROM articles WHERE status != 'archived' ORDER BY position")
-        all_articles = cursor.fetchall()
-        
-        # Remove the current article from the list
-        other_articles = [a for a in all_articles if a['id'] != article_id]
-        
-        # Insert the article at the new position
-        other_articles.insert(new_position - 1, {'id': article_id, 'position': new_position})
-        
-        # Update all positions
-        for i, article in enumerate(other_articles, 1):
-            cursor.execute("UPDATE articles SET position = ?, updated_at = CURRENT_TIMESTAMP WHERE id = ?", 
-                         (i, article['id']))
-        
+        _refresh_job_status(cursor, row['job_id'])
         conn.commit()
         return True
-        
-    except Exception as e:
-        print(f"Error updating article position: {e}")
-        conn.rollback()
-        return False
     finally:
         conn.close()
 
-def update_snapshot_position(snapshot_id: int, new_position: int) -> bool:
-    """Update the position of a specific snapshot for drag-and-drop reordering."""
+def recover_job_items() -> int:
+    """
+    Re-queues items left running by a previous process (crash or restart).
+    Returns how many were recovered.
+    """
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    try:
+        cursor.execute("SELECT DISTINCT job_id FROM JobItems WHERE status = 'running'")
+        job_ids = [row['job_id'] for row in cursor.fetchall()]
+        cursor.execute("UPDATE JobItems SET status = 'queued', updated_at = CURRENT_TIMESTAMP WHERE status = 'running'")
+        recovered = cursor.rowcount
+        for job_id in job_ids:
+            _refresh_job_status(cursor, job_id)
+        conn.commit()
+        return recovered
+    finally:
+        conn.close()
+
+# --- Position Update Functions for Drag-and-Drop ---
+#
+# Positions are sparse integers spaced POSITION_GAP apart. Moving an item only
+# rewrites that one row with a key between its new neighbours; when two
+# neighbours end up adjacent the table is rebalanced back to even spacing,
+# either inline or by the background compactor below.
+POSITION_GAP = 1024
+MIN_POSITION_GAP = 4
+_LIST_ORDER = {
+    'Articles': "position ASC, id ASC",
+    'Snapshots': "position ASC, id ASC",
+}
+
+def _position_after_last(cursor, table: str) -> int:
+    cursor.execute(f"SELECT MAX(position) AS max_pos FROM {table} WHERE status != 'archived'")
+    row = cursor.fetchone()
+    return (row['max_pos'] or 0) + POSITION_GAP
+
+def _position_before_first(cursor, table: str) -> int:
+    cursor.execute(f"SELECT MIN(position) AS min_pos FROM {table} WHERE status != 'archived'")
+    row = cursor.fetchone()
+    if row['min_pos'] is None:
+        return POSITION_GAP
+    return row['min_pos'] - POSITION_GAP
+
+def _rebalance_positions(cursor, table: str) -> int:
+    """Re-spaces every active row in `table` to multiples of POSITION_GAP, keeping the current order."""
+    cursor.execute(f"""
+        SELECT id FROM {table} WHERE status != 'archived'
+        ORDER BY position IS NULL, {_LIST_ORDER[table]}
+    """)
+    ids = [row['id'] for row in cursor.fetchall()]
+    cursor.executemany(
+        f"UPDATE {table} SET position = ? WHERE id = ?",
+        [((i + 1) * POSITION_GAP, item_id) for i, item_id in enumerate(ids)]
+    )
+    return len(ids)
+
+def _backfill_positions(cursor) -> Dict[str, int]:
+    """
+    Rebalances each ordered table that still has rows with a NULL position,
+    so a database from before sparse positions pages correctly from the first
+    request rather than after the compactor's first pass.
+    """
+    results = {}
+    for table in _LIST_ORDER:
+        cursor.execute(f"SELECT 1 FROM {table} WHERE status != 'archived' AND position IS NULL LIMIT 1")
+        if cursor.fetchone():
+            results[table] = _rebalance_positions(cursor, table)
+    return results
+
+def _position_for_rank(cursor, table: str, item_id: int, new_rank: int) -> Optional[int]:
+    """
+    Computes a sort key that places `item_id` at 1-based `new_rank` among the
+    other active rows, or None if the neighbouring keys leave no room.
+    """
+    offset = max(new_rank - 2, 0)
+    cursor.execute(f"""
+        SELECT position FROM {table}
+        WHERE status != 'archived' AND id != ?
+        ORDER BY {_LIST_ORDER[table]} LIMIT 2 OFFSET ?
+    """, (item_id, offset))
+    neighbours = [row['position'] for row in cursor.fetchall()]
+    if None in neighbours:
+        return None  # Legacy rows without a position; a rebalance assigns them.
+
+    if new_rank <= 1:
+        before, after = None, (neighbours[0] if neighbours else None)
+    elif neighbours:
+        before, after = neighbours[0], (neighbours[1] if len(neighbours) > 1 else None)
+    else:
+        # Past the end of the list: append after the last row.
+        cursor.execute(f"SELECT MAX(position) AS max_pos FROM {table} WHERE status != 'archived' AND id != ?", (item_id,))
+        before, after = cursor.fetchone()['max_pos'], None
+
+    if before is None and after is None:
+        return POSITION_GAP
+    if before is None:
+        return after - POSITION_GAP
+    if after is None:
+        return before + POSITION_GAP
+    if after - before < 2:
+        return None
+    return (before + after) // 2
+
+def _move_to_rank(table: str, item_id: int, new_rank: int) -> bool:
     conn = get_db_connection()
     cursor = conn.cursor()
     
     try:
-        # First, check if the snapshot exists
-        cursor.execute("SELECT position FROM snapshots WHERE id = ? AND status != 'archived'", (snapshot_id,))
-        current_snapshot = cursor.fetchone()
-        
-        if not current_snapshot:
+        cursor.execute(f"SELECT id FROM {table} WHERE id = ? AND status != 'archived'", (item_id,))
+        if not cursor.fetchone():
             return False
         
-        current_position = current_snapshot['position']
-        
-        # If the position hasn't changed, no need to update
-        if current_position == new_position:
-            return True
-        
-        # Get all non-archived snapshots ordered by position
-        cursor.execute("SELECT id, position FROM snapshots WHERE status != 'archived' ORDER BY position")
-        all_snapshots = cursor.fetchall()
-        
-        # Remove the current snapshot from the list
-        other_snapshots = [s for s in all_snapshots if s['id'] != snapshot_id]
-        
-        # Insert the snapshot at the new position
-        other_snapshots.insert(new_position - 1, {'id': snapshot_id, 'position': new_position})
-        
-        # Update all positions
-        for i, snapshot in enumerate(other_snapshots, 1):
-            cursor.execute("UPDATE snapshots SET position = ?, updated_at = CURRENT_TIMESTAMP WHERE id = ?", 
-                         (i, snapshot['id']))
+        new_key = _position_for_rank(cursor, table, item_id, new_rank)
+        if new_key is None:
+            # Gap exhausted (or legacy NULL positions): rebalance and try again.
+            _rebalance_positions(cursor, table)
+            new_key = _position_for_rank(cursor, table, item_id, new_rank)
         
+        cursor.execute(f"UPDATE {table} SET position = ?, updated_at = CURRENT_TIMESTAMP WHERE id = ?",
+                       (new_key, item_id))
         conn.commit()
         return True
         
     except Exception as e:
-        print(f"Error updating snapshot position: {e}")
+        print(f"Error updating {table} position: {e}")
         conn.rollback()
         return False
     finally:
         conn.close()
 
-def bulk_update_article_positions(updates: List[Dict[str, int]]) -> bool:
-    """Bulk update article positions for efficient drag-and-drop reordering."""
+def update_article_position(article_id: int, new_position: int) -> bool:
+    """Moves an article to the given 1-based rank for drag-and-drop reordering."""
+    return _move_to_rank('Articles', article_id, new_position)
+
+def update_snapshot_position(snapshot_id: int, new_position: int) -> bool:
+    """Moves a snapshot to the given 1-based rank for drag-and-drop reordering."""
+    return _move_to_rank('Snapshots', snapshot_id, new_position)
+
+def positions_need_rebalance(table: str) -> bool:
+    """True if `table` has NULL positions or adjacent active rows closer than MIN_POSITION_GAP."""
     conn = get_db_connection()
-    cursor = conn.cursor()
-    
     try:
-        # Update all positions in a single transaction
-        for update in updates:
-            article_id = update['id']
-            new_position = update['position']
-            cursor.execute("UPDATE articles SET position = ?, updated_at = CURRENT_TIMESTAMP WHERE id = ?", 
-                         (new_position, article_id))
-        
+        row = conn.execute(f"""
+            SELECT SUM(position IS NULL) AS missing,
+                   MIN(position - prev_position) AS min_gap
+            FROM (
+                SELECT position, LAG(position) OVER (ORDER BY {_LIST_ORDER[table]}) AS prev_position
+                FROM {table} WHERE status != 'archived'
+            )
+        """).fetchone()
+        return bool(row['missing']) or (row['min_gap'] is not None and row['min_gap'] < MIN_POSITION_GAP)
+    finally:
+        conn.close()
+
+def rebalance_positions(table: str) -> int:
+    """Rebalances positions in `table` in a single transaction. Returns the number of rows re-spaced."""
+    conn = get_db_connection()
+    try:
+        count = _rebalance_positions(conn.cursor(), table)
         conn.commit()
-        return True
-        
-    except Exception as e:
-        print(f"Error bulk updating article positions: {e}")
+        return count
+    except sqlite3.Error as e:
+        print(f"Database error rebalancing {table} positions: {e}")
         conn.rollback()
-        return False
+        return 0
     finally:
         conn.close()
 
-def bulk_update_snapshot_positions(updates: List[Dict[str, int]]) -> bool:
-    """Bulk update snapshot positions for efficient drag-and-drop reordering."""
+# --- Background Position Compactor ---
+_compactor_stop = threading.Event()
+_compactor_thread: Optional[threading.Thread] = None
+
+def run_position_compaction() -> Dict[str, int]:
+    """Rebalances any ordered table whose gaps are running out."""
+    results = {}
+    for table in _LIST_ORDER:
+        if positions_need_rebalance(table):
+            results[table] = rebalance_positions(table)
+    return results
+
+def _compactor_loop(interval: float):
+    while not _compactor_stop.wait(interval):
+        try:
+            compacted = run_position_compaction()
+            if compacted:
+                print(f"Position compactor rebalanced: {compacted}")
+            pruned = prune_change_log()
+            if pruned:
+                print(f"Position compactor pruned {pruned} change-log tombstones")
+        except Exception as e:
+            print(f"ERROR: Position compactor failed: {e}")
+
+def start_position_compactor(interval: float = 300.0):
+    """
+    Starts the background maintenance thread: it keeps position gaps from
+    running out and prunes expired change-log tombstones.
+    """
+    global _compactor_thread
+    if _compactor_thread and _compactor_thread.is_alive():
+        return
+    _compactor_stop.clear()
+    _compactor_thread = threading.Thread(target=_compactor_loop, args=(interval,),
+                                         name="position-compactor", daemon=True)
+    _compactor_thread.start()
+
+def stop_position_compactor():
+    global _compactor_thread
+    _compactor_stop.set()
+    if _compactor_thread:
+        _compactor_thread.join(timeout=5)
+        _compactor_thread = None
+
+def _keys_for_order(order: List[int], positions: Dict[int, Optional[int]], moved: set) -> Optional[Dict[int, int]]:
+    """
+    Sparse keys for the moved ids in `order`, spreading each run of moved ids
+    evenly between the unmoved rows around it. None if a run doesn't fit.
+    """
+    keys = {}
+    i = 0
+    while i < len(order):
+        if order[i] not in moved:
+            i += 1
+            continue
+        end = i
+        while end < len(order) and order[end] in moved:
+            end += 1
+        before = positions[order[i - 1]] if i > 0 else None
+        after = positions[order[end]] if end < len(order) else None
+        if (i > 0 and before is None) or (end < len(order) and after is None):
+            return None  # Legacy rows without a position; a rebalance assigns them.
+        run = order[i:end]
+        if before is None and after is None:
+            step, base = POSITION_GAP, 0
+        elif before is None:
+            step, base = POSITION_GAP, after - POSITION_GAP * (len(run) + 1)
+        elif after is None:
+            step, base = POSITION_GAP, before
+        else:
+            step, base = (after - before) // (len(run) + 1), before
+            if step < 1:
+                return None
+        for n, item_id in enumerate(run, start=1):
+            keys[item_id] = base + step * n
+        i = end
+    return keys
+
+def _bulk_move_to_ranks(table: str, updates: List[Dict[str, int]]) -> bool:
+    """
+    Moves several items to 1-based ranks in one transaction. Each update's
+    `position` is a rank, as in _move_to_rank; only the moved rows get new
+    keys unless the gaps run out, in which case the table is rebalanced.
+    """
     conn = get_db_connection()
     cursor = conn.cursor()
     
     try:
-        # Update all positions in a single transaction
-        for update in updates:
-            snapshot_id = update['id']
-            new_position = update['position']
-            cursor.execute("UPDATE snapshots SET position = ?, updated_at = CURRENT_TIMESTAMP WHERE id = ?", 
-                         (new_position, snapshot_id))
+        cursor.execute(f"""
+            SELECT id, position FROM {table} WHERE status != 'archived'
+            ORDER BY position IS NULL, {_LIST_ORDER[table]}
+        """)
+        positions = {row['id']: row['position'] for row in cursor.fetchall()}
+        ranks = {update['id']: update['position'] for update in updates}
+        if any(item_id not in positions for item_id in ranks):
+            return False
         
+        # The final order: everything else keeps its order, then each moved
+        # item is inserted at its rank, lowest rank first.
+        moved = set(ranks)
+        order = [item_id for item_id in positions if item_id not in moved]
+        for item_id, rank in sorted(ranks.items(), key=lambda item: (item[1], item[0])):
+            order.insert(max(rank, 1) - 1, item_id)
+        
+        keys = _keys_for_order(order, positions, moved)
+        if keys is None:
+            # No room between the neighbours: re-space the whole list in its new order.
+            keys = {item_id: (i + 1) * POSITION_GAP for i, item_id in enumerate(order)}
+            cursor.executemany(f"UPDATE {table} SET position = ? WHERE id = ?",
+                               [(keys[item_id], item_id) for item_id in order if item_id not in moved])
+        cursor.executemany(f"UPDATE {table} SET position = ?, updated_at = CURRENT_TIMESTAMP WHERE id = ?",
+                           [(keys[item_id], item_id) for item_id in moved])
         conn.commit()
         return True
         
     except Exception as e:
-        print(f"Error bulk updating snapshot positions: {e}")
+        print(f"Error bulk updating {table} positions: {e}")
         conn.rollback()
         return False
     finally:
         conn.close()
+
+def bulk_update_article_positions(updates: List[Dict[str, int]]) -> bool:
+    """Moves several articles to the given 1-based ranks in one transaction."""
+    return _bulk_move_to_ranks('Articles', updates)
+
+def bulk_update_snapshot_positions(updates: List[Dict[str, int]]) -> bool:
+    """Moves several snapshots to the given 1-based ranks in one transaction."""
+    return _bulk_move_to_ranks('Snapshots', updates)
@@ -0,0 +1,19 @@
+-- 0001_hot_query_indexes.sql
+--
+-- Indexes for the list queries the admin UI runs on every refresh.
+
+-- get_articles_by_status / get_snapshots_by_status: status = ? ORDER BY position
+CREATE INDEX IF NOT EXISTS idx_articles_status_position ON Articles(status, position);
+CREATE INDEX IF NOT EXISTS idx_snapshots_status_position ON Snapshots(status, position);
+
+-- fetch_all_articles / fetch_all_snapshots: status != 'archived' ORDER BY position.
+-- An inequality can't seek a composite index, so these partial indexes cover
+-- exactly the active rows in list order.
+CREATE INDEX IF NOT EXISTS idx_articles_active_position
+    ON Articles(position) WHERE status != 'archived';
+CREATE INDEX IF NOT EXISTS idx_snapshots_active_position
+    ON Snapshots(position, created_at DESC) WHERE status != 'archived';
+
+-- fetch_all_threats / fetch_all_podcast_episodes: ORDER BY created_at DESC
+CREATE INDEX IF NOT EXISTS idx_threats_created_at ON Threats(created_at);
+CREATE INDEX IF NOT EXISTS idx_podcast_episodes_created_at ON PodcastEpisodes(created_at);
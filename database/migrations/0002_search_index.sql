@@ -0,0 +1,76 @@
+-- 0002_search_index.sql
+--
+-- FTS5 full-text index over Articles and Snapshots, kept in sync by triggers.
+-- Rowids are derived from the source row so each row maps to exactly one
+-- index entry: article id * 2 for articles, snapshot id * 2 + 1 for snapshots.
+
+CREATE VIRTUAL TABLE IF NOT EXISTS SearchIndex USING fts5(
+    kind UNINDEXED,      -- 'article' or 'snapshot'
+    item_id UNINDEXED,
+    status UNINDEXED,
+    title,
+    body,                -- Articles.summary / Snapshots.highlight
+    source,
+    original_content,
+    tokenize = 'porter unicode61'
+);
+
+INSERT INTO SearchIndex (rowid, kind, item_id, status, title, body, source, original_content)
+    SELECT id * 2, 'article', id, status, title, summary, source, original_content FROM Articles;
+INSERT INTO SearchIndex (rowid, kind, item_id, status, title, body, source, original_content)
+    SELECT id * 2 + 1, 'snapshot', id, status, title, highlight, source, original_content FROM Snapshots;
+
+-- Articles
+CREATE TRIGGER IF NOT EXISTS search_index_articles_insert
+AFTER INSERT ON Articles
+BEGIN
+    INSERT INTO SearchIndex (rowid, kind, item_id, status, title, body, source, original_content)
+    VALUES (NEW.id * 2, 'article', NEW.id, NEW.status, NEW.title, NEW.summary, NEW.source, NEW.original_content);
+END;
+
+-- Limited to the indexed columns so the updated_at trigger's nested UPDATE doesn't reindex.
+CREATE TRIGGER IF NOT EXISTS search_index_articles_update
+AFTER UPDATE OF title, summary, source, status ON Articles
+BEGIN
+    UPDATE SearchIndex SET title = NEW.title, body = NEW.summary, source = NEW.source, status = NEW.status
+    WHERE rowid = NEW.id * 2;
+END;
+
+CREATE TRIGGER IF NOT EXISTS search_index_articles_content
+AFTER UPDATE OF original_content ON Articles
+BEGIN
+    UPDATE SearchIndex SET original_content = NEW.original_content WHERE rowid = NEW.id * 2;
+END;
+
+CREATE TRIGGER IF NOT EXISTS search_index_articles_delete
+AFTER DELETE ON Articles
+BEGIN
+    DELETE FROM SearchIndex WHERE rowid = OLD.id * 2;
+END;
+
+-- Snapshots
+CREATE TRIGGER IF NOT EXISTS search_index_snapshots_insert
+AFTER INSERT ON Snapshots
+BEGIN
+    INSERT INTO SearchIndex (rowid, kind, item_id, status, title, body, source, original_content)
+    VALUES (NEW.id * 2 + 1, 'snapshot', NEW.id, NEW.status, NEW.title, NEW.highlight, NEW.source, NEW.original_content);
+END;
+
+CREATE TRIGGER IF NOT EXISTS search_index_snapshots_update
+AFTER UPDATE OF title, highlight, source, status ON Snapshots
+BEGIN
+    UPDATE SearchIndex SET title = NEW.title, body = NEW.highlight, source = NEW.source, status = NEW.status
+    WHERE rowid = NEW.id * 2 + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS search_index_snapshots_content
+AFTER UPDATE OF original_content ON Snapshots
+BEGIN
+    UPDATE SearchIndex SET original_content = NEW.original_content WHERE rowid = NEW.id * 2 + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS search_index_snapshots_delete
+AFTER DELETE ON Snapshots
+BEGIN
+    DELETE FROM SearchIndex WHERE rowid = OLD.id * 2 + 1;
+END;
@@ -0,0 +1,9 @@
+-- 0003_snapshot_keyset_index.sql
+--
+-- Snapshots are now listed (and keyset-paginated) by (position, id), like
+-- Articles. Every index entry already ends with the rowid, so a plain
+-- (position) index serves that order without a sort.
+
+DROP INDEX IF EXISTS idx_snapshots_active_position;
+CREATE INDEX IF NOT EXISTS idx_snapshots_active_position
+    ON Snapshots(position) WHERE status != 'archived';
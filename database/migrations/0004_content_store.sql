@@ -0,0 +1,77 @@
+-- 0004_content_store.sql
+--
+-- Scraped bodies move out of Articles/Snapshots.original_content into a
+-- content-addressed, compressed ContentBlobs table (see database/content_store.py).
+-- Rows point at a blob through content_hash; the triggers below keep each
+-- blob's refcount in step and drop it once nothing references it.
+
+CREATE TABLE IF NOT EXISTS ContentBlobs (
+    hash TEXT PRIMARY KEY,              -- SHA-256 of the UTF-8 text
+    codec TEXT NOT NULL,                -- 'zlib' or 'zstd'
+    data BLOB NOT NULL,
+    raw_size INTEGER NOT NULL,
+    stored_size INTEGER NOT NULL,
+    refcount INTEGER NOT NULL DEFAULT 0,
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+) WITHOUT ROWID;
+
+ALTER TABLE Articles ADD COLUMN content_hash TEXT;
+ALTER TABLE Snapshots ADD COLUMN content_hash TEXT;
+
+-- Articles
+CREATE TRIGGER IF NOT EXISTS content_refs_articles_insert
+AFTER INSERT ON Articles
+WHEN NEW.content_hash IS NOT NULL
+BEGIN
+    UPDATE ContentBlobs SET refcount = refcount + 1 WHERE hash = NEW.content_hash;
+END;
+
+CREATE TRIGGER IF NOT EXISTS content_refs_articles_update
+AFTER UPDATE OF content_hash ON Articles
+WHEN OLD.content_hash IS NOT NEW.content_hash
+BEGIN
+    UPDATE ContentBlobs SET refcount = refcount + 1 WHERE hash = NEW.content_hash;
+    UPDATE ContentBlobs SET refcount = refcount - 1 WHERE hash = OLD.content_hash;
+END;
+
+CREATE TRIGGER IF NOT EXISTS content_refs_articles_delete
+AFTER DELETE ON Articles
+WHEN OLD.content_hash IS NOT NULL
+BEGIN
+    UPDATE ContentBlobs SET refcount = refcount - 1 WHERE hash = OLD.content_hash;
+END;
+
+-- Snapshots
+CREATE TRIGGER IF NOT EXISTS content_refs_snapshots_insert
+AFTER INSERT ON Snapshots
+WHEN NEW.content_hash IS NOT NULL
+BEGIN
+    UPDATE ContentBlobs SET refcount = refcount + 1 WHERE hash = NEW.content_hash;
+END;
+
+CREATE TRIGGER IF NOT EXISTS content_refs_snapshots_update
+AFTER UPDATE OF content_hash ON Snapshots
+WHEN OLD.content_hash IS NOT NEW.content_hash
+BEGIN
+    UPDATE ContentBlobs SET refcount = refcount + 1 WHERE hash = NEW.content_hash;
+    UPDATE ContentBlobs SET refcount = refcount - 1 WHERE hash = OLD.content_hash;
+END;
+
+CREATE TRIGGER IF NOT EXISTS content_refs_snapshots_delete
+AFTER DELETE ON Snapshots
+WHEN OLD.content_hash IS NOT NULL
+BEGIN
+    UPDATE ContentBlobs SET refcount = refcount - 1 WHERE hash = OLD.content_hash;
+END;
+
+CREATE TRIGGER IF NOT EXISTS content_blobs_release
+AFTER UPDATE OF refcount ON ContentBlobs
+WHEN NEW.refcount <= 0
+BEGIN
+    DELETE FROM ContentBlobs WHERE hash = NEW.hash;
+END;
+
+-- original_content is no longer written, so the search index is fed the
+-- body from Python when content is stored instead of by these triggers.
+DROP TRIGGER IF EXISTS search_index_articles_content;
+DROP TRIGGER IF EXISTS search_index_snapshots_content;
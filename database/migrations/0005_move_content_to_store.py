@@ -0,0 +1,25 @@
+# 0005_move_content_to_store.py
+#
+# Moves existing original_content bodies into ContentBlobs and clears the
+# inline copies. SearchIndex already holds the text, so it is left alone.
+from database.content_store import store_content, store_stats
+
+
+def upgrade(conn):
+    cursor = conn.cursor()
+    inline_bytes = 0
+    for table in ('Articles', 'Snapshots'):
+        cursor.execute(
+            f"SELECT id, original_content FROM {table} WHERE original_content IS NOT NULL AND original_content != ''"
+        )
+        for row in cursor.fetchall():
+            inline_bytes += len(row['original_content'].encode('utf-8'))
+            digest = store_content(cursor, row['original_content'])
+            cursor.execute(
+                f"UPDATE {table} SET content_hash = ?, original_content = NULL WHERE id = ?",
+                (digest, row['id'])
+            )
+
+    stats = store_stats(cursor)
+    print(f"Content store: moved {inline_bytes} bytes of inline content into {stats['blobs']} blobs "
+          f"({stats['stored_bytes']} bytes stored, {stats['bytes_saved']} bytes saved)")
@@ -0,0 +1,50 @@
+-- 0006_collection_revisions.sql
+--
+-- A revision counter per list collection, bumped by every write to the table.
+-- The list endpoints build their ETag from it, so an unchanged collection can
+-- be answered with 304 Not Modified without reading a single row.
+
+CREATE TABLE IF NOT EXISTS CollectionRevisions (
+    collection TEXT PRIMARY KEY,
+    revision INTEGER NOT NULL DEFAULT 0
+);
+
+INSERT OR IGNORE INTO CollectionRevisions (collection, revision) VALUES ('Articles', 0), ('Snapshots', 0);
+
+-- Articles
+CREATE TRIGGER IF NOT EXISTS collection_revision_articles_insert
+AFTER INSERT ON Articles
+BEGIN
+    UPDATE CollectionRevisions SET revision = revision + 1 WHERE collection = 'Articles';
+END;
+
+CREATE TRIGGER IF NOT EXISTS collection_revision_articles_update
+AFTER UPDATE ON Articles
+BEGIN
+    UPDATE CollectionRevisions SET revision = revision + 1 WHERE collection = 'Articles';
+END;
+
+CREATE TRIGGER IF NOT EXISTS collection_revision_articles_delete
+AFTER DELETE ON Articles
+BEGIN
+    UPDATE CollectionRevisions SET revision = revision + 1 WHERE collection = 'Articles';
+END;
+
+-- Snapshots
+CREATE TRIGGER IF NOT EXISTS collection_revision_snapshots_insert
+AFTER INSERT ON Snapshots
+BEGIN
+    UPDATE CollectionRevisions SET revision = revision + 1 WHERE collection = 'Snapshots';
+END;
+
+CREATE TRIGGER IF NOT EXISTS collection_revision_snapshots_update
+AFTER UPDATE ON Snapshots
+BEGIN
+    UPDATE CollectionRevisions SET revision = revision + 1 WHERE collection = 'Snapshots';
+END;
+
+CREATE TRIGGER IF NOT EXISTS collection_revision_snapshots_delete
+AFTER DELETE ON Snapshots
+BEGIN
+    UPDATE CollectionRevisions SET revision = revision + 1 WHERE collection = 'Snapshots';
+END;
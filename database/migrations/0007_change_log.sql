@@ -0,0 +1,66 @@
+-- 0007_change_log.sql
+--
+-- Change feed for delta sync (GET /articles/changes, GET /snapshots/changes).
+-- Every insert, update, reorder or delete on Articles/Snapshots records the
+-- item under a new revision. Only the latest entry per item is kept, so the
+-- log stays about as large as the tables plus recent tombstones.
+
+CREATE TABLE IF NOT EXISTS ChangeLog (
+    revision INTEGER PRIMARY KEY AUTOINCREMENT,
+    collection TEXT NOT NULL,           -- 'Articles' or 'Snapshots'
+    item_id INTEGER NOT NULL,
+    op TEXT NOT NULL,                   -- 'upsert' or 'delete' (tombstone)
+    changed_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    UNIQUE (collection, item_id)
+);
+
+-- Highest revision whose tombstones have been pruned. A client syncing from
+-- an older revision may have missed deletes and must resync in full.
+CREATE TABLE IF NOT EXISTS ChangeLogState (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    pruned_through INTEGER NOT NULL DEFAULT 0
+);
+
+INSERT OR IGNORE INTO ChangeLogState (id, pruned_through) VALUES (1, 0);
+
+-- Existing rows count as changed at the first revisions.
+INSERT OR IGNORE INTO ChangeLog (collection, item_id, op) SELECT 'Articles', id, 'upsert' FROM Articles ORDER BY id;
+INSERT OR IGNORE INTO ChangeLog (collection, item_id, op) SELECT 'Snapshots', id, 'upsert' FROM Snapshots ORDER BY id;
+
+-- Articles
+CREATE TRIGGER IF NOT EXISTS change_log_articles_insert
+AFTER INSERT ON Articles
+BEGIN
+    INSERT OR REPLACE INTO ChangeLog (collection, item_id, op) VALUES ('Articles', NEW.id, 'upsert');
+END;
+
+CREATE TRIGGER IF NOT EXISTS change_log_articles_update
+AFTER UPDATE ON Articles
+BEGIN
+    INSERT OR REPLACE INTO ChangeLog (collection, item_id, op) VALUES ('Articles', NEW.id, 'upsert');
+END;
+
+CREATE TRIGGER IF NOT EXISTS change_log_articles_delete
+AFTER DELETE ON Articles
+BEGIN
+    INSERT OR REPLACE INTO ChangeLog (collection, item_id, op) VALUES ('Articles', OLD.id, 'delete');
+END;
+
+-- Snapshots
+CREATE TRIGGER IF NOT EXISTS change_log_snapshots_insert
+AFTER INSERT ON Snapshots
+BEGIN
+    INSERT OR REPLACE INTO ChangeLog (collection, item_id, op) VALUES ('Snapshots', NEW.id, 'upsert');
+END;
+
+CREATE TRIGGER IF NOT EXISTS change_log_snapshots_update
+AFTER UPDATE ON Snapshots
+BEGIN
+    INSERT OR REPLACE INTO ChangeLog (collection, item_id, op) VALUES ('Snapshots', NEW.id, 'upsert');
+END;
+
+CREATE TRIGGER IF NOT EXISTS change_log_snapshots_delete
+AFTER DELETE ON Snapshots
+BEGIN
+    INSERT OR REPLACE INTO ChangeLog (collection, item_id, op) VALUES ('Snapshots', OLD.id, 'delete');
+END;
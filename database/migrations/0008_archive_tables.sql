@@ -0,0 +1,152 @@
+-- 0008_archive_tables.sql
+--
+-- Hot/cold split: archived articles and snapshots move out of the working
+-- tables into ArchivedArticles/ArchivedSnapshots, so list scans, reorders and
+-- url checks only see the current issue's rows. Rows keep their id, so links
+-- and the search index stay valid; un-archiving moves them back.
+--
+-- A move is an INSERT into one table followed by a DELETE from the other.
+-- The search triggers below recognise the row in the other table and only
+-- update its status, and the content refcount never drops to zero mid-move.
+
+CREATE TABLE IF NOT EXISTS ArchivedArticles (
+    id INTEGER PRIMARY KEY,
+    url TEXT NOT NULL UNIQUE,
+    title TEXT,
+    source TEXT,
+    summary TEXT,
+    status TEXT NOT NULL DEFAULT 'archived',
+    content_hash TEXT,
+    created_at DATETIME,
+    updated_at DATETIME,
+    archived_at DATETIME DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS ArchivedSnapshots (
+    id INTEGER PRIMARY KEY,
+    url TEXT NOT NULL UNIQUE,
+    title TEXT,
+    source TEXT,
+    highlight TEXT,
+    status TEXT NOT NULL DEFAULT 'archived',
+    content_hash TEXT,
+    created_at DATETIME,
+    updated_at DATETIME,
+    archived_at DATETIME DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Search index: a row moving between tables keeps its SearchIndex entry.
+DROP TRIGGER IF EXISTS search_index_articles_insert;
+DROP TRIGGER IF EXISTS search_index_articles_delete;
+DROP TRIGGER IF EXISTS search_index_snapshots_insert;
+DROP TRIGGER IF EXISTS search_index_snapshots_delete;
+
+CREATE TRIGGER IF NOT EXISTS search_index_articles_insert
+AFTER INSERT ON Articles
+WHEN NOT EXISTS (SELECT 1 FROM ArchivedArticles WHERE id = NEW.id)
+BEGIN
+    INSERT INTO SearchIndex (rowid, kind, item_id, status, title, body, source, original_content)
+    VALUES (NEW.id * 2, 'article', NEW.id, NEW.status, NEW.title, NEW.summary, NEW.source, NEW.original_content);
+END;
+
+CREATE TRIGGER IF NOT EXISTS search_index_articles_unarchive
+AFTER INSERT ON Articles
+WHEN EXISTS (SELECT 1 FROM ArchivedArticles WHERE id = NEW.id)
+BEGIN
+    UPDATE SearchIndex SET status = NEW.status WHERE rowid = NEW.id * 2;
+END;
+
+CREATE TRIGGER IF NOT EXISTS search_index_articles_delete
+AFTER DELETE ON Articles
+WHEN NOT EXISTS (SELECT 1 FROM ArchivedArticles WHERE id = OLD.id)
+BEGIN
+    DELETE FROM SearchIndex WHERE rowid = OLD.id * 2;
+END;
+
+CREATE TRIGGER IF NOT EXISTS search_index_archived_articles_insert
+AFTER INSERT ON ArchivedArticles
+BEGIN
+    UPDATE SearchIndex SET status = NEW.status WHERE rowid = NEW.id * 2;
+END;
+
+CREATE TRIGGER IF NOT EXISTS search_index_archived_articles_delete
+AFTER DELETE ON ArchivedArticles
+WHEN NOT EXISTS (SELECT 1 FROM Articles WHERE id = OLD.id)
+BEGIN
+    DELETE FROM SearchIndex WHERE rowid = OLD.id * 2;
+END;
+
+CREATE TRIGGER IF NOT EXISTS search_index_snapshots_insert
+AFTER INSERT ON Snapshots
+WHEN NOT EXISTS (SELECT 1 FROM ArchivedSnapshots WHERE id = NEW.id)
+BEGIN
+    INSERT INTO SearchIndex (rowid, kind, item_id, status, title, body, source, original_content)
+    VALUES (NEW.id * 2 + 1, 'snapshot', NEW.id, NEW.status, NEW.title, NEW.highlight, NEW.source, NEW.original_content);
+END;
+
+CREATE TRIGGER IF NOT EXISTS search_index_snapshots_unarchive
+AFTER INSERT ON Snapshots
+WHEN EXISTS (SELECT 1 FROM ArchivedSnapshots WHERE id = NEW.id)
+BEGIN
+    UPDATE SearchIndex SET status = NEW.status WHERE rowid = NEW.id * 2 + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS search_index_snapshots_delete
+AFTER DELETE ON Snapshots
+WHEN NOT EXISTS (SELECT 1 FROM ArchivedSnapshots WHERE id = OLD.id)
+BEGIN
+    DELETE FROM SearchIndex WHERE rowid = OLD.id * 2 + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS search_index_archived_snapshots_insert
+AFTER INSERT ON ArchivedSnapshots
+BEGIN
+    UPDATE SearchIndex SET status = NEW.status WHERE rowid = NEW.id * 2 + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS search_index_archived_snapshots_delete
+AFTER DELETE ON ArchivedSnapshots
+WHEN NOT EXISTS (SELECT 1 FROM Snapshots WHERE id = OLD.id)
+BEGIN
+    DELETE FROM SearchIndex WHERE rowid = OLD.id * 2 + 1;
+END;
+
+-- Content store references held by archived rows.
+CREATE TRIGGER IF NOT EXISTS content_refs_archived_articles_insert
+AFTER INSERT ON ArchivedArticles
+WHEN NEW.content_hash IS NOT NULL
+BEGIN
+    UPDATE ContentBlobs SET refcount = refcount + 1 WHERE hash = NEW.content_hash;
+END;
+
+CREATE TRIGGER IF NOT EXISTS content_refs_archived_articles_delete
+AFTER DELETE ON ArchivedArticles
+WHEN OLD.content_hash IS NOT NULL
+BEGIN
+    UPDATE ContentBlobs SET refcount = refcount - 1 WHERE hash = OLD.content_hash;
+END;
+
+CREATE TRIGGER IF NOT EXISTS content_refs_archived_snapshots_insert
+AFTER INSERT ON ArchivedSnapshots
+WHEN NEW.content_hash IS NOT NULL
+BEGIN
+    UPDATE ContentBlobs SET refcount = refcount + 1 WHERE hash = NEW.content_hash;
+END;
+
+CREATE TRIGGER IF NOT EXISTS content_refs_archived_snapshots_delete
+AFTER DELETE ON ArchivedSnapshots
+WHEN OLD.content_hash IS NOT NULL
+BEGIN
+    UPDATE ContentBlobs SET refcount = refcount - 1 WHERE hash = OLD.content_hash;
+END;
+
+-- Move what is already archived.
+INSERT INTO ArchivedArticles (id, url, title, source, summary, status, content_hash, created_at, updated_at)
+    SELECT id, url, title, source, summary, 'archived', content_hash, created_at, updated_at
+    FROM Articles WHERE status = 'archived';
+DELETE FROM Articles WHERE status = 'archived';
+
+INSERT INTO ArchivedSnapshots (id, url, title, source, highlight, status, content_hash, created_at, updated_at)
+    SELECT id, url, title, source, highlight, 'archived', content_hash, created_at, updated_at
+    FROM Snapshots WHERE status = 'archived';
+DELETE FROM Snapshots WHERE status = 'archived';
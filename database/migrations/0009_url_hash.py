@@ -0,0 +1,31 @@
+# 0009_url_hash.py
+#
+# Adds url_hash (SHA-256 of the canonical URL, see database/url_canonicalizer.py)
+# to the working and archive tables, backfills it, and makes it unique so
+# duplicate detection is one index lookup. Rows that only now turn out to be
+# duplicates of an older row keep a NULL hash rather than being deleted.
+from database.url_canonicalizer import url_hash
+
+TABLES = ('Articles', 'Snapshots', 'ArchivedArticles', 'ArchivedSnapshots')
+
+
+def upgrade(conn):
+    cursor = conn.cursor()
+    for table in TABLES:
+        cursor.execute(f"ALTER TABLE {table} ADD COLUMN url_hash TEXT")
+
+        seen = set()
+        updates = []
+        duplicates = 0
+        cursor.execute(f"SELECT id, url FROM {table} ORDER BY id")
+        for row in cursor.fetchall():
+            digest = url_hash(row['url'])
+            if digest in seen:
+                duplicates += 1
+                continue
+            seen.add(digest)
+            updates.append((digest, row['id']))
+        cursor.executemany(f"UPDATE {table} SET url_hash = ? WHERE id = ?", updates)
+        cursor.execute(f"CREATE UNIQUE INDEX IF NOT EXISTS idx_{table.lower()}_url_hash ON {table}(url_hash)")
+        if duplicates:
+            print(f"url_hash: {duplicates} existing {table} rows duplicate an older row's canonical URL; left unhashed")
@@ -0,0 +1,31 @@
+-- 0010_jobs.sql
+--
+-- Durable background jobs (batch summarize / highlight). A job is a batch of
+-- items; each item is claimed by one worker, retried with backoff on
+-- transient failures, and survives an API restart because its state lives
+-- here rather than in the worker's memory.
+
+CREATE TABLE IF NOT EXISTS Jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    kind TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'queued',  -- queued, running, completed, partial, failed
+    total INTEGER NOT NULL DEFAULT 0,
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    updated_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    finished_at DATETIME
+);
+
+CREATE TABLE IF NOT EXISTS JobItems (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    job_id INTEGER NOT NULL REFERENCES Jobs(id) ON DELETE CASCADE,
+    item_id INTEGER NOT NULL,
+    status TEXT NOT NULL DEFAULT 'queued',  -- queued, running, done, failed
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    error TEXT,
+    updated_at DATETIME DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Workers claim the oldest due item; this keeps the claim an index seek.
+CREATE INDEX IF NOT EXISTS idx_jobitems_claim ON JobItems(status, next_attempt_at, id);
+CREATE INDEX IF NOT EXISTS idx_jobitems_job ON JobItems(job_id);
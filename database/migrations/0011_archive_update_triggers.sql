@@ -0,0 +1,35 @@
+-- 0011_archive_update_triggers.sql
+--
+-- Edits to an archived row are applied in ArchivedArticles/ArchivedSnapshots
+-- rather than by moving the row out and back. Keep the content refcount and
+-- the search index in step with those in-place updates, as the working
+-- tables' triggers do. The change feed and collection revisions cover the
+-- working lists only, so archive edits don't touch them.
+
+CREATE TRIGGER IF NOT EXISTS content_refs_archived_articles_update
+AFTER UPDATE OF content_hash ON ArchivedArticles
+WHEN OLD.content_hash IS NOT NEW.content_hash
+BEGIN
+    UPDATE ContentBlobs SET refcount = refcount + 1 WHERE hash = NEW.content_hash;
+    UPDATE ContentBlobs SET refcount = refcount - 1 WHERE hash = OLD.content_hash;
+END;
+
+CREATE TRIGGER IF NOT EXISTS content_refs_archived_snapshots_update
+AFTER UPDATE OF content_hash ON ArchivedSnapshots
+WHEN OLD.content_hash IS NOT NEW.content_hash
+BEGIN
+    UPDATE ContentBlobs SET refcount = refcount + 1 WHERE hash = NEW.content_hash;
+    UPDATE ContentBlobs SET refcount = refcount - 1 WHERE hash = OLD.content_hash;
+END;
+
+CREATE TRIGGER IF NOT EXISTS search_index_archived_articles_update
+AFTER UPDATE OF title, summary, source ON ArchivedArticles
+BEGIN
+    UPDATE SearchIndex SET title = NEW.title, body = NEW.summary, source = NEW.source WHERE rowid = NEW.id * 2;
+END;
+
+CREATE TRIGGER IF NOT EXISTS search_index_archived_snapshots_update
+AFTER UPDATE OF title, highlight, source ON ArchivedSnapshots
+BEGIN
+    UPDATE SearchIndex SET title = NEW.title, body = NEW.highlight, source = NEW.source WHERE rowid = NEW.id * 2 + 1;
+END;
@@ -2,6 +2,10 @@
 --
 -- This script defines the database schema for The Lowdown newsletter app.
 -- It includes tables for Articles, Threats, and Podcast Episodes.
+--
+-- This is the baseline schema. It is only run against a database that has no
+-- schema_version table yet; later changes live in database/migrations/ as
+-- numbered NNNN_description.sql files and are applied once each by init_db().
 
 -- Turn on foreign key support
 PRAGMA foreign_keys = ON;
@@ -0,0 +1,115 @@
+# database/url_canonicalizer.py
+#
+# Canonical form of article/snapshot URLs, used for duplicate detection.
+# Two links to the same story -- with tracking parameters, a trailing slash,
+# www., http vs https, an AMP variant or wrapped in a redirector -- map to the
+# same canonical URL and therefore the same url_hash. The url column keeps the
+# link as submitted; only url_hash (unique, see migration 0009) is canonical.
+import hashlib
+from typing import Optional
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+# Query parameters that only identify where a click came from.
+TRACKING_PARAMS = {
+    'fbclid', 'gclid', 'dclid', 'gbraid', 'wbraid', 'msclkid', 'yclid', 'twclid', 'igshid',
+    'mc_cid', 'mc_eid', 'mkt_tok', '_hsenc', '_hsmi', 'hsctatracking', 'oly_anon_id', 'oly_enc_id',
+    'ref', 'ref_src', 'ref_url', 'referrer', 'cmpid', 'cmp', 'ocid', 'smid', 'smtyp',
+    'sr_share', 'spm', 'guccounter', 'guce_referrer', 'guce_referrer_sig', '_ga', '_gl',
+    'ito', 'outputtype', 'amp',
+}
+TRACKING_PREFIXES = ('utm_', 'pk_', 'mtm_', 'at_', 'vero_')
+
+# Redirector hosts that carry the real destination in a query parameter.
+REDIRECTORS = {
+    'google.com': ('/url', ('q', 'url')),
+    'l.facebook.com': ('/l.php', ('u',)),
+    'lm.facebook.com': ('/l.php', ('u',)),
+    'linkedin.com': ('/redir/redirect', ('url',)),
+    'duckduckgo.com': ('/l/', ('uddg',)),
+    'out.reddit.com': ('', ('url',)),
+    'news.url.google.com': ('/url', ('url', 'q')),
+}
+MAX_UNWRAP = 5
+
+DEFAULT_PORTS = {'http': 80, 'https': 443}
+
+
+def _strip_www(host: str) -> str:
+    for prefix in ('www.', 'm.', 'amp.'):
+        if host.startswith(prefix) and host.count('.') > 1:
+            return host[len(prefix):]
+    return host
+
+
+def _unwrap_redirector(host: str, path: str, query: str) -> Optional[str]:
+    """Returns the destination of a known redirector link, or None."""
+    bare = _strip_www(host)
+    rule = REDIRECTORS.get(bare)
+    if rule and path.startswith(rule[0]):
+        params = dict(parse_qsl(query))
+        for name in rule[1]:
+            if params.get(name, '').startswith(('http://', 'https://')):
+                return params[name]
+    # Google AMP viewer: https://www.google.com/amp/s/example.com/story
+    if bare == 'google.com' and path.startswith('/amp/'):
+        return 'https://' + path[len('/amp/s/'):] if path.startswith('/amp/s/') else 'http://' + path[len('/amp/'):]
+    # AMP cache: https://example-com.cdn.ampproject.org/c/s/example.com/story
+    if host.endswith('.cdn.ampproject.org'):
+        for marker, scheme in (('/c/s/', 'https://'), ('/v/s/', 'https://'), ('/c/', 'http://'), ('/v/', 'http://')):
+            if path.startswith(marker):
+                return scheme + path[len(marker):]
+    return None
+
+
+def _strip_amp_path(path: str) -> str:
+    segments = [s for s in path.split('/') if s]
+    if segments and segments[0] == 'amp':
+        segments = segments[1:]
+    if segments and segments[-1] in ('amp', 'amp.html'):
+        segments = segments[:-1]
+    if segments and segments[-1].endswith('.amp.html'):
+        segments[-1] = segments[-1][:-len('.amp.html')] + '.html'
+    elif segments and segments[-1].endswith('.amp'):
+        segments[-1] = segments[-1][:-len('.amp')]
+    return '/' + '/'.join(segments)
+
+
+def canonicalize_url(url: str) -> str:
+    """
+    Returns the canonical form of `url`: https, lower-cased host without
+    www./m./amp., no default port, fragment, tracking parameters, AMP path
+    markers or trailing slash, remaining query parameters sorted. Links
+    wrapped in a known redirector are unwrapped first.
+    """
+    url = (url or '').strip()
+    for _ in range(MAX_UNWRAP):
+        if '://' not in url:
+            url = 'https://' + url.lstrip('/')
+        parts = urlsplit(url)
+        target = _unwrap_redirector((parts.hostname or '').lower(), parts.path, parts.query)
+        if target is None:
+            break
+        url = target
+
+    parts = urlsplit(url)
+    scheme = parts.scheme.lower()
+    if scheme == 'http':
+        scheme = 'https'
+    host = _strip_www((parts.hostname or '').lower().rstrip('.'))
+    if parts.port and parts.port != DEFAULT_PORTS.get(parts.scheme.lower()):
+        host = f"{host}:{parts.port}"
+
+    path = _strip_amp_path(parts.path)
+    if len(path) > 1:
+        path = path.rstrip('/')
+
+    query = sorted(
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if key.lower() not in TRACKING_PARAMS and not key.lower().startswith(TRACKING_PREFIXES)
+    )
+    return urlunsplit((scheme, host, path if path != '/' else '', urlencode(query), ''))
+
+
+def url_hash(url: str) -> str:
+    """SHA-256 of the canonical URL; the value stored in url_hash columns."""
+    return hashlib.sha256(canonicalize_url(url).encode('utf-8')).hexdigest()
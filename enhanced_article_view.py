@@ -3,7 +3,13 @@
 
 import streamlit as st
 import requests
+from services import http_transport
 from typing import List, Dict, Any
+from article_search import search_article_ids
+
+# Keep-alive session shared by every call to the API
+api_session = http_transport.get_session("api")
+
 
 def render_enhanced_article_view(articles: List[Dict[str, Any]], api_url: str):
     """
@@ -154,8 +160,8 @@ def render_enhanced_article_view(articles: List[Dict[str, Any]], api_url: str):
     if 'search_query' not in st.session_state:
         st.session_state.search_query = ''
     
-    # Sort articles by position
-    sorted_articles = sorted(articles, key=lambda x: x.get('position', 999))
+    # Sort articles by rank
+    sorted_articles = sorted(articles, key=lambda x: x.get('rank', 999))
     
     # Advanced Filtering Section
     st.markdown('<div class="filter-bar">', unsafe_allow_html=True)
@@ -210,14 +216,11 @@ def render_enhanced_article_view(articles: List[Dict[str, Any]], api_url: str):
     if filter_source != 'All':
         filtered_articles = [a for a in filtered_articles if a.get('source') == filter_source]
     
-    # Filter by search query
+    # Filter by search query (server-side full-text search, ranked by relevance)
     if search_query:
-        search_lower = search_query.lower()
-        filtered_articles = [
-            a for a in filtered_articles 
-            if search_lower in a.get('title', '').lower() or 
-               search_lower in a.get('summary', '').lower()
-        ]
+        matching_ids = search_article_ids(search_query, api_url)
+        articles_by_id = {a['id']: a for a in filtered_articles}
+        filtered_articles = [articles_by_id[i] for i in matching_ids if i in articles_by_id]
     
     # Bulk Actions Toolbar (only show if articles are selected)
     selected_count = len(st.session_state.selected_articles)
@@ -232,29 +235,29 @@ def render_enhanced_article_view(articles: List[Dict[str, Any]], api_url: str):
         
         with bulk_col1:
             if st.button("✅ Accept Selected", key="bulk_accept"):
-                for article_id in st.session_state.selected_articles:
-                    try:
-                        requests.patch(f"{api_url}/articles/{article_id}", json={"status": "accepted"})
-                    except Exception as e:
-                        st.error(f"Failed to accept article {article_id}: {e}")
+                try:
+                    api_session.patch(f"{api_url}/articles/status", json={"ids": list(st.session_state.selected_articles), "status": "accepted"})
+                except Exception as e:
+                    st.error(f"Failed to accept articles: {e}")
                 st.session_state.selected_articles.clear()
                 st.rerun()
         
         with bulk_col2:
             if st.button("📦 Archive Selected", key="bulk_archive"):
-                for article_id in st.session_state.selected_articles:
-                    try:
-                        requests.patch(f"{api_url}/articles/{article_id}", json={"status": "archived"})
-                    except Exception as e:
-                        st.error(f"Failed to archive article {article_id}: {e}")
+                try:
+                    api_session.patch(f"{api_url}/articles/status", json={"ids": list(st.session_state.selected_articles), "status": "archived"})
+                except Exception as e:
+                    st.error(f"Failed to archive articles: {e}")
                 st.session_state.selected_articles.clear()
                 st.rerun()
         
         with bulk_col3:
+            regenerate = st.checkbox("🔁 Regenerate", key="bulk_regenerate",
+                                     help="Write new summaries even for content summarized before")
             if st.button("🔄 Re-summarize Selected", key="bulk_summarize"):
                 for article_id in st.session_state.selected_articles:
                     try:
-                        requests.post(f"{api_url}/summarize", json={"article_id": article_id})
+                        api_session.post(f"{api_url}/summarize", json={"article_id": article_id, "refresh": regenerate})
                     except Exception as e:
                         st.error(f"Failed to summarize article {article_id}: {e}")
                 st.session_state.selected_articles.clear()
@@ -262,11 +265,10 @@ def render_enhanced_article_view(articles: List[Dict[str, Any]], api_url: str):
         
         with bulk_col4:
             if st.button("📝 Mark as Summarized", key="bulk_summarized"):
-                for article_id in st.session_state.selected_articles:
-                    try:
-                        requests.patch(f"{api_url}/articles/{article_id}", json={"status": "summarized"})
-                    except Exception as e:
-                        st.error(f"Failed to update article {article_id}: {e}")
+                try:
+                    api_session.patch(f"{api_url}/articles/status", json={"ids": list(st.session_state.selected_articles), "status": "summarized"})
+                except Exception as e:
+                    st.error(f"Failed to update articles: {e}")
                 st.session_state.selected_articles.clear()
                 st.rerun()
         
@@ -310,7 +312,7 @@ def render_enhanced_article_view(articles: List[Dict[str, Any]], api_url: str):
     # Render filtered articles
     for index, article in enumerate(filtered_articles):
         article_id = article['id']
-        position = article.get('position', index + 1)
+        position = article.get('rank', index + 1)
         title = article.get('title', 'Untitled')
         status = article.get('status', 'pending')
         
@@ -368,7 +370,7 @@ def render_enhanced_article_view(articles: List[Dict[str, Any]], api_url: str):
                 with save_col:
                     if st.button("💾", key=f"save_title_{article_id}", help="Save"):
                         try:
-                            response = requests.patch(f"{api_url}/articles/{article_id}", 
+                            response = api_session.patch(f"{api_url}/articles/{article_id}", 
                                                     json={"title": new_title})
                             if response.status_code == 200:
                                 st.session_state[f"edit_title_{article_id}"] = False
@@ -399,7 +401,7 @@ def render_enhanced_article_view(articles: List[Dict[str, Any]], api_url: str):
                 )
                 if new_status != status:
                     try:
-                        response = requests.patch(f"{api_url}/articles/{article_id}", 
+                        response = api_session.patch(f"{api_url}/articles/{article_id}", 
                                                 json={"status": new_status})
                         if response.status_code == 200:
                             st.session_state[f"edit_status_{article_id}"] = False
@@ -419,7 +421,7 @@ def render_enhanced_article_view(articles: List[Dict[str, Any]], api_url: str):
                 if st.button("↑", key=f"up_enhanced_{article_id}", help="Move Up"):
                     if position > 1:
                         try:
-                            response = requests.patch(f"{api_url}/articles/{article_id}/position", 
+                            response = api_session.patch(f"{api_url}/articles/{article_id}/position", 
                                                     json={"item_id": article_id, "new_position": position - 1})
                             if response.status_code == 200:
                                 st.rerun()
@@ -429,7 +431,7 @@ def render_enhanced_article_view(articles: List[Dict[str, Any]], api_url: str):
             with action_col2:
                 if st.button("↓", key=f"down_enhanced_{article_id}", help="Move Down"):
                     try:
-                        response = requests.patch(f"{api_url}/articles/{article_id}/position", 
+                        response = api_session.patch(f"{api_url}/articles/{article_id}/position", 
                                                 json={"item_id": article_id, "new_position": position + 1})
                         if response.status_code == 200:
                             st.rerun()
@@ -469,11 +471,11 @@ def render_enhanced_article_view(articles: List[Dict[str, Any]], api_url: str):
                     if st.button("📝 Process Manual Content", key=f"process_manual_enhanced_{article_id}"):
                         if manual_content.strip():
                             try:
-                                response = requests.post(f"{api_url}/summarize-manual", 
+                                response = api_session.post(f"{api_url}/summarize-manual", 
                                                        json={"content": manual_content.strip()})
                                 if response.status_code == 200:
                                     summary_data = response.json()
-                                    update_response = requests.patch(f"{api_url}/articles/{article_id}", 
+                                    update_response = api_session.patch(f"{api_url}/articles/{article_id}", 
                                                                    json={
                                                                        "summary": summary_data["summary"],
                                                                        "status": "summarized"
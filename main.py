@@ -1,21 +1,33 @@
 # main.py
+import asyncio
+import hashlib
+import json
 import os
-from fastapi import FastAPI, HTTPException
-from fastapi.responses import PlainTextResponse
+from fastapi import FastAPI, HTTPException, Query, Request, Response
+from fastapi.responses import PlainTextResponse, StreamingResponse
 from pydantic import BaseModel, Field, ConfigDict
 from typing import List, Optional, Dict, Any
 
-from database import db_handler
-from services import ai_service, web_scraper, perplexity_service
+from database import db_handler, async_db
+from services import ai_service, web_scraper, perplexity_service, job_queue, http_cache, http_transport, llm_cache, openai_gateway
 
 from contextlib import asynccontextmanager
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # on startup
     db_handler.init_db()
+    db_handler.start_position_compactor()
+    await job_queue.start()
     yield
     # on shutdown
     print("Closing DB connection")
+    await job_queue.stop()
+    await http_transport.aclose()
+    http_transport.close()
+    web_scraper.shutdown()
+    db_handler.stop_position_compactor()
+    async_db.shutdown()
+    db_handler.close_db_pools()
 
 app = FastAPI(
     lifespan=lifespan,
@@ -30,6 +42,41 @@ print("=== THE LOWDOWN API SERVER STARTING UP ===")
 def health_check():
     return {"status": "healthy", "service": "The Lowdown API"}
 
+@app.get("/stats/db-pool")
+def db_pool_stats():
+    """Connection pool checkouts, wait time and open connections per database file."""
+    return {"pools": db_handler.get_pool_stats()}
+
+@app.get("/stats/content-store")
+def content_store_stats():
+    """Stored scraped-content blobs and the bytes saved by compression and de-duplication."""
+    return db_handler.get_content_store_stats()
+
+@app.get("/stats/http-cache")
+def http_cache_stats():
+    """Entries and bytes held by the scraper's on-disk HTTP cache."""
+    return http_cache.stats()
+
+@app.get("/stats/scraper")
+def scraper_stats():
+    """Scraper downloads: bytes read, non-HTML responses rejected, bodies cut at the byte cap, extraction tiers."""
+    return web_scraper.stats()
+
+@app.get("/stats/llm-cache")
+def llm_cache_stats():
+    """Entries, bytes and hit/miss counts of the cache of summaries, highlights and scripts."""
+    return llm_cache.stats()
+
+@app.get("/stats/openai")
+def openai_stats():
+    """Per-model OpenAI calls, queue depth, time spent waiting for rate-limit budget, 429s and retries."""
+    return {"models": openai_gateway.metrics()}
+
+@app.get("/stats/http-transport")
+def http_transport_stats():
+    """Outbound requests, retries, errors, new connections and latency per service."""
+    return {"services": http_transport.metrics()}
+
 # --- Pydantic Models ---
 class ArticleCreate(BaseModel):
     url: str
@@ -45,11 +92,35 @@ class Article(BaseModel):
     summary: Optional[str] = None
     status: str
     position: Optional[int] = None
+    rank: Optional[int] = None  # 1-based place in the active list; position is a sparse sort key
     original_content: Optional[str] = None
     created_at: str
     updated_at: str
     model_config = ConfigDict(from_attributes=True)
 
+class ArticleListItem(BaseModel):
+    # Lightweight row for GET /articles; only the requested fields are set.
+    id: int
+    url: Optional[str] = None
+    title: Optional[str] = None
+    source: Optional[str] = None
+    summary: Optional[str] = None
+    status: Optional[str] = None
+    position: Optional[int] = None
+    rank: Optional[int] = None
+    created_at: Optional[str] = None
+    updated_at: Optional[str] = None
+
+class ArticleChanges(BaseModel):
+    revision: int
+    full_resync: bool
+    changes: List[ArticleListItem]
+    deleted: List[int]
+
+class ArticleStatusUpdateResponse(BaseModel):
+    updated: int
+    items: List[ArticleListItem]
+
 class ArticleUpdate(BaseModel):
     url: Optional[str] = None
     title: Optional[str] = None
@@ -122,6 +193,25 @@ class SnapshotCreate(BaseModel):
     highlight: Optional[str] = None
     source: Optional[str] = 'Manual'
 
+class BulkImportRequest(BaseModel):
+    urls: List[str] = Field(..., min_length=1, max_length=db_handler.BULK_IMPORT_MAX)
+    source: Optional[str] = 'Manual'
+
+class BulkImportResult(BaseModel):
+    url: str
+    status: str  # created, unarchived, conflict, duplicate or invalid
+    id: Optional[int] = None
+
+class BulkStatusUpdate(BaseModel):
+    ids: List[int] = Field(..., min_length=1, max_length=db_handler.BULK_STATUS_MAX)
+    status: str
+
+class BulkImportResponse(BaseModel):
+    created: int
+    unarchived: int
+    conflicts: int
+    results: List[BulkImportResult]
+
 class Snapshot(BaseModel):
     id: int
     url: str
@@ -130,11 +220,35 @@ class Snapshot(BaseModel):
     highlight: Optional[str] = None
     status: str
     position: Optional[int] = None
+    rank: Optional[int] = None  # 1-based place in the active list; position is a sparse sort key
     original_content: Optional[str] = None
     created_at: str
     updated_at: str
     model_config = ConfigDict(from_attributes=True)
 
+class SnapshotListItem(BaseModel):
+    # Lightweight row for GET /snapshots; only the requested fields are set.
+    id: int
+    url: Optional[str] = None
+    title: Optional[str] = None
+    source: Optional[str] = None
+    highlight: Optional[str] = None
+    status: Optional[str] = None
+    position: Optional[int] = None
+    rank: Optional[int] = None
+    created_at: Optional[str] = None
+    updated_at: Optional[str] = None
+
+class SnapshotChanges(BaseModel):
+    revision: int
+    full_resync: bool
+    changes: List[SnapshotListItem]
+    deleted: List[int]
+
+class SnapshotStatusUpdateResponse(BaseModel):
+    updated: int
+    items: List[SnapshotListItem]
+
 class SnapshotUpdate(BaseModel):
     url: Optional[str] = None
     title: Optional[str] = None
@@ -144,17 +258,48 @@ class SnapshotUpdate(BaseModel):
 
 class HighlightRequest(BaseModel):
     snapshot_id: int
+    refresh: bool = False  # regenerate instead of reusing a cached result for the same content
 
 class ManualHighlightRequest(BaseModel):
     snapshot_id: int
     manual_content: str
+    refresh: bool = False
 
 class SummarizeRequest(BaseModel):
     article_id: int
+    refresh: bool = False  # regenerate instead of reusing a cached result for the same content
+
+class BatchSummarizeRequest(BaseModel):
+    # Defaults to every pending article when omitted.
+    article_ids: Optional[List[int]] = None
+
+class BatchHighlightRequest(BaseModel):
+    # Defaults to every pending snapshot when omitted.
+    snapshot_ids: Optional[List[int]] = None
+
+class JobItem(BaseModel):
+    item_id: int
+    status: str
+    attempts: int
+    error: Optional[str] = None
+    updated_at: Optional[str] = None
+
+class Job(BaseModel):
+    id: int
+    kind: str
+    status: str
+    total: int
+    progress: float
+    counts: Dict[str, int]
+    items: List[JobItem]
+    created_at: Optional[str] = None
+    updated_at: Optional[str] = None
+    finished_at: Optional[str] = None
 
 class ManualSummarizeRequest(BaseModel):
     article_id: int
     manual_content: str
+    refresh: bool = False
 
 class NewsletterIssueCreate(BaseModel):
     title: str
@@ -191,14 +336,107 @@ class ThreatResearchResponse(BaseModel):
     citations: Optional[List[str]] = None
     error: Optional[str] = None
 
+class SearchResult(BaseModel):
+    kind: str
+    id: int
+    title: Optional[str] = None
+    source: Optional[str] = None
+    status: Optional[str] = None
+    snippet: Optional[str] = None
+    score: float
+
+class SearchResponse(BaseModel):
+    query: str
+    total: int
+    limit: int
+    offset: int
+    results: List[SearchResult]
+
 # --- API Endpoints ---
 @app.get("/")
 def read_root():
     return {"message": "Welcome to The Lowdown API"}
 
-@app.get("/articles", response_model=List[Article])
-def get_articles():
-    return db_handler.fetch_all_articles()
+# --- List pagination helpers ---
+def _parse_fields(fields: Optional[str], allowed) -> Optional[List[str]]:
+    """Parses a comma-separated `fields=` projection, rejecting unknown names."""
+    if not fields:
+        return None
+    requested = [f.strip() for f in fields.split(",") if f.strip()]
+    # id, position and rank are always returned; naming them is harmless.
+    unknown = [f for f in requested if f not in allowed and f != "rank"]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}. Allowed: {', '.join(allowed)}")
+    return requested
+
+def _parse_cursor(cursor: Optional[str]):
+    """Parses an opaque 'position:id' cursor as returned in X-Next-Cursor."""
+    if not cursor:
+        return None
+    try:
+        position, item_id = cursor.split(":")
+        return int(position), int(item_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor.")
+
+def _collection_etag(table: str, request: Request) -> str:
+    """
+    Strong ETag for a list response: the collection's write revision plus the
+    query parameters, so each page/projection is validated separately.
+    """
+    revision = db_handler.get_collection_revision(table)
+    params = hashlib.sha1(str(sorted(request.query_params.multi_items())).encode()).hexdigest()[:12]
+    return f'"{table.lower()}-{revision}-{params}"'
+
+def _etag_matches(request: Request, etag: str) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+    candidates = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates
+
+def _paginate(rows: List[Dict[str, Any]], limit: Optional[int], response: Response) -> List[Dict[str, Any]]:
+    """Trims the look-ahead row and advertises the next page's cursor in a header."""
+    if limit is not None and len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        response.headers["X-Next-Cursor"] = f"{last['position']}:{last['id']}"
+    return rows
+
+@app.get("/articles", response_model=List[ArticleListItem], response_model_exclude_unset=True)
+def get_articles(request: Request, response: Response,
+                 limit: Optional[int] = Query(None, ge=1, le=500),
+                 cursor: Optional[str] = None,
+                 fields: Optional[str] = None):
+    """
+    Lists active articles in rank order without original_content.
+    Pass `limit` to page; follow the X-Next-Cursor header via `cursor` for the next page.
+    Responses carry an ETag; send it back in If-None-Match to get a 304 when nothing changed.
+    """
+    # Read the revision before the rows: a write in between then yields a
+    # stale tag for fresh data, which only costs the client one extra 200.
+    etag = _collection_etag('Articles', request)
+    if _etag_matches(request, etag):
+        return Response(status_code=304, headers={"ETag": etag})
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = "no-cache"
+    rows = db_handler.fetch_all_articles(
+        limit=limit + 1 if limit is not None else None,
+        after=_parse_cursor(cursor),
+        fields=_parse_fields(fields, db_handler.ARTICLE_LIST_FIELDS),
+    )
+    return _paginate(rows, limit, response)
+
+# Declared before /articles/{article_id} so "changes" isn't parsed as an id.
+@app.get("/articles/changes", response_model=ArticleChanges, response_model_exclude_unset=True)
+def get_article_changes(since: int = Query(0, ge=0)):
+    """
+    Delta sync: articles created, updated or reordered after revision `since`
+    and ids deleted since. Archiving moves an article out of the working set,
+    so archived ids are reported in `deleted`.
+    Pass the returned revision as `since` next time.
+    """
+    return db_handler.fetch_changes('Articles', since)
 
 @app.get("/articles/{article_id}", response_model=Article)
 def get_article(article_id: int):
@@ -207,6 +445,23 @@ def get_article(article_id: int):
         raise HTTPException(status_code=404, detail="Article not found.")
     return article
 
+def _bulk_import_response(results: List[Dict[str, Any]]) -> Dict[str, Any]:
+    counts = {status: sum(1 for r in results if r["status"] == status) for status in ("created", "unarchived", "conflict")}
+    return {"created": counts["created"], "unarchived": counts["unarchived"], "conflicts": counts["conflict"], "results": results}
+
+@app.post("/articles/bulk", response_model=BulkImportResponse)
+def bulk_create_articles(request: BulkImportRequest):
+    """
+    Imports many article URLs in one transaction. Each URL gets its own result,
+    so a conflict doesn't fail the rest of the batch.
+    """
+    try:
+        results = db_handler.bulk_add_articles(request.urls, source=request.source or 'Manual')
+    except Exception as e:
+        print(f"ERROR: Bulk article import failed: {e}")
+        raise HTTPException(status_code=500, detail=f"Internal server error: {e}")
+    return _bulk_import_response(results)
+
 @app.post("/articles", response_model=Article, status_code=201)
 def create_article(article: ArticleCreate):
     print(f"--- Article creation started for URL: {article.url} ---")
@@ -230,6 +485,20 @@ def create_article(article: ArticleCreate):
         print(f"ERROR: Failed to create article for URL {article.url}. Unhandled exception: {e}")
         raise HTTPException(status_code=500, detail=f"Internal server error: {e}")
 
+# Declared before /articles/{article_id} so "status" isn't parsed as an id.
+@app.patch("/articles/status", response_model=ArticleStatusUpdateResponse, response_model_exclude_unset=True)
+def bulk_update_article_status(request: BulkStatusUpdate):
+    """
+    Sets one status on many articles with a single UPDATE (or archive move)
+    and returns the affected rows. Unknown ids are skipped.
+    """
+    try:
+        items = db_handler.bulk_update_article_status(request.ids, request.status)
+    except Exception as e:
+        print(f"ERROR: Bulk status update failed: {e}")
+        raise HTTPException(status_code=500, detail=f"Internal server error: {e}")
+    return {"updated": len(items), "items": items}
+
 @app.patch("/articles/{article_id}", response_model=Article)
 def update_article(article_id: int, article_update: ArticleUpdate):
     update_data = article_update.model_dump(exclude_unset=True)
@@ -244,6 +513,24 @@ def delete_article(article_id: int):
         raise HTTPException(status_code=404, detail="Article not found.")
     return
 
+# --- Search Endpoint ---
+@app.get("/search", response_model=SearchResponse)
+def search(
+    q: str,
+    kind: Optional[str] = None,
+    include_archived: bool = False,
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0),
+):
+    """
+    Full-text search across articles and snapshots (title, summary/highlight,
+    source and scraped content), ranked by BM25 with highlighted snippets.
+    """
+    if kind not in (None, 'article', 'snapshot'):
+        raise HTTPException(status_code=400, detail="kind must be 'article' or 'snapshot'.")
+    found = db_handler.search_content(q, kind=kind, include_archived=include_archived, limit=limit, offset=offset)
+    return {"query": q, "limit": limit, "offset": offset, **found}
+
 # --- Threats Endpoints ---
 @app.get("/threats", response_model=List[Threat])
 def get_threats():
@@ -311,9 +598,34 @@ def delete_podcast_episode(episode_id: int):
     return
 
 # --- Snapshots Endpoints ---
-@app.get("/snapshots", response_model=List[Snapshot])
-def get_snapshots():
-    return db_handler.fetch_all_snapshots()
+@app.get("/snapshots", response_model=List[SnapshotListItem], response_model_exclude_unset=True)
+def get_snapshots(request: Request, response: Response,
+                  limit: Optional[int] = Query(None, ge=1, le=500),
+                  cursor: Optional[str] = None,
+                  fields: Optional[str] = None):
+    """
+    Lists active snapshots in rank order without original_content.
+    Pass `limit` to page; follow the X-Next-Cursor header via `cursor` for the next page.
+    Responses carry an ETag; send it back in If-None-Match to get a 304 when nothing changed.
+    """
+    # Read the revision before the rows: a write in between then yields a
+    # stale tag for fresh data, which only costs the client one extra 200.
+    etag = _collection_etag('Snapshots', request)
+    if _etag_matches(request, etag):
+        return Response(status_code=304, headers={"ETag": etag})
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = "no-cache"
+    rows = db_handler.fetch_all_snapshots(
+        limit=limit + 1 if limit is not None else None,
+        after=_parse_cursor(cursor),
+        fields=_parse_fields(fields, db_handler.SNAPSHOT_LIST_FIELDS),
+    )
+    return _paginate(rows, limit, response)
+
+@app.get("/snapshots/changes", response_model=SnapshotChanges, response_model_exclude_unset=True)
+def get_snapshot_changes(since: int = Query(0, ge=0)):
+    """Delta sync for snapshots; see /articles/changes."""
+    return db_handler.fetch_changes('Snapshots', since)
 
 @app.get("/snapshots/{snapshot_id}", response_model=Snapshot)
 def get_snapshot(snapshot_id: int):
@@ -322,6 +634,16 @@ def get_snapshot(snapshot_id: int):
         raise HTTPException(status_code=404, detail="Snapshot not found.")
     return snapshot
 
+@app.post("/snapshots/bulk", response_model=BulkImportResponse)
+def bulk_create_snapshots(request: BulkImportRequest):
+    """Imports many snapshot URLs in one transaction; see /articles/bulk."""
+    try:
+        results = db_handler.bulk_add_snapshots(request.urls, source=request.source or 'Manual')
+    except Exception as e:
+        print(f"Error bulk importing snapshots: {e}")
+        raise HTTPException(status_code=500, detail="Internal server error.")
+    return _bulk_import_response(results)
+
 @app.post("/snapshots", response_model=Snapshot)
 def create_snapshot(snapshot: SnapshotCreate):
     try:
@@ -338,6 +660,16 @@ def create_snapshot(snapshot: SnapshotCreate):
         print(f"Error creating snapshot: {e}")
         raise HTTPException(status_code=500, detail="Internal server error.")
 
+@app.patch("/snapshots/status", response_model=SnapshotStatusUpdateResponse, response_model_exclude_unset=True)
+def bulk_update_snapshot_status(request: BulkStatusUpdate):
+    """Sets one status on many snapshots; see PATCH /articles/status."""
+    try:
+        items = db_handler.bulk_update_snapshot_status(request.ids, request.status)
+    except Exception as e:
+        print(f"Error bulk updating snapshot status: {e}")
+        raise HTTPException(status_code=500, detail="Internal server error.")
+    return {"updated": len(items), "items": items}
+
 @app.patch("/snapshots/{snapshot_id}", response_model=Snapshot)
 def update_snapshot(snapshot_id: int, snapshot_update: SnapshotUpdate):
     update_data = snapshot_update.model_dump(exclude_unset=True)
@@ -352,17 +684,24 @@ def delete_snapshot(snapshot_id: int):
         raise HTTPException(status_code=404, detail="Snapshot not found.")
     return
 
+def _metadata_title(current: Optional[str], url: str, page: Optional[Dict[str, Any]]) -> Optional[str]:
+    """The scraped page's metadata title, when the stored title is empty or just the URL the import saved."""
+    if page and page.get('title') and (not current or current.strip() == url):
+        return page['title']
+    return None
+
 @app.post("/highlight", response_model=Snapshot)
-def highlight_snapshot(request: HighlightRequest):
+async def highlight_snapshot(request: HighlightRequest):
     print(f"--- Highlighting started for snapshot_id: {request.snapshot_id} ---")
-    snapshot = db_handler.get_snapshot_by_id(request.snapshot_id)
+    snapshot = await async_db.get_snapshot_by_id(request.snapshot_id)
     if not snapshot:
         print(f"ERROR: Snapshot not found for snapshot_id: {request.snapshot_id}")
         raise HTTPException(status_code=404, detail="Snapshot not found.")
 
     print(f"Step 1: Scraping content from {snapshot['url']}")
     try:
-        scraped_content = web_scraper.fetch_and_parse_url(snapshot['url'])
+        page = await web_scraper.fetch_article_async(snapshot['url'])
+        scraped_content = page['text'] if page else None
         if not scraped_content or scraped_content.strip() == "":
             print(f"ERROR: Failed to scrape content from {snapshot['url']}")
             raise HTTPException(status_code=400, detail="Failed to scrape content from URL.")
@@ -372,39 +711,7 @@ def highlight_snapshot(request: HighlightRequest):
 
     print(f"Step 2: Generating 1-sentence highlight with AI")
     try:
-        # Create a special prompt for 1-sentence highlights
-        highlight_prompt = f"""You must create ONLY a single sentence highlight that starts with a red flag emoji (🚩).
-        
-Format: 🚩 [single sentence with key facts and numbers] ([more]({snapshot['url']}))
-        
-Example: 🚩 Senate has given the green light for Lohmeier to serve as the 29th under-secretary of the Air Force. ([more](https://example.com))
-        
-Article content:
-        {scraped_content}
-        
-Provide ONLY the single sentence with red flag emoji and (more) link:"""
-        
-        # Create a simple direct prompt for OpenAI instead of using the newsletter summary function
-        api_key = os.getenv("OPENAI_API_KEY")
-        if not api_key:
-            highlight = f"🚩 Unable to generate highlight - OpenAI API key not configured."
-        else:
-            import openai
-            client = openai.OpenAI(api_key=api_key)
-            try:
-                response = client.chat.completions.create(
-                    model="gpt-3.5-turbo",
-                    messages=[
-                        {"role": "system", "content": "You create single-sentence news highlights. Always start with a red flag (🚩) followed by exactly one sentence. No titles, no links, no formatting, no multiple sentences."},
-                        {"role": "user", "content": highlight_prompt}
-                    ],
-                    max_tokens=100,
-                    temperature=0.7
-                )
-                highlight = response.choices[0].message.content.strip()
-            except Exception as e:
-                highlight = f"▶ Error generating highlight: {str(e)}"
-                print(f"OpenAI API error: {e}")
+        highlight = await ai_service.get_ai_highlight_async(scraped_content, snapshot['url'], refresh=request.refresh)
         if not highlight or highlight.strip() == "":
             print("ERROR: AI service returned empty highlight")
             raise HTTPException(status_code=500, detail="AI service failed to generate highlight.")
@@ -413,20 +720,23 @@ Provide ONLY the single sentence with red flag emoji and (more) link:"""
         raise HTTPException(status_code=500, detail=f"AI highlighting failed: {str(e)}")
 
     print(f"Step 3: Updating snapshot in database")
-    success = db_handler.update_snapshot_highlight(request.snapshot_id, highlight, scraped_content)
+    success = await async_db.update_snapshot_highlight(request.snapshot_id, highlight, scraped_content)
     if not success:
         print(f"ERROR: Failed to update snapshot {request.snapshot_id} in database")
         raise HTTPException(status_code=500, detail="Failed to update snapshot in database.")
+    title = _metadata_title(snapshot.get('title'), snapshot['url'], page)
+    if title:
+        await async_db.write(db_handler.update_snapshot, request.snapshot_id, title=title)
 
     # Return the updated snapshot
-    updated_snapshot = db_handler.get_snapshot_by_id(request.snapshot_id)
+    updated_snapshot = await async_db.get_snapshot_by_id(request.snapshot_id)
     print(f"--- Highlighting completed successfully for snapshot_id: {request.snapshot_id} ---")
     return updated_snapshot
 
 @app.post("/highlight-manual", response_model=Snapshot)
-def highlight_snapshot_manual(request: ManualHighlightRequest):
+async def highlight_snapshot_manual(request: ManualHighlightRequest):
     print(f"--- Manual highlighting started for snapshot_id: {request.snapshot_id} ---")
-    snapshot = db_handler.get_snapshot_by_id(request.snapshot_id)
+    snapshot = await async_db.get_snapshot_by_id(request.snapshot_id)
     if not snapshot:
         print(f"ERROR: Snapshot not found for snapshot_id: {request.snapshot_id}")
         raise HTTPException(status_code=404, detail="Snapshot not found.")
@@ -439,39 +749,7 @@ def highlight_snapshot_manual(request: ManualHighlightRequest):
 
     print(f"Step 2: Generating 1-sentence highlight with AI")
     try:
-        # Create a special prompt for 1-sentence highlights
-        highlight_prompt = f"""You must create ONLY a single sentence highlight that starts with a red flag emoji (🚩).
-        
-Format: 🚩 [single sentence with key facts and numbers] ([more]({snapshot['url']}))
-        
-Example: 🚩 Senate has given the green light for Lohmeier to serve as the 29th under-secretary of the Air Force. ([more](https://example.com))
-        
-Article content:
-        {manual_content}
-        
-Provide ONLY the single sentence with red flag emoji and (more) link:"""
-        
-        # Create a simple direct prompt for OpenAI instead of using the newsletter summary function
-        api_key = os.getenv("OPENAI_API_KEY")
-        if not api_key:
-            highlight = f"🚩 Unable to generate highlight - OpenAI API key not configured."
-        else:
-            import openai
-            client = openai.OpenAI(api_key=api_key)
-            try:
-                response = client.chat.completions.create(
-                    model="gpt-3.5-turbo",
-                    messages=[
-                        {"role": "system", "content": "You create single-sentence news highlights. Always start with a red flag (🚩) followed by exactly one sentence. No titles, no links, no formatting, no multiple sentences."},
-                        {"role": "user", "content": highlight_prompt}
-                    ],
-                    max_tokens=100,
-                    temperature=0.7
-                )
-                highlight = response.choices[0].message.content.strip()
-            except Exception as e:
-                highlight = f"▶ Error generating highlight: {str(e)}"
-                print(f"OpenAI API error: {e}")
+        highlight = await ai_service.get_ai_highlight_async(manual_content, snapshot['url'], refresh=request.refresh)
         if not highlight or highlight.strip() == "":
             print("ERROR: AI service returned empty highlight")
             raise HTTPException(status_code=500, detail="AI service failed to generate highlight.")
@@ -480,57 +758,63 @@ Provide ONLY the single sentence with red flag emoji and (more) link:"""
         raise HTTPException(status_code=500, detail=f"AI highlighting failed: {str(e)}")
 
     print(f"Step 3: Updating snapshot in database")
-    success = db_handler.update_snapshot_highlight(request.snapshot_id, highlight, manual_content)
+    success = await async_db.update_snapshot_highlight(request.snapshot_id, highlight, manual_content)
     if not success:
         print(f"ERROR: Failed to update snapshot {request.snapshot_id} in database")
         raise HTTPException(status_code=500, detail="Failed to update snapshot in database.")
 
     # Return the updated snapshot
-    updated_snapshot = db_handler.get_snapshot_by_id(request.snapshot_id)
+    updated_snapshot = await async_db.get_snapshot_by_id(request.snapshot_id)
     print(f"--- Manual highlighting completed successfully for snapshot_id: {request.snapshot_id} ---")
     return updated_snapshot
 
 @app.post("/summarize", response_model=Article)
-def summarize_article(request: SummarizeRequest):
+async def summarize_article(request: SummarizeRequest):
     print(f"--- Summarization started for article_id: {request.article_id} ---")
-    article = db_handler.get_article_by_id(request.article_id)
+    article = await async_db.get_article_by_id(request.article_id)
     if not article:
         print(f"ERROR: Article not found for article_id: {request.article_id}")
         raise HTTPException(status_code=404, detail="Article not found.")
 
     print(f"Step 1: Scraping content from {article['url']}")
     try:
-        content = web_scraper.fetch_and_parse_url(article['url'])
+        page = await web_scraper.fetch_article_async(article['url'])
+        content = page['text'] if page else None
         if not content:
             print(f"ERROR: No content found at URL for article_id: {request.article_id}")
-            db_handler.update_article(request.article_id, status='scraping_failed', summary='No content found at URL.')
+            await async_db.update_article(request.article_id, status='scraping_failed', summary='No content found at URL.')
             raise HTTPException(status_code=400, detail="Failed to fetch or parse article content: No content found.")
-        print("Step 1: Scraping successful.")
+        print(f"Step 1: Scraping successful (extraction tier: {page['tier']}).")
+    except HTTPException:
+        # "No content" is a 400 of its own (final for the job queue), not a scraping error to wrap as a 500.
+        raise
     except Exception as e:
         error_message = f"Scraping error: {str(e)}"
         print(f"ERROR: {error_message} for article_id: {request.article_id}")
-        db_handler.update_article(request.article_id, status='scraping_failed', summary=error_message)
+        await async_db.update_article(request.article_id, status='scraping_failed', summary=error_message)
         raise HTTPException(status_code=500, detail=error_message)
 
     print("Step 2: Getting summary from AI service.")
     try:
-        ai_data = ai_service.get_ai_summary(title=article.get('title', ''), content=content, url=article['url'])
+        title = _metadata_title(article.get('title'), article['url'], page) or article.get('title', '')
+        ai_data = await ai_service.get_ai_summary_async(title=title, content=content, url=article['url'],
+                                                        refresh=request.refresh)
         print("Step 2: AI summary received.")
     except Exception as e:
         error_message = f"AI service error: {str(e)}"
         print(f"ERROR: {error_message} for article_id: {request.article_id}")
-        db_handler.update_article(request.article_id, status='ai_failed', summary=error_message)
+        await async_db.update_article(request.article_id, status='ai_failed', summary=error_message)
         raise HTTPException(status_code=500, detail=error_message)
 
     print("Step 3: Updating article in database.")
     update_payload = {
-        "title": ai_data.get("title"),
+        "title": ai_data.get("title") or title,
         "summary": ai_data.get("summary_body"),
         "original_content": content,
         "status": "summarized"
     }
     
-    updated_article = db_handler.update_article(
+    updated_article = await async_db.update_article(
         article_id=request.article_id,
         **update_payload
     )
@@ -542,10 +826,80 @@ def summarize_article(request: SummarizeRequest):
     print(f"--- Summarization successful for article_id: {request.article_id} ---")
     return updated_article
 
+def _sse(event: str, data: Any) -> str:
+    """One Server-Sent Event; data is JSON so deltas with newlines stay one event."""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+def _event_stream(events) -> StreamingResponse:
+    # no-cache / X-Accel-Buffering keep proxies from holding events back until the end.
+    return StreamingResponse(events, media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+@app.post("/summarize/stream")
+async def summarize_article_stream(request: SummarizeRequest):
+    """
+    Streaming /summarize: Server-Sent Events with `status` ({"step"}) as
+    scraping and summarizing start, `delta` ({"text"}) for each piece of the
+    model's output, then `done` with the saved Article, or `error`
+    ({"detail"}). The article is updated as /summarize would once the stream
+    completes.
+    """
+    article = await async_db.get_article_by_id(request.article_id)
+    if not article:
+        print(f"ERROR: Article not found for article_id: {request.article_id}")
+        raise HTTPException(status_code=404, detail="Article not found.")
+
+    async def events():
+        print(f"--- Streaming summarization started for article_id: {request.article_id} ---")
+        yield _sse("status", {"step": "scraping"})
+        try:
+            page = await web_scraper.fetch_article_async(article['url'])
+        except Exception as e:
+            page, error_message = None, f"Scraping error: {str(e)}"
+        else:
+            error_message = None if page and page['text'] else "No content found at URL."
+        if error_message:
+            print(f"ERROR: {error_message} for article_id: {request.article_id}")
+            await async_db.update_article(request.article_id, status='scraping_failed', summary=error_message)
+            yield _sse("error", {"detail": f"Failed to fetch or parse article content: {error_message}"})
+            return
+        content = page['text']
+
+        yield _sse("status", {"step": "summarizing"})
+        title = _metadata_title(article.get('title'), article['url'], page) or article.get('title', '')
+        chunks = []
+        try:
+            async for delta in ai_service.stream_ai_summary_async(title=title, content=content, url=article['url'],
+                                                                  refresh=request.refresh):
+                chunks.append(delta)
+                yield _sse("delta", {"text": delta})
+        except Exception as e:
+            error_message = f"AI service error: {str(e)}"
+            print(f"ERROR: {error_message} for article_id: {request.article_id}")
+            await async_db.update_article(request.article_id, status='ai_failed', summary=error_message)
+            yield _sse("error", {"detail": error_message})
+            return
+
+        ai_data = ai_service.parse_summary_text("".join(chunks))
+        updated_article = await async_db.update_article(
+            article_id=request.article_id,
+            title=ai_data.get("title") or title,
+            summary=ai_data.get("summary_body"),
+            original_content=content,
+            status="summarized"
+        )
+        if not updated_article:
+            yield _sse("error", {"detail": "Failed to update article after summarization."})
+            return
+        print(f"--- Streaming summarization successful for article_id: {request.article_id} ---")
+        yield _sse("done", Article.model_validate(updated_article).model_dump(mode="json"))
+
+    return _event_stream(events())
+
 @app.post("/summarize-manual", response_model=Article)
-def summarize_article_manual(request: ManualSummarizeRequest):
+async def summarize_article_manual(request: ManualSummarizeRequest):
     print(f"--- Manual summarization started for article_id: {request.article_id} ---")
-    article = db_handler.get_article_by_id(request.article_id)
+    article = await async_db.get_article_by_id(request.article_id)
     if not article:
         print(f"ERROR: Article not found for article_id: {request.article_id}")
         raise HTTPException(status_code=404, detail="Article not found.")
@@ -554,28 +908,30 @@ def summarize_article_manual(request: ManualSummarizeRequest):
     content = request.manual_content.strip()
     if not content:
         print(f"ERROR: No manual content provided for article_id: {request.article_id}")
-        db_handler.update_article(request.article_id, status='content_failed', summary='No manual content provided.')
+        await async_db.update_article(request.article_id, status='content_failed', summary='No manual content provided.')
         raise HTTPException(status_code=400, detail="Manual content cannot be empty.")
     
     print("Step 2: Getting summary from AI service.")
     try:
-        ai_data = ai_service.get_ai_summary(title=article.get('title', ''), content=content, url=article['url'])
+        title = article.get('title', '')
+        ai_data = await ai_service.get_ai_summary_async(title=title, content=content, url=article['url'],
+                                                        refresh=request.refresh)
         print("Step 2: AI summary received.")
     except Exception as e:
         error_message = f"AI service error: {str(e)}"
         print(f"ERROR: {error_message} for article_id: {request.article_id}")
-        db_handler.update_article(request.article_id, status='ai_failed', summary=error_message)
+        await async_db.update_article(request.article_id, status='ai_failed', summary=error_message)
         raise HTTPException(status_code=500, detail=error_message)
 
     print("Step 3: Updating article in database.")
     update_payload = {
-        "title": ai_data.get("title"),
+        "title": ai_data.get("title") or title,
         "summary": ai_data.get("summary_body"),
         "original_content": content,
         "status": "summarized"
     }
     
-    updated_article = db_handler.update_article(
+    updated_article = await async_db.update_article(
         article_id=request.article_id,
         **update_payload
     )
@@ -587,6 +943,99 @@ def summarize_article_manual(request: ManualSummarizeRequest):
     print(f"--- Manual summarization successful for article_id: {request.article_id} ---")
     return updated_article
 
+# --- Background Jobs ---
+# Batch endpoints queue one job item per article/snapshot and return 202
+# straight away; services/job_queue.py works through the items using the
+# same handlers as /summarize and /highlight (highlights in batches, sharing
+# LLM requests). A 4xx from those handlers is final; anything else is retried
+# with backoff.
+async def _run_job_step(endpoint, request):
+    try:
+        await endpoint(request)
+    except HTTPException as e:
+        if e.status_code < 500:
+            raise job_queue.PermanentJobError(e.detail)
+        raise RuntimeError(e.detail)
+
+async def _summarize_job(article_id: int):
+    await _run_job_step(summarize_article, SummarizeRequest(article_id=article_id))
+
+async def _highlight_batch_job(snapshot_ids: List[int]) -> Dict[int, Optional[Exception]]:
+    """
+    Highlights a batch of snapshots as /highlight would, but with the LLM
+    calls batched (ai_service.get_ai_highlights_batch_async). Returns each
+    snapshot's outcome for the job queue.
+    """
+    outcomes: Dict[int, Optional[Exception]] = {}
+    snapshots = {}
+    for snapshot_id in snapshot_ids:
+        snapshot = await async_db.get_snapshot_by_id(snapshot_id)
+        if snapshot:
+            snapshots[snapshot_id] = snapshot
+        else:
+            outcomes[snapshot_id] = job_queue.PermanentJobError("Snapshot not found.")
+
+    # Shared concurrency and per-host caps and a deadline for the whole batch.
+    pages = await web_scraper.fetch_many_pages([s['url'] for s in snapshots.values()])
+    items = []
+    for snapshot_id, snapshot in snapshots.items():
+        page = pages.get(snapshot['url'])
+        if not page or not page['text'].strip():
+            print(f"ERROR: Failed to scrape content from {snapshot['url']}")
+            outcomes[snapshot_id] = job_queue.PermanentJobError("Failed to scrape content from URL.")
+        else:
+            items.append({"id": snapshot_id, "content": page['text'], "url": snapshot['url'],
+                          "snapshot": snapshot, "page": page})
+    if not items:
+        return outcomes
+
+    highlights = await ai_service.get_ai_highlights_batch_async(items)
+    for item in items:
+        highlight = highlights.get(item['id'])
+        if not highlight or highlight.strip() == "":
+            outcomes[item['id']] = RuntimeError("AI service failed to generate highlight.")
+            continue
+        if not await async_db.update_snapshot_highlight(item['id'], highlight, item['content']):
+            outcomes[item['id']] = RuntimeError("Failed to update snapshot in database.")
+            continue
+        title = _metadata_title(item['snapshot'].get('title'), item['url'], item['page'])
+        if title:
+            await async_db.write(db_handler.update_snapshot, item['id'], title=title)
+        outcomes[item['id']] = None
+    return outcomes
+
+job_queue.register('summarize', _summarize_job)
+job_queue.register('highlight', _highlight_batch_job, batch_size=ai_service.HIGHLIGHT_BATCH_MAX_ITEMS)
+
+@app.post("/batch-summarize", response_model=Job, status_code=202)
+async def batch_summarize(request: Optional[BatchSummarizeRequest] = None):
+    """Queues summarization of the given articles (default: all pending). Poll GET /jobs/{id} for progress."""
+    article_ids = request.article_ids if request else None
+    if article_ids is None:
+        article_ids = [a['id'] for a in await async_db.get_articles_by_status('pending')]
+    job = await async_db.write(db_handler.create_job, 'summarize', article_ids)
+    job_queue.notify()
+    print(f"--- Queued summarize job {job['id']} for {job['total']} article(s) ---")
+    return job
+
+@app.post("/batch-highlight", response_model=Job, status_code=202)
+async def batch_highlight(request: Optional[BatchHighlightRequest] = None):
+    """Queues highlighting of the given snapshots (default: all pending). Poll GET /jobs/{id} for progress."""
+    snapshot_ids = request.snapshot_ids if request else None
+    if snapshot_ids is None:
+        snapshot_ids = [s['id'] for s in await async_db.get_snapshots_by_status('pending')]
+    job = await async_db.write(db_handler.create_job, 'highlight', snapshot_ids)
+    job_queue.notify()
+    print(f"--- Queued highlight job {job['id']} for {job['total']} snapshot(s) ---")
+    return job
+
+@app.get("/jobs/{job_id}", response_model=Job)
+async def get_job(job_id: int):
+    job = await async_db.read(db_handler.get_job, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found.")
+    return job
+
 @app.post("/newsletters", response_model=NewsletterIssue, status_code=201)
 def create_newsletter_issue(issue: NewsletterIssueCreate):
     return db_handler.create_newsletter_issue(issue)
@@ -637,7 +1086,7 @@ def export_newsletter(issue_id: int):
 
 # --- Threat Research Endpoint ---
 @app.post("/research-threat", response_model=ThreatResearchResponse)
-def research_threat(request: ThreatResearchRequest):
+async def research_threat(request: ThreatResearchRequest):
     """
     Research a military threat using Perplexity AI and return formatted profile.
     """
@@ -654,7 +1103,8 @@ def research_threat(request: ThreatResearchRequest):
         
         # Create Perplexity service and research threat
         perplexity = perplexity_service.create_perplexity_service(perplexity_api_key)
-        research_data = perplexity.research_threat(request.threat_name)
+        # The Perplexity client is blocking; keep it off the event loop.
+        research_data = await asyncio.to_thread(perplexity.research_threat, request.threat_name)
         
         if research_data["success"]:
             formatted_profiles = perplexity.format_threat_profile(research_data)
@@ -690,6 +1140,7 @@ class TeleprompterRequest(BaseModel):
     host_name: str = "[HOST NAME]"
     show_name: str = "The Lowdown"
     style: str = "news"  # news, conversational, formal
+    refresh: bool = False  # regenerate instead of reusing the cached script for the same content
 
 class TeleprompterResponse(BaseModel):
     success: bool
@@ -701,10 +1152,10 @@ class TeleprompterResponse(BaseModel):
 # Position update models for drag-and-drop
 class PositionUpdateRequest(BaseModel):
     item_id: int
-    new_position: int
+    new_position: int  # 1-based rank to move the item to
 
 class BulkPositionUpdateRequest(BaseModel):
-    updates: List[Dict[str, int]]  # List of {"id": item_id, "position": new_position}
+    updates: List[Dict[str, int]]  # List of {"id": item_id, "position": 1-based rank to move the item to}
 
 # --- Position Update Endpoints for Drag-and-Drop ---
 @app.patch("/articles/{article_id}/position")
@@ -716,7 +1167,7 @@ def update_article_position(article_id: int, request: PositionUpdateRequest):
         # Update the article position in the database
         success = db_handler.update_article_position(article_id, request.new_position)
         if success:
-            return {"success": True, "message": f"Article {article_id} moved to position {request.new_position}"}
+            return {"success": True, "message": f"Article {article_id} moved to rank {request.new_position}"}
         else:
             raise HTTPException(status_code=404, detail="Article not found")
     except Exception as e:
@@ -731,7 +1182,7 @@ def update_snapshot_position(snapshot_id: int, request: PositionUpdateRequest):
         # Update the snapshot position in the database
         success = db_handler.update_snapshot_position(snapshot_id, request.new_position)
         if success:
-            return {"success": True, "message": f"Snapshot {snapshot_id} moved to position {request.new_position}"}
+            return {"success": True, "message": f"Snapshot {snapshot_id} moved to rank {request.new_position}"}
         else:
             raise HTTPException(status_code=404, detail="Snapshot not found")
     except Exception as e:
@@ -740,7 +1191,7 @@ def update_snapshot_position(snapshot_id: int, request: PositionUpdateRequest):
 @app.post("/articles/reorder")
 def bulk_reorder_articles(request: BulkPositionUpdateRequest):
     """
-    Bulk update article positions for efficient drag-and-drop reordering.
+    Moves several articles to the given 1-based ranks in one transaction.
     """
     try:
         success = db_handler.bulk_update_article_positions(request.updates)
@@ -754,7 +1205,7 @@ def bulk_reorder_articles(request: BulkPositionUpdateRequest):
 @app.post("/snapshots/reorder")
 def bulk_reorder_snapshots(request: BulkPositionUpdateRequest):
     """
-    Bulk update snapshot positions for efficient drag-and-drop reordering.
+    Moves several snapshots to the given 1-based ranks in one transaction.
     """
     try:
         success = db_handler.bulk_update_snapshot_positions(request.updates)
@@ -765,63 +1216,43 @@ def bulk_reorder_snapshots(request: BulkPositionUpdateRequest):
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to reorder snapshots: {str(e)}")
 
-@app.post("/generate-teleprompter", response_model=TeleprompterResponse)
-def generate_teleprompter_script(request: TeleprompterRequest):
-    """
-    Generate a news-style teleprompter script from accepted articles and snapshots.
-    """
-    try:
-        print("--- Teleprompter script generation started ---")
-        
-        # Get accepted articles and snapshots
-        accepted_articles = db_handler.get_articles_by_status('accepted')
-        accepted_snapshots = db_handler.get_snapshots_by_status('accepted')
-        
-        if not accepted_articles and not accepted_snapshots:
-            return TeleprompterResponse(
-                success=False,
-                script="",
-                word_count=0,
-                estimated_duration="0:00",
-                error="No accepted articles or snapshots found. Please accept some content first."
-            )
-        
-        # Build content for AI processing
-        content_summary = ""
-        
-        # Add articles
-        if accepted_articles:
-            content_summary += "ARTICLES:\n"
-            for i, article in enumerate(accepted_articles, 1):
-                content_summary += f"{i}. {article['title']}\n"
-                if article.get('summary'):
-                    content_summary += f"   Summary: {article['summary']}\n"
-                content_summary += f"   Source: {article['source']}\n\n"
-        
-        # Add snapshots
-        if accepted_snapshots:
-            content_summary += "SNAPSHOTS:\n"
-            for i, snapshot in enumerate(accepted_snapshots, 1):
-                if snapshot.get('highlight'):
-                    content_summary += f"{i}. {snapshot['highlight']}\n"
-                content_summary += f"   URL: {snapshot['url']}\n\n"
-        
-        # Generate teleprompter script using OpenAI
-        api_key = os.getenv("OPENAI_API_KEY")
-        if not api_key:
-            return TeleprompterResponse(
-                success=False,
-                script="",
-                word_count=0,
-                estimated_duration="0:00",
-                error="OpenAI API key not configured"
-            )
-        
-        import openai
-        client = openai.OpenAI(api_key=api_key)
-        
-        # Create teleprompter script prompt
-        script_prompt = f"""Create a professional news-style teleprompter script for '{request.show_name}' hosted by {request.host_name}.
+# Bump when the script prompt changes, so scripts cached under the old one stop matching.
+TELEPROMPTER_PROMPT_VERSION = "teleprompter-v1"
+
+async def _teleprompter_request(request: TeleprompterRequest):
+    """The OpenAI request for a script over the accepted content, or (None, error) if there is nothing to do."""
+    # Get accepted articles and snapshots
+    accepted_articles = await async_db.get_articles_by_status('accepted')
+    accepted_snapshots = await async_db.get_snapshots_by_status('accepted')
+
+    if not accepted_articles and not accepted_snapshots:
+        return None, "No accepted articles or snapshots found. Please accept some content first."
+
+    # Build content for AI processing
+    content_summary = ""
+
+    # Add articles
+    if accepted_articles:
+        content_summary += "ARTICLES:\n"
+        for i, article in enumerate(accepted_articles, 1):
+            content_summary += f"{i}. {article['title']}\n"
+            if article.get('summary'):
+                content_summary += f"   Summary: {article['summary']}\n"
+            content_summary += f"   Source: {article['source']}\n\n"
+
+    # Add snapshots
+    if accepted_snapshots:
+        content_summary += "SNAPSHOTS:\n"
+        for i, snapshot in enumerate(accepted_snapshots, 1):
+            if snapshot.get('highlight'):
+                content_summary += f"{i}. {snapshot['highlight']}\n"
+            content_summary += f"   URL: {snapshot['url']}\n\n"
+
+    if not os.getenv("OPENAI_API_KEY"):
+        return None, "OpenAI API key not configured"
+
+    # Create teleprompter script prompt
+    script_prompt = f"""Create a professional news-style teleprompter script for '{request.show_name}' hosted by {request.host_name}.
 
 Style: {request.style}
 Include intro: {request.include_intro}
@@ -841,27 +1272,60 @@ Requirements:
 8. Structure: Intro → Stories → Snapshots → Outro
 
 Format the script for easy teleprompter reading with proper spacing and cues."""
+
+    script_request = dict(
+        model="gpt-4",
+        messages=[
+            {"role": "system", "content": "You are a professional news script writer specializing in teleprompter scripts for defense and security news shows. Create clear, readable scripts with proper pacing and emphasis."},
+            {"role": "user", "content": script_prompt}
+        ],
+        max_tokens=2000,
+        temperature=0.7
+    )
+    return script_request, None
+
+def _teleprompter_cache_key(script_request: Dict[str, Any]) -> str:
+    return llm_cache.make_key(TELEPROMPTER_PROMPT_VERSION, script_request["model"],
+                              script_request["temperature"], json.dumps(script_request["messages"]))
+
+def _script_length(script: str):
+    """Word count and estimated read time (m:ss) of a script."""
+    word_count = len(script.split())
+    # Average speaking rate: 150-160 words per minute for news
+    duration_minutes = word_count / 155
+    duration_seconds = int((duration_minutes % 1) * 60)
+    return word_count, f"{int(duration_minutes)}:{duration_seconds:02d}"
+
+@app.post("/generate-teleprompter", response_model=TeleprompterResponse)
+async def generate_teleprompter_script(request: TeleprompterRequest):
+    """
+    Generate a news-style teleprompter script from accepted articles and snapshots.
+    """
+    try:
+        print("--- Teleprompter script generation started ---")
+        script_request, error = await _teleprompter_request(request)
+        if error:
+            return TeleprompterResponse(
+                success=False,
+                script="",
+                word_count=0,
+                estimated_duration="0:00",
+                error=error
+            )
         
+        # Generate teleprompter script using OpenAI
+        client = ai_service.get_async_openai_client(os.getenv("OPENAI_API_KEY"))
+        cache_key = _teleprompter_cache_key(script_request)
+
         try:
-            response = client.chat.completions.create(
-                model="gpt-4",
-                messages=[
-                    {"role": "system", "content": "You are a professional news script writer specializing in teleprompter scripts for defense and security news shows. Create clear, readable scripts with proper pacing and emphasis."},
-                    {"role": "user", "content": script_prompt}
-                ],
-                max_tokens=2000,
-                temperature=0.7
-            )
-            
-            script = response.choices[0].message.content.strip()
-            
-            # Calculate word count and estimated duration
-            word_count = len(script.split())
-            # Average speaking rate: 150-160 words per minute for news
-            duration_minutes = word_count / 155
-            duration_seconds = int((duration_minutes % 1) * 60)
-            duration_str = f"{int(duration_minutes)}:{duration_seconds:02d}"
+            script = await asyncio.to_thread(llm_cache.get, cache_key, request.refresh)
+            if script is None:
+                response = await openai_gateway.create(client, **script_request)
+                script = response.choices[0].message.content.strip()
+                await asyncio.to_thread(llm_cache.put, cache_key, TELEPROMPTER_PROMPT_VERSION,
+                                        script_request["model"], script)
             
+            word_count, duration_str = _script_length(script)
             print(f"--- Teleprompter script generated successfully: {word_count} words, ~{duration_str} ---")
             
             return TeleprompterResponse(
@@ -892,6 +1356,45 @@ Format the script for easy teleprompter reading with proper spacing and cues."""
             error=f"Server error: {str(e)}"
         )
 
+@app.post("/generate-teleprompter/stream")
+async def generate_teleprompter_script_stream(request: TeleprompterRequest):
+    """
+    Streaming /generate-teleprompter: Server-Sent Events with `delta` events
+    ({"text"}) as the script is written, then `done` with the TeleprompterResponse
+    fields, or `error` ({"detail"}). The finished script is cached like the
+    non-streaming endpoint's.
+    """
+    script_request, error = await _teleprompter_request(request)
+
+    async def events():
+        if error:
+            yield _sse("error", {"detail": error})
+            return
+        cache_key = _teleprompter_cache_key(script_request)
+        try:
+            script = await asyncio.to_thread(llm_cache.get, cache_key, request.refresh)
+            if script is not None:
+                yield _sse("delta", {"text": script})
+            else:
+                client = ai_service.get_async_openai_client(os.getenv("OPENAI_API_KEY"))
+                chunks = []
+                async for delta in openai_gateway.stream(client, **script_request):
+                    chunks.append(delta)
+                    yield _sse("delta", {"text": delta})
+                script = "".join(chunks).strip()
+                await asyncio.to_thread(llm_cache.put, cache_key, TELEPROMPTER_PROMPT_VERSION,
+                                        script_request["model"], script)
+        except Exception as e:
+            print(f"OpenAI API error: {e}")
+            yield _sse("error", {"detail": f"AI script generation failed: {str(e)}"})
+            return
+        word_count, duration_str = _script_length(script)
+        print(f"--- Teleprompter script streamed: {word_count} words, ~{duration_str} ---")
+        yield _sse("done", {"success": True, "script": script, "word_count": word_count,
+                            "estimated_duration": duration_str, "error": None})
+
+    return _event_stream(events())
+
 # Server startup configuration for Railway deployment
 if __name__ == "__main__":
     import uvicorn
@@ -1,27 +1,66 @@
 # services/ai_service.py
+import asyncio
+import json
 import os
 import openai
 from dotenv import load_dotenv
-from typing import Dict
+from typing import AsyncIterator, Dict, List, Tuple, Any
 import re
 
+from services import http_transport, llm_cache, openai_gateway, text_compactor
+
 load_dotenv()
 
-def get_ai_summary(title: str, content: str, url: str) -> Dict[str, str]:
-    """
-    Generates a newsletter-style summary and title for an article.
-    """
-    api_key = os.getenv("OPENAI_API_KEY")
-    if not api_key:
-        return {
-            "title": "AI Service Disabled",
-            "summary_body": "🎯 **AI Service Disabled**\n\nOpenAI API key not configured. Please set the OPENAI_API_KEY environment variable. ([more](#))",
-        }
+# Without a timeout a stalled OpenAI call holds its request open indefinitely.
+OPENAI_TIMEOUT = openai_gateway.REQUEST_TIMEOUT
+
+# OpenAI clients are reused so calls share http_transport's keep-alive pool.
+# The SDK's own retries are off: openai_gateway retries, so that a 429 also
+# holds back the other calls queued for the same model.
+_openai_clients: Dict[str, openai.OpenAI] = {}
+_async_openai_clients: Dict[str, Tuple[object, openai.AsyncOpenAI]] = {}
+
+def get_openai_client(api_key: str) -> openai.OpenAI:
+    client = _openai_clients.get(api_key)
+    if client is None:
+        client = openai.OpenAI(api_key=api_key, timeout=OPENAI_TIMEOUT, max_retries=0,
+                               http_client=http_transport.get_client("openai"))
+        _openai_clients[api_key] = client
+    return client
+
+def get_async_openai_client(api_key: str) -> openai.AsyncOpenAI:
+    """The AsyncOpenAI client for the running event loop."""
+    http_client = http_transport.get_async_client("openai")
+    entry = _async_openai_clients.get(api_key)
+    if entry is None or entry[0] is not http_client:
+        entry = (http_client, openai.AsyncOpenAI(api_key=api_key, timeout=OPENAI_TIMEOUT,
+                                                 max_retries=0, http_client=http_client))
+        _async_openai_clients[api_key] = entry
+    return entry[1]
+
+# Cache versions of the prompt templates below; bump one when its prompt or
+# parsing changes so results cached under the old prompt stop matching.
+SUMMARY_PROMPT_VERSION = "summary-v3"
+HIGHLIGHT_PROMPT_VERSION = "highlight-v3"
+# Article URLs are swapped for this in cache keys and cached results, so the
+# same body under a second URL is a hit that links to its own URL.
+_URL_PLACEHOLDER = "{{article_url}}"
+
+def _swap_url(value: Any, old: str, new: str) -> Any:
+    if isinstance(value, dict):
+        return {k: _swap_url(v, old, new) for k, v in value.items()}
+    return value.replace(old, new) if isinstance(value, str) and old else value
 
-    client = openai.OpenAI(api_key=api_key)
-    truncated_content = content[:15000]
+def _cache_key(template: str, request: Dict) -> str:
+    return llm_cache.make_key(template, request["model"], request["temperature"], json.dumps(request["messages"]))
 
-    prompt = f"""
+SUMMARY_SYSTEM_PROMPT = "You are a specialized assistant for a defense and aviation newsletter, outputting structured data."
+HIGHLIGHT_SYSTEM_PROMPT = "You create single-sentence news highlights. Always start with a red flag (🚩) followed by exactly one sentence. No titles, no links, no formatting, no multiple sentences."
+
+def _summary_prompt(title: str, content: str, url: str) -> str:
+    truncated_content = text_compactor.compact(content, text_compactor.SUMMARY_TOKEN_BUDGET, title)
+
+    return f"""
     You are writing for *The Lowdown*, a defense and aviation-focused newsletter. Your task is to analyze the following article and produce two distinct components: a new headline and a fully formatted newsletter summary.
 
     **Article Title:** {title}
@@ -50,37 +89,311 @@ def get_ai_summary(title: str, content: str, url: str) -> Dict[str, str]:
     The U.S. Air Force is looking to send its entire A-10 Warthog fleet to retirement sooner than planned and is also axing the E-7 Wedgetail program, citing cost and delays. This is part of a major fleet shakeup in the 2026 budget proposal that also shuffles F-16s and F-15s, while boosting funds for the B-21 Raider and Sentinel ICBM. The whole plan depends on a budget bill passing, otherwise the Space Force might have to tighten its belt. ([more]({url}))
     """
 
+SUMMARY_MODEL = "gpt-4"
+SUMMARY_TEMPERATURE = 0.7  # Increased for more creativity
+
+def _summary_request(title: str, content: str, url: str) -> Dict:
+    return dict(
+        model=SUMMARY_MODEL,
+        messages=[
+            {"role": "system", "content": SUMMARY_SYSTEM_PROMPT},
+            {"role": "user", "content": _summary_prompt(title, content, url)}
+        ],
+        temperature=SUMMARY_TEMPERATURE,
+        max_tokens=400,
+        top_p=1.0,
+        frequency_penalty=0.0,
+        presence_penalty=0.0
+    )
+
+def _parse_summary(response) -> Dict[str, str]:
+    return parse_summary_text(response.choices[0].message.content)
+
+def parse_summary_text(raw_output: str) -> Dict[str, str]:
+    """Splits the model's HEADLINE / SUMMARY_BODY output into title and summary_body."""
+    raw_output = raw_output.strip()
+
+    # Parse the structured output
+    headline_match = re.search(r"HEADLINE:\s*(.*)", raw_output)
+    summary_body_match = re.search(r"SUMMARY_BODY:\s*([\s\S]*)", raw_output)
+
+    headline = headline_match.group(1).strip() if headline_match else "No headline found"
+    summary_body = summary_body_match.group(1).strip() if summary_body_match else "Could not generate summary body."
+
+    # Clean up any extra markdown that the AI might add before the emoji
+    summary_body = re.sub(r'^\s*\**\s*🎯', '🎯', summary_body)
+
+    return {
+        "title": headline,
+        "summary_body": summary_body,
+    }
+
+def _summary_error(e: Exception) -> Dict[str, str]:
+    return {
+        "title": "Error",
+        "summary_body": f"🎯 **Error**\n\nError generating summary: {e} ([more](#))",
+    }
+
+_SUMMARY_DISABLED = {
+    "title": "AI Service Disabled",
+    "summary_body": "🎯 **AI Service Disabled**\n\nOpenAI API key not configured. Please set the OPENAI_API_KEY environment variable. ([more](#))",
+}
+
+def _summary_cache_key(content: str) -> str:
+    # Keyed by the body alone: summarizing replaces the article's title with
+    # the AI headline, so a title-dependent key would never match on re-summarize.
+    return llm_cache.make_key(SUMMARY_PROMPT_VERSION, SUMMARY_MODEL, SUMMARY_TEMPERATURE, content)
+
+def _cache_summary(key: str, summary: Dict[str, str], url: str):
+    # Unparseable output isn't worth keeping; the next attempt may do better.
+    if summary["title"] != "No headline found":
+        llm_cache.put(key, SUMMARY_PROMPT_VERSION, SUMMARY_MODEL, _swap_url(summary, url, _URL_PLACEHOLDER))
+
+def get_ai_summary(title: str, content: str, url: str, refresh: bool = False) -> Dict[str, str]:
+    """
+    Generates a newsletter-style summary and title for an article. Served
+    from the LLM cache for content summarized before, unless `refresh`.
+    """
+    api_key = os.getenv("OPENAI_API_KEY")
+    if not api_key:
+        return dict(_SUMMARY_DISABLED)
+
+    key = _summary_cache_key(content)
+    cached = llm_cache.get(key, refresh)
+    if cached is not None:
+        return _swap_url(cached, _URL_PLACEHOLDER, url)
+
+    client = get_openai_client(api_key)
+    try:
+        response = openai_gateway.create_sync(client, **_summary_request(title, content, url))
+        summary = _parse_summary(response)
+    except openai_gateway.OpenAIUnavailable:
+        # Rate limited or timed out: fail the call rather than save an error as the summary.
+        raise
+    except Exception as e:
+        return _summary_error(e)
+    _cache_summary(key, summary, url)
+    return summary
+
+async def get_ai_summary_async(title: str, content: str, url: str, refresh: bool = False) -> Dict[str, str]:
+    """
+    Async version of get_ai_summary for async request handlers.
+    """
+    api_key = os.getenv("OPENAI_API_KEY")
+    if not api_key:
+        return dict(_SUMMARY_DISABLED)
+
+    key = _summary_cache_key(content)
+    cached = await asyncio.to_thread(llm_cache.get, key, refresh)
+    if cached is not None:
+        return _swap_url(cached, _URL_PLACEHOLDER, url)
+
+    client = get_async_openai_client(api_key)
     try:
-        response = client.chat.completions.create(
-            model="gpt-4",
-            messages=[
-                {"role": "system", "content": "You are a specialized assistant for a defense and aviation newsletter, outputting structured data."},
-                {"role": "user", "content": prompt}
-            ],
-            temperature=0.7, # Increased for more creativity
-            max_tokens=400,
-            top_p=1.0,
-            frequency_penalty=0.0,
-            presence_penalty=0.0
-        )
-        raw_output = response.choices[0].message.content.strip()
-
-        # Parse the structured output
-        headline_match = re.search(r"HEADLINE:\s*(.*)", raw_output)
-        summary_body_match = re.search(r"SUMMARY_BODY:\s*([\s\S]*)", raw_output)
-
-        headline = headline_match.group(1).strip() if headline_match else "No headline found"
-        summary_body = summary_body_match.group(1).strip() if summary_body_match else "Could not generate summary body."
-
-        # Clean up any extra markdown that the AI might add before the emoji
-        summary_body = re.sub(r'^\s*\**\s*🎯', '🎯', summary_body)
-
-        return {
-            "title": headline,
-            "summary_body": summary_body,
-        }
+        response = await openai_gateway.create(client, **_summary_request(title, content, url))
+        summary = _parse_summary(response)
+    except openai_gateway.OpenAIUnavailable:
+        raise
     except Exception as e:
-        return {
-            "title": "Error",
-            "summary_body": f"🎯 **Error**\n\nError generating summary: {e} ([more](#))",
-        }
+        return _summary_error(e)
+    await asyncio.to_thread(_cache_summary, key, summary, url)
+    return summary
+
+async def stream_ai_summary_async(title: str, content: str, url: str, refresh: bool = False) -> AsyncIterator[str]:
+    """
+    Streaming version of get_ai_summary_async: yields the model's raw output
+    ("HEADLINE: ...\nSUMMARY_BODY: ...") as it is generated; pass the joined
+    text to parse_summary_text. A cached summary is yielded in one piece.
+    The finished summary is cached like get_ai_summary_async's.
+    """
+    api_key = os.getenv("OPENAI_API_KEY")
+    if not api_key:
+        yield _summary_raw(_SUMMARY_DISABLED)
+        return
+
+    key = _summary_cache_key(content)
+    cached = await asyncio.to_thread(llm_cache.get, key, refresh)
+    if cached is not None:
+        yield _summary_raw(_swap_url(cached, _URL_PLACEHOLDER, url))
+        return
+
+    client = get_async_openai_client(api_key)
+    chunks = []
+    async for delta in openai_gateway.stream(client, **_summary_request(title, content, url)):
+        chunks.append(delta)
+        yield delta
+    await asyncio.to_thread(_cache_summary, key, parse_summary_text("".join(chunks)), url)
+
+def _summary_raw(summary: Dict[str, str]) -> str:
+    return f"HEADLINE: {summary['title']}\nSUMMARY_BODY: {summary['summary_body']}"
+
+def _highlight_prompt(content: str, url: str) -> str:
+    return f"""You must create ONLY a single sentence highlight that starts with a red flag emoji (🚩).
+        
+Format: 🚩 [single sentence with key facts and numbers] ([more]({url}))
+        
+Example: 🚩 Senate has given the green light for Lohmeier to serve as the 29th under-secretary of the Air Force. ([more](https://example.com))
+        
+Article content:
+        {text_compactor.compact(content, text_compactor.HIGHLIGHT_TOKEN_BUDGET)}
+        
+Provide ONLY the single sentence with red flag emoji and (more) link:"""
+
+def _highlight_request(content: str, url: str) -> Dict:
+    return dict(
+        model="gpt-3.5-turbo",
+        messages=[
+            {"role": "system", "content": HIGHLIGHT_SYSTEM_PROMPT},
+            {"role": "user", "content": _highlight_prompt(content, url)}
+        ],
+        max_tokens=100,
+        temperature=0.7
+    )
+
+async def get_ai_highlight_async(content: str, url: str, refresh: bool = False) -> str:
+    """
+    Generates a 1-sentence 🚩 highlight for a snapshot. API errors are returned
+    as the highlight text, as the highlight endpoints have always done.
+    Served from the LLM cache for content highlighted before, unless `refresh`.
+    """
+    api_key = os.getenv("OPENAI_API_KEY")
+    if not api_key:
+        return "🚩 Unable to generate highlight - OpenAI API key not configured."
+
+    key = _cache_key(HIGHLIGHT_PROMPT_VERSION, _highlight_request(content, _URL_PLACEHOLDER))
+    cached = await asyncio.to_thread(llm_cache.get, key, refresh)
+    if cached is not None:
+        return _swap_url(cached, _URL_PLACEHOLDER, url)
+
+    client = get_async_openai_client(api_key)
+    try:
+        response = await openai_gateway.create(client, **_highlight_request(content, url))
+        highlight = response.choices[0].message.content.strip()
+    except openai_gateway.OpenAIUnavailable:
+        raise
+    except Exception as e:
+        print(f"OpenAI API error: {e}")
+        return f"▶ Error generating highlight: {str(e)}"
+    if highlight:
+        await asyncio.to_thread(llm_cache.put, key, HIGHLIGHT_PROMPT_VERSION, "gpt-3.5-turbo",
+                                _swap_url(highlight, url, _URL_PLACEHOLDER))
+    return highlight
+
+# --- Batched highlights ---
+# One request highlights several snapshots: their compacted content goes into
+# a single JSON-mode prompt (split into several requests when it would exceed
+# HIGHLIGHT_BATCH_TOKEN_BUDGET), saving a round trip and a system prompt per
+# snapshot. A snapshot missing from the answer, or with an invalid entry,
+# falls back to get_ai_highlight_async on its own.
+HIGHLIGHT_BATCH_MAX_ITEMS = 10
+HIGHLIGHT_BATCH_SYSTEM_PROMPT = "You create single-sentence news highlights for several articles at once and reply with JSON only."
+
+def _highlight_batch_prompt(items: List[Dict[str, Any]]) -> str:
+    articles = "\n\n".join(
+        f"### Article id={item['id']} url={item['url']}\n{item['compacted']}" for item in items)
+    return f"""For EACH article below, write a single sentence highlight that starts with a red flag emoji (🚩), states the key facts and numbers, and ends with a (more) link to that article's url.
+
+Format of one highlight: 🚩 [single sentence with key facts and numbers] ([more](url))
+
+Example: 🚩 Senate has given the green light for Lohmeier to serve as the 29th under-secretary of the Air Force. ([more](https://example.com))
+
+Reply with a JSON object of this shape, with one entry per article:
+{{"highlights": [{{"id": <article id>, "highlight": "<highlight>"}}]}}
+
+{articles}"""
+
+def _highlight_batches(items: List[Dict[str, Any]]) -> List[List[Dict[str, Any]]]:
+    """Groups items so each request stays within the item and token budgets."""
+    batches, current, used = [], [], 0
+    for item in items:
+        cost = text_compactor.count_tokens(item['compacted']) + 30  # heading and JSON entry
+        if current and (len(current) >= HIGHLIGHT_BATCH_MAX_ITEMS or used + cost > text_compactor.HIGHLIGHT_BATCH_TOKEN_BUDGET):
+            batches.append(current)
+            current, used = [], 0
+        current.append(item)
+        used += cost
+    if current:
+        batches.append(current)
+    return batches
+
+def _parse_highlight_batch(raw_output: str, ids) -> Dict[int, str]:
+    """The valid highlights in a batch answer, by id; anything malformed is left out."""
+    try:
+        data = json.loads(raw_output)
+    except ValueError:
+        return {}
+    entries = data.get("highlights") if isinstance(data, dict) else data
+    highlights = {}
+    for entry in entries if isinstance(entries, list) else []:
+        if not isinstance(entry, dict):
+            continue
+        try:
+            item_id = int(entry.get("id"))
+        except (TypeError, ValueError):
+            continue
+        highlight = entry.get("highlight")
+        if item_id in ids and isinstance(highlight, str) and highlight.strip().startswith("🚩"):
+            highlights[item_id] = highlight.strip()
+    return highlights
+
+async def _highlight_batch(client, items: List[Dict[str, Any]]) -> Dict[int, str]:
+    request = dict(
+        model="gpt-3.5-turbo",
+        messages=[
+            {"role": "system", "content": HIGHLIGHT_BATCH_SYSTEM_PROMPT},
+            {"role": "user", "content": _highlight_batch_prompt(items)}
+        ],
+        response_format={"type": "json_object"},
+        max_tokens=90 * len(items) + 50,
+        temperature=0.7
+    )
+    try:
+        response = await openai_gateway.create(client, **request)
+    except openai_gateway.OpenAIUnavailable:
+        raise
+    except Exception as e:
+        print(f"OpenAI API error in batched highlight of {len(items)} item(s): {e}")
+        return {}
+    return _parse_highlight_batch(response.choices[0].message.content, {item['id'] for item in items})
+
+async def get_ai_highlights_batch_async(items: List[Dict[str, Any]], refresh: bool = False) -> Dict[int, str]:
+    """
+    Highlights several snapshots, batching the LLM calls. `items` are dicts
+    with id, content and url; returns {id: highlight}, with the same results
+    get_ai_highlight_async would give (cached highlights are reused, API
+    errors become the highlight text, OpenAIUnavailable is raised).
+    """
+    api_key = os.getenv("OPENAI_API_KEY")
+    if not api_key:
+        return {item['id']: "🚩 Unable to generate highlight - OpenAI API key not configured." for item in items}
+
+    highlights, pending = {}, []
+    for item in items:
+        key = _cache_key(HIGHLIGHT_PROMPT_VERSION, _highlight_request(item['content'], _URL_PLACEHOLDER))
+        cached = await asyncio.to_thread(llm_cache.get, key, refresh)
+        if cached is not None:
+            highlights[item['id']] = _swap_url(cached, _URL_PLACEHOLDER, item['url'])
+        else:
+            compacted = text_compactor.compact(item['content'], text_compactor.HIGHLIGHT_BATCH_ITEM_TOKEN_BUDGET)
+            pending.append({**item, "key": key, "compacted": compacted})
+
+    client = get_async_openai_client(api_key)
+    batches = _highlight_batches(pending)
+    results = await asyncio.gather(*(_highlight_batch(client, batch) for batch in batches))
+    fallbacks = []
+    for batch, batch_highlights in zip(batches, results):
+        for item in batch:
+            highlight = batch_highlights.get(item['id'])
+            if highlight is None:
+                fallbacks.append(item)
+                continue
+            highlights[item['id']] = highlight
+            await asyncio.to_thread(llm_cache.put, item['key'], HIGHLIGHT_PROMPT_VERSION, "gpt-3.5-turbo",
+                                    _swap_url(highlight, item['url'], _URL_PLACEHOLDER))
+    if pending:
+        print(f"Batched highlights: {len(pending) - len(fallbacks)}/{len(pending)} from {len(batches)} request(s), "
+              f"{len(fallbacks)} falling back to single requests")
+    singles = await asyncio.gather(*(get_ai_highlight_async(item['content'], item['url'], refresh=refresh) for item in fallbacks))
+    for item, highlight in zip(fallbacks, singles):
+        highlights[item['id']] = highlight
+    return highlights
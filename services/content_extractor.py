@@ -0,0 +1,135 @@
+# services/content_extractor.py
+#
+# Tiered article extraction. Most news pages already describe themselves in
+# structured metadata (schema.org JSON-LD, OpenGraph tags, an AMP link), and
+# reading that is much cheaper and usually cleaner than stripping a whole DOM
+# with BeautifulSoup. extract() tries the tiers cheapest first:
+#
+#   json-ld           articleBody of an Article object in <script type="application/ld+json">
+#   heuristic         the clutter-stripping BeautifulSoup pass (parse_main_text)
+#   meta-description  og:description / <meta name="description">, the last resort
+#
+# It always returns the page's metadata (title, published date, AMP URL) so
+# callers can fill in a title even when the body comes from the heuristic.
+# The AMP tier lives in web_scraper, since following the link needs a fetch.
+import json
+from typing import Optional, Dict, Any, List
+
+import lxml.html
+from bs4 import BeautifulSoup
+from lxml import etree
+
+TIER_JSON_LD = "json-ld"
+TIER_HEURISTIC = "heuristic"
+TIER_AMP = "amp"
+TIER_META_DESCRIPTION = "meta-description"
+
+# A JSON-LD articleBody shorter than this is usually a teaser for a paywalled
+# page rather than the story, so the heuristic gets a chance to do better.
+MIN_BODY_CHARS = 400
+ARTICLE_TYPES = frozenset({"Article", "NewsArticle", "ReportageNews", "AnalysisNewsArticle",
+                           "BlogPosting", "TechArticle", "Report", "OpinionNewsArticle"})
+
+
+def parse_main_text(html: str) -> str:
+    """
+    Parses the main text content out of an HTML page by removing common clutter.
+    """
+    soup = BeautifulSoup(html, 'lxml')
+
+    # A more robust way to get main content by removing common non-content tags
+    for element in soup(['script', 'style', 'header', 'footer', 'nav', 'aside', 'form', 'button']):
+        element.decompose()
+
+    # Attempt to find a main content container
+    main_content = soup.find('article') or soup.find('main') or soup.body
+
+    if main_content:
+        # Get text chunks and filter out short, likely irrelevant lines
+        text_chunks = [chunk.strip() for chunk in main_content.get_text(separator='\n').splitlines() if len(chunk.strip()) > 25]
+        return "\n".join(text_chunks)
+    return ""
+
+
+def _json_ld_objects(doc) -> List[Dict[str, Any]]:
+    objects = []
+    for script in doc.xpath('//script[@type="application/ld+json"]'):
+        try:
+            data = json.loads(script.text_content() or "null")
+        except ValueError:
+            continue
+        pending = data if isinstance(data, list) else [data]
+        while pending:
+            item = pending.pop(0)
+            if not isinstance(item, dict):
+                continue
+            objects.append(item)
+            graph = item.get("@graph")
+            if isinstance(graph, list):
+                pending.extend(graph)
+    return objects
+
+
+def _is_article(obj: Dict[str, Any]) -> bool:
+    types = obj.get("@type")
+    types = types if isinstance(types, list) else [types]
+    return any(t in ARTICLE_TYPES for t in types if isinstance(t, str))
+
+
+def _meta(doc, *names: str) -> Optional[str]:
+    for name in names:
+        values = doc.xpath('//meta[@property=$n or @name=$n]/@content', n=name)
+        for value in values:
+            if value and value.strip():
+                return value.strip()
+    return None
+
+
+def _clean(value: Any) -> Optional[str]:
+    if not isinstance(value, str):
+        return None
+    return value.strip() or None
+
+
+def extract_metadata(html: str) -> Dict[str, Any]:
+    """
+    Reads the structured metadata from a page with lxml: title, published
+    date, description, AMP URL and any JSON-LD articleBody. Missing fields
+    are None.
+    """
+    try:
+        doc = lxml.html.fromstring(html)
+    except (etree.ParserError, ValueError):
+        return {"title": None, "published": None, "description": None, "amp_url": None, "body": None}
+
+    article = next((obj for obj in _json_ld_objects(doc) if _is_article(obj)), {})
+    titles = doc.xpath('//title/text()')
+    amp = doc.xpath('//link[@rel="amphtml"]/@href')
+    return {
+        "title": _meta(doc, "og:title", "twitter:title") or _clean(article.get("headline"))
+                 or (_clean(" ".join(titles[0].split())) if titles else None),
+        "published": _clean(article.get("datePublished")) or _meta(doc, "article:published_time"),
+        "description": _meta(doc, "og:description", "description", "twitter:description"),
+        "amp_url": amp[0].strip() if amp else None,
+        "body": _clean(article.get("articleBody")),
+    }
+
+
+def extract(html: str) -> Dict[str, Any]:
+    """
+    Extracts a page's article text with the cheapest tier that works. Returns
+    {text, title, published, amp_url, tier}; `tier` names the tier that
+    produced the text, or is None (with empty text) if none did.
+    """
+    meta = extract_metadata(html)
+    page = {"title": meta["title"], "published": meta["published"], "amp_url": meta["amp_url"]}
+
+    if meta["body"] and len(meta["body"]) >= MIN_BODY_CHARS:
+        return {**page, "text": meta["body"], "tier": TIER_JSON_LD}
+    text = parse_main_text(html)
+    if text:
+        return {**page, "text": text, "tier": TIER_HEURISTIC}
+    fallback = meta["body"] or meta["description"]
+    if fallback:
+        return {**page, "text": fallback, "tier": TIER_META_DESCRIPTION}
+    return {**page, "text": "", "tier": None}
@@ -0,0 +1,155 @@
+# services/http_cache.py
+#
+# Persistent HTTP cache for scraped pages. Re-summarizing an article,
+# un-archiving it, or adding the same story as both an article and a snapshot
+# used to download and re-parse the page every time; now the raw response,
+# its validators (ETag / Last-Modified) and the extracted page (text, title,
+# extraction tier; see content_extractor) are kept in a side database next to
+# the main one, keyed by canonical URL hash.
+#
+#   - Within HTTP_CACHE_TTL seconds of the last fetch the cached page is used
+#     without touching the network.
+#   - After that the page is revalidated with If-None-Match /
+#     If-Modified-Since; a 304 refreshes the entry and reuses the page.
+#   - The file is kept under HTTP_CACHE_MAX_BYTES by evicting the least
+#     recently used entries (see side_cache).
+import json
+import os
+import sqlite3
+import time
+from typing import Optional, Dict, Any
+
+from database import content_store
+from database.url_canonicalizer import url_hash
+from services.side_cache import SideCache
+
+HTTP_CACHE_TTL = float(os.getenv("HTTP_CACHE_TTL", str(6 * 3600)))
+HTTP_CACHE_MAX_BYTES = int(os.getenv("HTTP_CACHE_MAX_BYTES", str(200 * 1024 * 1024)))
+HTTP_CACHE_ENABLED = os.getenv("HTTP_CACHE_ENABLED", "1") != "0"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS HttpCache (
+    url_hash TEXT PRIMARY KEY,
+    url TEXT NOT NULL,
+    etag TEXT,
+    last_modified TEXT,
+    codec TEXT NOT NULL,
+    body BLOB,
+    text BLOB,
+    size INTEGER NOT NULL,
+    fetched_at REAL NOT NULL,
+    accessed_at REAL NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_httpcache_accessed ON HttpCache(accessed_at);
+"""
+_cache = SideCache("http_cache.db", "HTTP_CACHE_PATH", "HttpCache", "url_hash", _SCHEMA)
+
+
+def _decode_page(value: str) -> Dict[str, Any]:
+    try:
+        page = json.loads(value)
+    except ValueError:
+        page = None
+    if not isinstance(page, dict):
+        # Entries written before extraction returned metadata hold plain text.
+        page = {"text": value, "title": None, "published": None, "amp_url": None, "tier": None}
+    return page
+
+
+def lookup(url: str) -> Optional[Dict[str, Any]]:
+    """
+    Returns the cached entry for `url` with its extracted page, validators and
+    a `fresh` flag, or None. Marks the entry as recently used.
+    """
+    if not HTTP_CACHE_ENABLED:
+        return None
+    digest = url_hash(url)
+    conn = None
+    try:
+        conn = _cache.connect()
+        row = conn.execute(
+            "SELECT etag, last_modified, codec, text, fetched_at FROM HttpCache WHERE url_hash = ?", (digest,)
+        ).fetchone()
+        if row is None:
+            return None
+        page = _decode_page(content_store.decompress(row['text'], row['codec'])) if row['text'] is not None else None
+        now = time.time()
+        conn.execute("UPDATE HttpCache SET accessed_at = ? WHERE url_hash = ?", (now, digest))
+        conn.commit()
+    except sqlite3.Error as e:
+        # The cache is an optimization; a broken cache file must not stop scraping.
+        print(f"HTTP cache lookup failed for {url}: {e}")
+        return None
+    except Exception as e:
+        # A corrupt blob, or a zstd entry read without zstandard installed: treat it as a miss.
+        print(f"HTTP cache entry for {url} could not be decoded: {e}")
+        return None
+    finally:
+        if conn is not None:
+            conn.close()
+    return {
+        "page": page,
+        "etag": row['etag'],
+        "last_modified": row['last_modified'],
+        "fresh": now - row['fetched_at'] < HTTP_CACHE_TTL,
+    }
+
+
+def conditional_headers(entry: Optional[Dict[str, Any]]) -> Dict[str, str]:
+    """Revalidation headers for a stale entry."""
+    headers = {}
+    if entry and entry.get('etag'):
+        headers['If-None-Match'] = entry['etag']
+    if entry and entry.get('last_modified'):
+        headers['If-Modified-Since'] = entry['last_modified']
+    return headers
+
+
+def store(url: str, body: str, page: Optional[Dict[str, Any]], etag: Optional[str] = None,
+          last_modified: Optional[str] = None):
+    """Caches a 200 response and its extracted page, then evicts if over budget."""
+    if not HTTP_CACHE_ENABLED:
+        return
+    raw = content_store.compress(body)
+    extracted = content_store.compress(json.dumps(page)) if page is not None else None
+    now = time.time()
+    conn = None
+    try:
+        conn = _cache.connect()
+        conn.execute(
+            """INSERT OR REPLACE INTO HttpCache
+               (url_hash, url, etag, last_modified, codec, body, text, size, fetched_at, accessed_at)
+               VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+            (url_hash(url), url, etag, last_modified, content_store.DEFAULT_CODEC, raw, extracted,
+             len(raw) + len(extracted or b""), now, now)
+        )
+        _cache.evict(conn, HTTP_CACHE_MAX_BYTES)
+        conn.commit()
+    except sqlite3.Error as e:
+        print(f"HTTP cache store failed for {url}: {e}")
+    finally:
+        if conn is not None:
+            conn.close()
+
+
+def mark_revalidated(url: str):
+    """Restarts the TTL of an entry the origin answered 304 Not Modified for."""
+    if not HTTP_CACHE_ENABLED:
+        return
+    conn = None
+    try:
+        conn = _cache.connect()
+        now = time.time()
+        conn.execute("UPDATE HttpCache SET fetched_at = ?, accessed_at = ? WHERE url_hash = ?",
+                     (now, now, url_hash(url)))
+        conn.commit()
+    except sqlite3.Error as e:
+        print(f"HTTP cache update failed for {url}: {e}")
+    finally:
+        if conn is not None:
+            conn.close()
+
+
+def stats() -> Dict[str, Any]:
+    return {"enabled": HTTP_CACHE_ENABLED, **_cache.size_stats(),
+            "max_bytes": HTTP_CACHE_MAX_BYTES, "ttl_seconds": HTTP_CACHE_TTL}
@@ -0,0 +1,330 @@
+# services/http_transport.py
+#
+# Shared outbound HTTP for every service that talks to the network: the
+# scraper, Perplexity, OpenAI and the Streamlit admin's calls to this API.
+# Each service gets one long-lived, keep-alive connection pool instead of a
+# new TCP/TLS handshake per request, the same connect/read timeouts, and the
+# same retry policy: jittered exponential backoff on connection errors and
+# 429/5xx responses, waiting as long as a Retry-After header asks for.
+# Each request is retried by exactly one layer:
+#
+#   get_session(service)       requests.Session (retries via urllib3)
+#   get_client(service)        httpx.Client, for SDKs that take one (OpenAI); no retries
+#   get_async_client(service)  httpx.AsyncClient for the running event loop; no retries
+#   request_async(...)         an async request with the retry policy applied
+#
+# The httpx clients don't retry on their own: request_async retries for its
+# callers, and openai_gateway owns retries (and rate limits) for OpenAI.
+#   iter_sse(response)         (event, data) pairs from a streamed text/event-stream response
+#
+# HTTP/2 is used by the httpx clients when the optional `h2` package is
+# installed. metrics() reports requests, retries, errors, latency and new
+# connections per service.
+import asyncio
+import email.utils
+import importlib.util
+import json
+import os
+import random
+import threading
+import time
+from typing import Dict, Any, Iterator, Optional, Tuple
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", "5"))
+READ_TIMEOUT = float(os.getenv("HTTP_READ_TIMEOUT", "30"))
+MAX_RETRIES = int(os.getenv("HTTP_MAX_RETRIES", "2"))
+RETRY_BACKOFF_BASE = float(os.getenv("HTTP_RETRY_BACKOFF_BASE", "0.5"))  # seconds, doubled per attempt
+RETRY_BACKOFF_MAX = float(os.getenv("HTTP_RETRY_BACKOFF_MAX", "30"))
+POOL_SIZE = int(os.getenv("HTTP_POOL_SIZE", "20"))
+# The admin's calls into this API can wait on a scrape plus an LLM call.
+SERVICE_READ_TIMEOUTS = {"api": float(os.getenv("HTTP_API_READ_TIMEOUT", "180"))}
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+# Methods retried on a 5xx as well as on connection errors. POST is only
+# retried when the service opts in (the LLM APIs, where a repeated request
+# costs tokens but has no side effects here).
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+RETRY_POST_SERVICES = frozenset({"openai", "perplexity"})
+
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+_lock = threading.Lock()
+_sessions: Dict[str, requests.Session] = {}
+_clients: Dict[str, httpx.Client] = {}
+_async_clients: Dict[str, Tuple[asyncio.AbstractEventLoop, httpx.AsyncClient]] = {}
+_metrics: Dict[str, Dict[str, float]] = {}
+
+
+# --- Retry policy ---
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP-date), or None."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, email.utils.parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def retry_delay(attempt: int, retry_after: Optional[str] = None) -> float:
+    """
+    Delay before retry number `attempt` (1-based): the server's Retry-After
+    when given, otherwise "full jitter" exponential backoff, so clients that
+    failed together don't all come back at the same moment.
+    """
+    wait = parse_retry_after(retry_after)
+    if wait is not None:
+        return min(wait, RETRY_BACKOFF_MAX)
+    return random.uniform(0, min(RETRY_BACKOFF_MAX, RETRY_BACKOFF_BASE * (2 ** (attempt - 1))))
+
+
+def _should_retry(service: str, method: str, status: Optional[int]) -> bool:
+    if method.upper() not in IDEMPOTENT_METHODS and service not in RETRY_POST_SERVICES:
+        # A non-idempotent request is only safe to repeat if it never got a response
+        # or the server explicitly refused it.
+        return status in (None, 429, 503)
+    return status is None or status in RETRY_STATUSES
+
+
+# --- Metrics ---
+def _service_metrics(service: str) -> Dict[str, float]:
+    with _lock:
+        return _metrics.setdefault(service, {
+            "requests": 0, "retries": 0, "errors": 0, "connections_opened": 0, "total_seconds": 0.0,
+        })
+
+
+def _record(service: str, key: str, amount: float = 1):
+    stats = _service_metrics(service)
+    with _lock:
+        stats[key] += amount
+
+
+def metrics() -> Dict[str, Dict[str, Any]]:
+    """Per-service request counts, retries, errors, new connections and average latency."""
+    report = {}
+    with _lock:
+        items = [(service, dict(stats)) for service, stats in _metrics.items()]
+    for service, stats in items:
+        requests_made = stats["requests"]
+        report[service] = {
+            "requests": int(requests_made),
+            "retries": int(stats["retries"]),
+            "errors": int(stats["errors"]),
+            "connections_opened": int(stats["connections_opened"]),
+            "avg_ms": round(stats["total_seconds"] / requests_made * 1000, 1) if requests_made else None,
+        }
+    for service, session in list(_sessions.items()):
+        # urllib3 counts the connections each host pool has opened; with
+        # keep-alive working this stays near one per host.
+        pools = session.get_adapter("https://").poolmanager.pools
+        opened = sum(pools[key].num_connections for key in list(pools.keys()))
+        entry = report.setdefault(service, {"requests": 0, "retries": 0, "errors": 0, "connections_opened": 0, "avg_ms": None})
+        entry["connections_opened"] += opened
+    return report
+
+
+# --- requests ---
+class _TimeoutSession(requests.Session):
+    """A Session that applies the shared timeouts unless a call passes its own."""
+    read_timeout = READ_TIMEOUT
+
+    def request(self, method, url, **kwargs):
+        kwargs.setdefault("timeout", (CONNECT_TIMEOUT, self.read_timeout))
+        return super().request(method, url, **kwargs)
+
+
+def _urllib3_retry(service: str) -> Retry:
+    methods = None if service in RETRY_POST_SERVICES else IDEMPOTENT_METHODS  # None = every method
+    return Retry(
+        total=MAX_RETRIES,
+        connect=MAX_RETRIES,
+        read=MAX_RETRIES,
+        status=MAX_RETRIES,
+        status_forcelist=RETRY_STATUSES,
+        allowed_methods=methods,
+        backoff_factor=RETRY_BACKOFF_BASE,
+        backoff_max=RETRY_BACKOFF_MAX,
+        backoff_jitter=RETRY_BACKOFF_BASE,
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+
+
+def get_session(service: str) -> requests.Session:
+    """The shared requests.Session for `service`; safe to use from several threads."""
+    session = _sessions.get(service)
+    if session is None:
+        with _lock:
+            session = _sessions.get(service)
+            if session is None:
+                session = _TimeoutSession()
+                session.read_timeout = SERVICE_READ_TIMEOUTS.get(service, READ_TIMEOUT)
+                adapter = HTTPAdapter(pool_connections=POOL_SIZE, pool_maxsize=POOL_SIZE,
+                                      max_retries=_urllib3_retry(service))
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+
+                def _on_response(response, *args, **kwargs):
+                    _record(service, "requests")
+                    _record(service, "total_seconds", response.elapsed.total_seconds())
+                    retries = getattr(getattr(response.raw, "retries", None), "history", ())
+                    if retries:
+                        _record(service, "retries", len(retries))
+                    if response.status_code >= 500:
+                        _record(service, "errors")
+
+                session.hooks["response"].append(_on_response)
+                _sessions[service] = session
+    return session
+
+
+# --- httpx ---
+def _timeout() -> httpx.Timeout:
+    return httpx.Timeout(READ_TIMEOUT, connect=CONNECT_TIMEOUT)
+
+
+def _limits() -> httpx.Limits:
+    return httpx.Limits(max_connections=POOL_SIZE, max_keepalive_connections=POOL_SIZE)
+
+
+def _trace(service: str):
+    def trace(event_name, info):
+        if event_name == "connection.connect_tcp.complete":
+            _record(service, "connections_opened")
+    return trace
+
+
+def get_client(service: str) -> httpx.Client:
+    """The shared synchronous httpx.Client for `service`."""
+    client = _clients.get(service)
+    if client is None:
+        with _lock:
+            client = _clients.get(service)
+            if client is None:
+                client = httpx.Client(
+                    timeout=_timeout(), follow_redirects=True,
+                    transport=httpx.HTTPTransport(http2=HTTP2_AVAILABLE, limits=_limits()),
+                    event_hooks={
+                        "request": [lambda request: request.extensions.setdefault("trace", _trace(service))],
+                        "response": [lambda response: _record(service, "requests")],
+                    },
+                )
+                _clients[service] = client
+    return client
+
+
+def get_async_client(service: str) -> httpx.AsyncClient:
+    """
+    The shared httpx.AsyncClient for `service` on the running event loop. An
+    async client can't be used across loops, so a new loop (a test client, an
+    asyncio.run batch) gets its own.
+    """
+    loop = asyncio.get_running_loop()
+    entry = _async_clients.get(service)
+    if entry is None or entry[0] is not loop or entry[1].is_closed:
+        async def on_request(request):
+            request.extensions.setdefault("trace", _async_trace(service))
+
+        async def on_response(response):
+            _record(service, "requests")
+
+        client = httpx.AsyncClient(
+            timeout=_timeout(), follow_redirects=True,
+            transport=httpx.AsyncHTTPTransport(http2=HTTP2_AVAILABLE, limits=_limits()),
+            event_hooks={"request": [on_request], "response": [on_response]},
+        )
+        _async_clients[service] = (loop, client)
+        entry = _async_clients[service]
+    return entry[1]
+
+
+def _async_trace(service: str):
+    async def trace(event_name, info):
+        if event_name == "connection.connect_tcp.complete":
+            _record(service, "connections_opened")
+    return trace
+
+
+async def request_async(service: str, method: str, url: str, **kwargs) -> httpx.Response:
+    """
+    Sends a request on the service's shared async client, retrying connection
+    errors and retryable statuses with jittered backoff / Retry-After. The
+    last response (or error) is returned (or raised) once retries run out.
+    With stream=True the body is left unread; the caller must aclose() the
+    response.
+    """
+    client = get_async_client(service)
+    stream = kwargs.pop("stream", False)
+    attempt = 0
+    while True:
+        started = time.perf_counter()
+        try:
+            response = await client.send(client.build_request(method, url, **kwargs), stream=stream)
+        except httpx.TransportError:
+            _record(service, "errors")
+            if attempt >= MAX_RETRIES or not _should_retry(service, method, None):
+                raise
+            attempt += 1
+            _record(service, "retries")
+            await asyncio.sleep(retry_delay(attempt))
+            continue
+        finally:
+            _record(service, "total_seconds", time.perf_counter() - started)
+        if response.status_code in RETRY_STATUSES and attempt < MAX_RETRIES and _should_retry(service, method, response.status_code):
+            attempt += 1
+            _record(service, "retries")
+            await response.aclose()
+            await asyncio.sleep(retry_delay(attempt, response.headers.get("Retry-After")))
+            continue
+        if response.status_code >= 500:
+            _record(service, "errors")
+        return response
+
+
+# --- Server-Sent Events ---
+def iter_sse(response: requests.Response) -> Iterator[Tuple[str, Any]]:
+    """
+    Reads a Server-Sent Events response (requested with stream=True) as
+    (event, data) pairs, data JSON-decoded, as each event arrives.
+    """
+    event, data = "message", []
+    for line in response.iter_lines(decode_unicode=True):
+        if not line:
+            if data:
+                yield event, json.loads("\n".join(data))
+            event, data = "message", []
+        elif line.startswith("event:"):
+            event = line[len("event:"):].strip()
+        elif line.startswith("data:"):
+            data.append(line[len("data:"):].lstrip())
+
+
+# --- Shutdown ---
+async def aclose():
+    """Closes the async clients that belong to the running loop (API shutdown)."""
+    loop = asyncio.get_running_loop()
+    for service, (client_loop, client) in list(_async_clients.items()):
+        if client_loop is loop:
+            await client.aclose()
+            _async_clients.pop(service, None)
+
+
+def close():
+    """Closes the sync sessions and clients; they are recreated on next use."""
+    with _lock:
+        sessions, clients = list(_sessions.values()), list(_clients.values())
+        _sessions.clear()
+        _clients.clear()
+    for session in sessions:
+        session.close()
+    for client in clients:
+        client.close()
@@ -0,0 +1,129 @@
+# services/job_queue.py
+#
+# In-process worker pool for durable background jobs (POST /batch-summarize,
+# POST /batch-highlight). Job state lives in the Jobs/JobItems tables, so a
+# restart only loses the items that were mid-flight, and those are re-queued
+# on the next start. Workers are asyncio tasks on the API's event loop; the
+# handlers they run are the same async scrape + LLM paths the single-item
+# endpoints use, so several items are in flight at once without threads.
+# A kind registered with batch_size > 1 gets up to that many items of one job
+# per call (batched LLM prompts), and reports an outcome per item.
+import asyncio
+import os
+from typing import Callable, Dict, List, Optional
+
+from database import async_db, db_handler
+
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "4"))
+MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+RETRY_BASE_DELAY = float(os.getenv("JOB_RETRY_BASE_DELAY", "10"))  # seconds, doubled per attempt
+POLL_INTERVAL = 2.0  # seconds an idle worker waits before looking for due retries
+
+
+class PermanentJobError(Exception):
+    """Raised by a handler for failures a retry won't fix (missing row, no content)."""
+
+
+_handlers: Dict[str, Callable] = {}
+_batch_sizes: Dict[str, int] = {}
+_workers: List[asyncio.Task] = []
+_wakeup: asyncio.Event = None
+
+
+def register(kind: str, handler: Callable, batch_size: int = 1):
+    """
+    Registers the coroutine that processes jobs of `kind`. With batch_size 1
+    it takes one item id and raises on failure; with a larger batch_size it
+    takes a list of item ids and returns {item_id: exception or None}.
+    """
+    _handlers[kind] = handler
+    _batch_sizes[kind] = batch_size
+
+
+def notify():
+    """Wakes idle workers; call after queuing a job."""
+    if _wakeup is not None:
+        _wakeup.set()
+
+
+def retry_delay(attempts: int) -> float:
+    return RETRY_BASE_DELAY * (2 ** (attempts - 1))
+
+
+async def _finish(item: Dict, error: Optional[Exception]) -> None:
+    if error is None:
+        await async_db.write(db_handler.finish_job_item, item['id'])
+    elif isinstance(error, PermanentJobError):
+        print(f"Job {item['job_id']}: {item['kind']} of {item['item_id']} failed: {error}")
+        await async_db.write(db_handler.finish_job_item, item['id'], error=str(error))
+    else:
+        retry_in = retry_delay(item['attempts']) if item['attempts'] < MAX_ATTEMPTS else None
+        print(f"Job {item['job_id']}: {item['kind']} of {item['item_id']} failed (attempt {item['attempts']}): {error}"
+              + (f"; retrying in {retry_in:.0f}s" if retry_in is not None else ""))
+        await async_db.write(db_handler.finish_job_item, item['id'], error=str(error), retry_in=retry_in)
+
+
+async def _process(items: List[Dict]) -> None:
+    kind = items[0]['kind']
+    handler = _handlers.get(kind)
+    if handler is None:
+        for item in items:
+            await async_db.write(db_handler.finish_job_item, item['id'], error=f"No handler for job kind '{kind}'")
+        return
+    if _batch_sizes.get(kind, 1) == 1:
+        try:
+            await handler(items[0]['item_id'])
+        except Exception as e:
+            await _finish(items[0], e)
+        else:
+            await _finish(items[0], None)
+        return
+    try:
+        outcomes = await handler([item['item_id'] for item in items])
+    except Exception as e:
+        outcomes = {item['item_id']: e for item in items}
+    for item in items:
+        await _finish(item, outcomes.get(item['item_id'], RuntimeError("No result from batch handler")))
+
+
+async def _worker(number: int):
+    while True:
+        try:
+            items = await async_db.write(db_handler.claim_job_items, _batch_sizes)
+        except Exception as e:
+            print(f"ERROR: Job worker {number} could not claim an item: {e}")
+            items = []
+        if not items:
+            try:
+                await asyncio.wait_for(_wakeup.wait(), POLL_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+            _wakeup.clear()
+            continue
+        await _process(items)
+
+
+async def start(workers: int = JOB_WORKERS):
+    """Re-queues items interrupted by the last shutdown and starts the workers."""
+    global _wakeup
+    if _workers:
+        return
+    _wakeup = asyncio.Event()
+    recovered = await async_db.write(db_handler.recover_job_items)
+    if recovered:
+        print(f"Job queue: re-queued {recovered} interrupted item(s)")
+    for number in range(workers):
+        _workers.append(asyncio.create_task(_worker(number), name=f"job-worker-{number}"))
+
+
+async def stop():
+    """Cancels the workers. Items they were running stay 'running' until the next start recovers them."""
+    global _wakeup
+    while _workers:
+        task = _workers.pop()
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+    _wakeup = None
@@ -0,0 +1,123 @@
+# services/llm_cache.py
+#
+# Persistent cache of LLM results (summaries, highlights, teleprompter
+# scripts). Re-summarizing unchanged content, or the same article body
+# arriving under two URLs, used to be a fresh OpenAI call every time; now the
+# result is looked up by
+#
+#   SHA-256(prompt template version, model, temperature, SHA-256(input))
+#
+# in a side database next to the main one. Bump a template's version in
+# ai_service when its prompt changes so old results stop matching. Entries
+# older than LLM_CACHE_TTL are dropped, and the file is kept under
+# LLM_CACHE_MAX_BYTES by evicting the least recently used (see side_cache).
+# A cache that can't be read or written is skipped, never fatal. Callers pass
+# refresh=True (the "Regenerate" checkboxes) to skip the lookup and overwrite
+# the entry with a new result.
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Optional, Dict, Any
+
+from services.side_cache import SideCache
+
+LLM_CACHE_TTL = float(os.getenv("LLM_CACHE_TTL", str(30 * 24 * 3600)))
+LLM_CACHE_MAX_BYTES = int(os.getenv("LLM_CACHE_MAX_BYTES", str(50 * 1024 * 1024)))
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "1") != "0"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS LlmCache (
+    cache_key TEXT PRIMARY KEY,
+    template TEXT NOT NULL,
+    model TEXT NOT NULL,
+    value TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    accessed_at REAL NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_llmcache_accessed ON LlmCache(accessed_at);
+CREATE INDEX IF NOT EXISTS idx_llmcache_created ON LlmCache(created_at);
+"""
+_cache = SideCache("llm_cache.db", "LLM_CACHE_PATH", "LlmCache", "cache_key", _SCHEMA)
+_lock = threading.Lock()
+_counters = {"hits": 0, "misses": 0, "bypassed": 0, "stores": 0}
+
+
+def _count(key: str):
+    with _lock:
+        _counters[key] += 1
+
+
+def make_key(template: str, model: str, temperature: float, content: str) -> str:
+    """The cache key for one LLM call: template version, model, temperature and a hash of the input."""
+    content_hash = hashlib.sha256(content.encode("utf-8")).hexdigest()
+    return hashlib.sha256(json.dumps([template, model, temperature, content_hash]).encode("utf-8")).hexdigest()
+
+
+def get(key: str, refresh: bool = False) -> Optional[Any]:
+    """
+    The cached result for `key`, or None on a miss, an expired entry or when
+    `refresh` asks for a new result. Marks a hit as recently used.
+    """
+    if not LLM_CACHE_ENABLED:
+        return None
+    if refresh:
+        _count("bypassed")
+        return None
+    conn = None
+    try:
+        conn = _cache.connect()
+        row = conn.execute("SELECT value, created_at FROM LlmCache WHERE cache_key = ?", (key,)).fetchone()
+        now = time.time()
+        if row is None or now - row['created_at'] >= LLM_CACHE_TTL:
+            _count("misses")
+            return None
+        conn.execute("UPDATE LlmCache SET accessed_at = ? WHERE cache_key = ?", (now, key))
+        conn.commit()
+    except sqlite3.Error as e:
+        print(f"LLM cache lookup failed: {e}")
+        return None
+    finally:
+        if conn is not None:
+            conn.close()
+    _count("hits")
+    return json.loads(row['value'])
+
+
+def put(key: str, template: str, model: str, value: Any):
+    """Caches a successful result, then evicts expired entries and, if over budget, the least recently used."""
+    if not LLM_CACHE_ENABLED:
+        return
+    encoded = json.dumps(value)
+    now = time.time()
+    conn = None
+    try:
+        conn = _cache.connect()
+        conn.execute(
+            """INSERT OR REPLACE INTO LlmCache (cache_key, template, model, value, size, created_at, accessed_at)
+               VALUES (?, ?, ?, ?, ?, ?, ?)""",
+            (key, template, model, encoded, len(encoded.encode("utf-8")), now, now)
+        )
+        # Expired entries go first, then the least recently used if still over budget.
+        conn.execute("DELETE FROM LlmCache WHERE created_at < ?", (now - LLM_CACHE_TTL,))
+        _cache.evict(conn, LLM_CACHE_MAX_BYTES)
+        conn.commit()
+    except sqlite3.Error as e:
+        print(f"LLM cache store failed: {e}")
+        return
+    finally:
+        if conn is not None:
+            conn.close()
+    _count("stores")
+
+
+def stats() -> Dict[str, Any]:
+    with _lock:
+        counters = dict(_counters)
+    lookups = counters["hits"] + counters["misses"]
+    return {"enabled": LLM_CACHE_ENABLED, **_cache.size_stats(), **counters,
+            "hit_rate": round(counters["hits"] / lookups, 3) if lookups else None,
+            "max_bytes": LLM_CACHE_MAX_BYTES, "ttl_seconds": LLM_CACHE_TTL}
@@ -0,0 +1,288 @@
+# services/openai_gateway.py
+#
+# Every OpenAI chat completion goes through here. Each model has two token
+# buckets, requests per minute and tokens per minute, sized to the account's
+# limits; a call reserves one request and its estimated tokens and waits
+# until the buckets cover them, so a batch queues up behind the budget
+# instead of running into 429s. If OpenAI answers 429 anyway, the model's
+# buckets are paused for as long as Retry-After asks and the call is retried.
+# Each call has a deadline covering both the wait and the request; past it,
+# or once retries run out, OpenAIUnavailable is raised so callers can fail
+# (and the job queue retry) rather than save an error message as content.
+#
+#   await create(client, **request)   AsyncOpenAI chat completion
+#   create_sync(client, **request)    the same for openai.OpenAI
+#   stream(client, **request)         async iterator of the completion's text deltas
+#   metrics()                         queue depth, throttle time, 429s per model
+import asyncio
+import os
+import threading
+import time
+from typing import AsyncIterator, Dict, Any, Optional, Tuple
+
+import openai
+
+from services import http_transport, text_compactor
+
+# (requests per minute, tokens per minute). Override per model with
+# OPENAI_LIMITS_<MODEL>="rpm,tpm", e.g. OPENAI_LIMITS_GPT_4="500,30000".
+MODEL_LIMITS: Dict[str, Tuple[int, int]] = {
+    "gpt-4": (500, 10_000),
+    "gpt-3.5-turbo": (3_500, 200_000),
+}
+DEFAULT_LIMITS = (500, 30_000)
+CALL_DEADLINE = float(os.getenv("OPENAI_CALL_DEADLINE", "300"))  # seconds, queueing included
+REQUEST_TIMEOUT = float(os.getenv("OPENAI_TIMEOUT", "60"))
+MAX_RETRIES = int(os.getenv("OPENAI_MAX_RETRIES", "5"))
+
+
+class OpenAIUnavailable(Exception):
+    """The call could not be completed within its deadline or retry budget."""
+
+
+class TokenBucket:
+    """
+    A bucket refilled continuously at `per_minute`. reserve() always succeeds
+    and returns how long the caller must wait; taking the bucket into debt
+    keeps waiters in arrival order without polling.
+    """
+
+    def __init__(self, per_minute: float):
+        self.capacity = float(per_minute)
+        self.rate = self.capacity / 60
+        self.level = self.capacity
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+
+    def _refill(self, now: float):
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self, amount: float, now: float) -> float:
+        self._refill(now)
+        # A single call bigger than the whole budget would otherwise never fit.
+        self.level -= min(amount, self.capacity)
+        return max(0.0, -self.level / self.rate, self.paused_until - now)
+
+    def give_back(self, amount: float, now: float):
+        self._refill(now)
+        self.level = min(self.capacity, self.level + amount)
+
+
+def _limits(model: str) -> Tuple[int, int]:
+    override = os.getenv("OPENAI_LIMITS_" + model.upper().replace("-", "_").replace(".", "_"))
+    if override:
+        rpm, tpm = (int(part) for part in override.split(","))
+        return rpm, tpm
+    return MODEL_LIMITS.get(model, DEFAULT_LIMITS)
+
+
+class _ModelState:
+    def __init__(self, model: str):
+        rpm, tpm = _limits(model)
+        self.lock = threading.Lock()
+        self.requests = TokenBucket(rpm)
+        self.tokens = TokenBucket(tpm)
+        self.stats = {"calls": 0, "queued": 0, "max_queued": 0, "throttled": 0, "throttle_seconds": 0.0,
+                      "rate_limited": 0, "retries": 0, "deadline_exceeded": 0, "failed": 0,
+                      "estimated_tokens": 0, "used_tokens": 0}
+
+    def count(self, key: str, amount: float = 1):
+        with self.lock:
+            self.stats[key] += amount
+
+    def schedule(self, tokens: int, expires: float) -> float:
+        """Reserves one request and `tokens`; returns the wait, or raises if it would pass the deadline."""
+        with self.lock:
+            now = time.monotonic()
+            delay = max(self.requests.reserve(1, now), self.tokens.reserve(tokens, now))
+            if now + delay >= expires:
+                self.requests.give_back(1, now)
+                self.tokens.give_back(tokens, now)
+                self.stats["deadline_exceeded"] += 1
+                raise OpenAIUnavailable(f"OpenAI call would wait {delay:.0f}s for rate-limit budget, past its deadline")
+            if delay:
+                self.stats["throttled"] += 1
+                self.stats["throttle_seconds"] += delay
+                self.stats["queued"] += 1
+                self.stats["max_queued"] = max(self.stats["max_queued"], self.stats["queued"])
+        return delay
+
+    def dequeue(self):
+        self.count("queued", -1)
+
+    def release(self, tokens: int):
+        """Returns a failed attempt's reservation; the retry (or the next caller) reserves afresh."""
+        with self.lock:
+            now = time.monotonic()
+            self.requests.give_back(1, now)
+            self.tokens.give_back(tokens, now)
+
+    def pause(self, seconds: float):
+        """Holds every caller for this model back after a 429."""
+        with self.lock:
+            until = time.monotonic() + seconds
+            self.requests.paused_until = max(self.requests.paused_until, until)
+            self.tokens.paused_until = max(self.tokens.paused_until, until)
+
+    def settle(self, estimated: int, used: Optional[int]):
+        """Corrects the token bucket with the usage OpenAI reported."""
+        with self.lock:
+            self.stats["calls"] += 1
+            self.stats["estimated_tokens"] += estimated
+            if isinstance(used, int):
+                self.stats["used_tokens"] += used
+                self.tokens.give_back(estimated - used, time.monotonic())
+
+
+_lock = threading.Lock()
+_models: Dict[str, _ModelState] = {}
+
+
+def _state(model: str) -> _ModelState:
+    with _lock:
+        if model not in _models:
+            _models[model] = _ModelState(model)
+        return _models[model]
+
+
+def estimate_tokens(request: Dict[str, Any]) -> int:
+    """The prompt's tokens plus the completion's max_tokens."""
+    prompt = sum(text_compactor.count_tokens(str(message.get("content") or "")) for message in request.get("messages", []))
+    return prompt + int(request.get("max_tokens") or 256)
+
+
+def _retry_after(error: openai.APIStatusError) -> Optional[str]:
+    headers = getattr(error.response, "headers", None) or {}
+    if headers.get("retry-after-ms"):
+        try:
+            return str(float(headers["retry-after-ms"]) / 1000)
+        except ValueError:
+            pass
+    return headers.get("retry-after")
+
+
+def _retry_wait(state: _ModelState, error: Exception, attempt: int) -> Optional[float]:
+    """Seconds to wait before retrying after `error`, or None if it isn't retryable."""
+    if attempt > MAX_RETRIES:
+        return None
+    if isinstance(error, openai.RateLimitError):
+        state.count("rate_limited")
+        delay = http_transport.retry_delay(attempt, _retry_after(error))
+        state.pause(delay)
+    elif isinstance(error, (openai.APIConnectionError, openai.InternalServerError)):
+        delay = http_transport.retry_delay(attempt)
+    else:
+        return None
+    state.count("retries")
+    return delay
+
+
+def _give_up(state: _ModelState, model: str, error: Exception):
+    state.count("failed")
+    if isinstance(error, (openai.RateLimitError, openai.APIConnectionError, openai.InternalServerError)):
+        raise OpenAIUnavailable(f"OpenAI {model} unavailable: {error}") from error
+    raise error
+
+
+def _usage(response) -> Optional[int]:
+    used = getattr(getattr(response, "usage", None), "total_tokens", None)
+    return used if isinstance(used, int) else None
+
+
+async def create(client: openai.AsyncOpenAI, deadline: float = CALL_DEADLINE, **request) -> Any:
+    """A chat completion on `client`, scheduled within the model's rate limits."""
+    model = request["model"]
+    state = _state(model)
+    estimated = estimate_tokens(request)
+    expires = time.monotonic() + deadline
+    attempt = 0
+    while True:
+        delay = state.schedule(estimated, expires)
+        if delay:
+            try:
+                await asyncio.sleep(delay)
+            finally:
+                state.dequeue()
+        timeout = min(REQUEST_TIMEOUT, max(1.0, expires - time.monotonic()))
+        try:
+            response = await client.chat.completions.create(**request, timeout=timeout)
+        except openai.OpenAIError as e:
+            state.release(estimated)
+            attempt += 1
+            wait = _retry_wait(state, e, attempt)
+            if wait is None:
+                _give_up(state, model, e)
+            if time.monotonic() + wait >= expires:
+                state.count("deadline_exceeded")
+                _give_up(state, model, e)
+            await asyncio.sleep(wait)
+            continue
+        if not request.get("stream"):
+            state.settle(estimated, _usage(response))
+        return response
+
+
+def create_sync(client: openai.OpenAI, deadline: float = CALL_DEADLINE, **request) -> Any:
+    """create() for the synchronous OpenAI client; shares the same buckets."""
+    model = request["model"]
+    state = _state(model)
+    estimated = estimate_tokens(request)
+    expires = time.monotonic() + deadline
+    attempt = 0
+    while True:
+        delay = state.schedule(estimated, expires)
+        if delay:
+            try:
+                time.sleep(delay)
+            finally:
+                state.dequeue()
+        timeout = min(REQUEST_TIMEOUT, max(1.0, expires - time.monotonic()))
+        try:
+            response = client.chat.completions.create(**request, timeout=timeout)
+        except openai.OpenAIError as e:
+            state.release(estimated)
+            attempt += 1
+            wait = _retry_wait(state, e, attempt)
+            if wait is None:
+                _give_up(state, model, e)
+            if time.monotonic() + wait >= expires:
+                state.count("deadline_exceeded")
+                _give_up(state, model, e)
+            time.sleep(wait)
+            continue
+        if not request.get("stream"):
+            state.settle(estimated, _usage(response))
+        return response
+
+
+async def stream(client: openai.AsyncOpenAI, deadline: float = CALL_DEADLINE, **request) -> AsyncIterator[str]:
+    """
+    A streamed chat completion: yields text deltas as OpenAI produces them.
+    Scheduling and retries apply until the stream opens; an error after the
+    first delta is raised to the caller, since the text can't be taken back.
+    """
+    state = _state(request["model"])
+    chunks = await create(client, deadline, stream=True, stream_options={"include_usage": True}, **request)
+    used = None
+    try:
+        async for chunk in chunks:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+            used = _usage(chunk) or used
+    finally:
+        state.settle(estimate_tokens(request), used)
+
+
+def metrics() -> Dict[str, Dict[str, Any]]:
+    """Per model: calls, current/max queue depth, throttled calls and seconds, 429s, retries, token usage."""
+    report = {}
+    with _lock:
+        states = list(_models.items())
+    for model, state in states:
+        with state.lock:
+            stats = dict(state.stats)
+            rpm, tpm = state.requests.capacity, state.tokens.capacity
+        stats["throttle_seconds"] = round(stats["throttle_seconds"], 2)
+        report[model] = {**stats, "rpm_limit": int(rpm), "tpm_limit": int(tpm)}
+    return report
@@ -1,9 +1,10 @@
-import requests
 import json
 import re
 from typing import Dict, Any, Optional, List
 from enum import Enum
 
+from services import http_transport
+
 class ThreatType(Enum):
     AIRCRAFT = "aircraft"
     SAM_SYSTEM = "sam_system"
@@ -203,7 +204,7 @@ Format this as a detailed military threat assessment."""
                 "return_citations": True
             }
             
-            response = requests.post(
+            response = http_transport.get_session("perplexity").post(
                 self.base_url,
                 headers=self.headers,
                 json=payload,
@@ -0,0 +1,66 @@
+# services/side_cache.py
+#
+# Plumbing shared by the caches kept in side databases next to the main one
+# (http_cache.db, llm_cache.db): locating the file, creating its schema once
+# per path, and keeping it under a byte budget by evicting the least
+# recently used entries. A cache table has a primary key column plus `size`
+# and `accessed_at` columns for this.
+#
+# Caches are an optimization: callers catch sqlite3.Error around connect()
+# and their queries, so a missing or corrupt file never stops the work.
+import os
+from pathlib import Path
+from typing import Dict, Any
+
+from database import db_handler
+
+
+class SideCache:
+    def __init__(self, filename: str, path_env: str, table: str, key_column: str, schema: str):
+        self.filename = filename
+        self.path_env = path_env
+        self.table = table
+        self.key_column = key_column
+        self.schema = schema
+        self._initialized = set()
+
+    def path(self) -> Path:
+        """`path_env` if set, else beside the main database, so tests and deployments get their own."""
+        return Path(os.getenv(self.path_env) or Path(db_handler.DB_PATH).parent / self.filename)
+
+    def connect(self):
+        """A pooled connection to the cache file, with the schema created on first use."""
+        path = str(self.path())
+        conn = db_handler.get_db_connection(path)
+        if path not in self._initialized:
+            try:
+                conn.executescript(self.schema)
+            except Exception:
+                conn.close()
+                raise
+            self._initialized.add(path)
+        return conn
+
+    def evict(self, conn, max_bytes: int) -> int:
+        """Deletes the least recently used entries until the table's size is within `max_bytes`."""
+        total = conn.execute(f"SELECT COALESCE(SUM(size), 0) AS total FROM {self.table}").fetchone()['total']
+        evicted = 0
+        if total <= max_bytes:
+            return evicted
+        rows = conn.execute(f"SELECT {self.key_column} AS cache_key, size FROM {self.table} ORDER BY accessed_at ASC")
+        for row in rows.fetchall():
+            if total <= max_bytes:
+                break
+            conn.execute(f"DELETE FROM {self.table} WHERE {self.key_column} = ?", (row['cache_key'],))
+            total -= row['size']
+            evicted += 1
+        return evicted
+
+    def size_stats(self) -> Dict[str, Any]:
+        """Entry count and stored bytes."""
+        conn = self.connect()
+        try:
+            row = conn.execute(f"SELECT COUNT(*) AS entries, COALESCE(SUM(size), 0) AS bytes FROM {self.table}").fetchone()
+        finally:
+            conn.close()
+        return {"entries": row['entries'], "bytes": row['bytes']}
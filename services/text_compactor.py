@@ -0,0 +1,150 @@
+# services/text_compactor.py
+#
+# Shrinks scraped article text to a token budget before it goes into an LLM
+# prompt. Slicing the first N characters kept cookie banners and "Sign up
+# for our newsletter" lines and cut the story off mid-sentence; compact()
+# instead
+#
+#   1. drops boilerplate and menu lines and lines repeated elsewhere on the page,
+#   2. if the rest still doesn't fit, scores each sentence by position (news
+#      leads carry the key facts) and TF-IDF overlap with the title,
+#   3. keeps the best-scoring sentences that fit the budget, in their
+#      original order, always including the lead.
+#
+# Tokens are counted with tiktoken when it is installed, and estimated from
+# words and punctuation otherwise.
+import functools
+import importlib.util
+import math
+import re
+from collections import Counter
+from typing import List, Optional
+
+# Input budgets per task, in prompt tokens for the article text.
+SUMMARY_TOKEN_BUDGET = 3000
+HIGHLIGHT_TOKEN_BUDGET = 1200
+# Batched highlights: each snapshot's share, and the whole request's article text.
+HIGHLIGHT_BATCH_ITEM_TOKEN_BUDGET = 600
+HIGHLIGHT_BATCH_TOKEN_BUDGET = 6000
+LEAD_SENTENCES = 2  # always kept when they fit
+LEAD_WEIGHT = 1.0
+TITLE_WEIGHT = 2.0
+
+TIKTOKEN_AVAILABLE = importlib.util.find_spec("tiktoken") is not None
+
+# Lines that open with a call to action or site chrome ("Subscribe to our newsletter", "© 2024 ...").
+# Anchored at the start and to whole words, so story text that merely contains "backlog in" or
+# "will share this data" is left alone.
+BOILERPLATE_PATTERNS = re.compile(
+    r"^\W*(?:©|(?:subscribe|sign up|newsletter|we use cookies|cookie (?:policy|settings)|privacy policy|"
+    r"terms of (?:use|service)|all rights reserved|advertisement|sponsored content|share (?:this|on)|follow us|"
+    r"click here|read more|related (?:stories|articles)|log ?in|create an account|copyright)\b)", re.IGNORECASE)
+# A boilerplate match only counts on a short line; a long one is probably story text that opens with it.
+BOILERPLATE_MAX_CHARS = 120
+MIN_LINE_WORDS = 4  # shorter lines are menus, bylines and captions
+_SENTENCE_END = re.compile(r"(?:(?<=[.!?])|(?<=[.!?][\"')\]]))\s+(?=[\"'(\[]?[A-Z0-9])")
+_WORD = re.compile(r"[a-z0-9]+(?:'[a-z]+)?")
+_TOKEN_PIECE = re.compile(r"\w+|[^\w\s]")
+STOPWORDS = frozenset(
+    "a an and are as at be been but by for from has have he her his i in is it its of on or said she that the "
+    "their them they this to was were will with would".split())
+
+
+@functools.lru_cache(maxsize=1)
+def _encoding():
+    import tiktoken
+    return tiktoken.get_encoding("cl100k_base")
+
+
+def count_tokens(text: str) -> int:
+    """Tokens in `text` for the OpenAI chat models (an estimate without tiktoken)."""
+    if not text:
+        return 0
+    if TIKTOKEN_AVAILABLE:
+        return len(_encoding().encode(text))
+    # Roughly one token per short word or punctuation mark; long words split into ~4-character pieces.
+    return sum(max(1, math.ceil(len(piece) / 4)) for piece in _TOKEN_PIECE.findall(text))
+
+
+def _line_key(line: str) -> str:
+    return " ".join(_WORD.findall(line.lower()))
+
+
+def clean_lines(text: str) -> List[str]:
+    """The text's lines minus short, boilerplate and repeated (case/punctuation-insensitive) lines."""
+    kept, seen = [], set()
+    for line in text.splitlines():
+        line = line.strip()
+        key = _line_key(line)
+        if len(key.split()) < MIN_LINE_WORDS or key in seen:
+            continue
+        if len(line) <= BOILERPLATE_MAX_CHARS and BOILERPLATE_PATTERNS.search(line):
+            continue
+        seen.add(key)
+        kept.append(line)
+    return kept
+
+
+def split_sentences(paragraph: str) -> List[str]:
+    return [s.strip() for s in _SENTENCE_END.split(paragraph) if s.strip()]
+
+
+def _terms(text: str) -> List[str]:
+    return [w for w in _WORD.findall(text.lower()) if w not in STOPWORDS and len(w) > 1]
+
+
+def _scores(sentences: List[str], title: str) -> List[float]:
+    """Lead bias plus the TF-IDF weight (within this article) of the title's terms in each sentence."""
+    terms = [_terms(s) for s in sentences]
+    document_frequency = Counter(t for sentence_terms in terms for t in set(sentence_terms))
+    count = len(sentences)
+    title_terms = set(_terms(title))
+    scores = []
+    for position, sentence_terms in enumerate(terms):
+        lead = LEAD_WEIGHT / (1 + position / 3)
+        relevance = 0.0
+        if sentence_terms and title_terms:
+            frequencies = Counter(sentence_terms)
+            relevance = sum(frequencies[t] / len(sentence_terms) * math.log(1 + count / document_frequency[t])
+                            for t in title_terms if t in frequencies)
+        scores.append(lead + TITLE_WEIGHT * relevance)
+    return scores
+
+
+@functools.lru_cache(maxsize=64)
+def compact(text: str, budget: int, title: Optional[str] = None) -> str:
+    """
+    `text` reduced to at most about `budget` tokens: boilerplate and repeated
+    lines removed, then the most salient whole sentences kept in reading order.
+    """
+    # If cleaning leaves nothing (a page of short lines), keep the raw lines rather than send an empty article.
+    lines = clean_lines(text or "") or [line.strip() for line in (text or "").splitlines() if line.strip()]
+    cleaned = "\n".join(lines)
+    if count_tokens(cleaned) <= budget:
+        return cleaned
+
+    # (paragraph index, sentence) so the kept sentences can be regrouped into paragraphs.
+    sentences = [(number, sentence) for number, line in enumerate(lines) for sentence in split_sentences(line)]
+    scores = _scores([s for _, s in sentences], title or "")
+    ranked = sorted(range(len(sentences)), key=lambda i: (i >= LEAD_SENTENCES, -scores[i], i))
+    chosen, used = set(), 0
+    for i in ranked:
+        cost = count_tokens(sentences[i][1]) + 1
+        if used + cost <= budget:
+            chosen.add(i)
+            used += cost
+    if not chosen:
+        # No whole sentence fits (one enormous run-on line); fall back to a prefix.
+        return cleaned[:budget * 4]
+
+    paragraphs, current, current_number = [], [], None
+    for i in sorted(chosen):
+        number, sentence = sentences[i]
+        if number != current_number and current:
+            paragraphs.append(" ".join(current))
+            current = []
+        current_number = number
+        current.append(sentence)
+    if current:
+        paragraphs.append(" ".join(current))
+    return "\n".join(paragraphs)
@@ -1,37 +1,316 @@
 # services/web_scraper.py
+import asyncio
+import codecs
+import contextlib
+import multiprocessing
+import os
+import threading
+import time
 import requests
-from bs4 import BeautifulSoup
-from typing import Optional
+import httpx
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional, Dict, List
+from urllib.parse import urljoin, urlsplit
 
-def fetch_and_parse_url(url: str) -> Optional[str]:
-    """
-    Fetches the content from a URL and parses the main text content by removing common clutter.
-    """
+from services import content_extractor, http_cache, http_transport
+
+REQUEST_TIMEOUT = 15
+# Batch fetching (fetch_many): total and per-host in-flight requests, and the
+# wall-clock budget for a whole batch.
+MAX_CONCURRENCY = int(os.getenv("SCRAPER_MAX_CONCURRENCY", "16"))
+PER_HOST_CONCURRENCY = int(os.getenv("SCRAPER_PER_HOST_CONCURRENCY", "4"))
+BATCH_DEADLINE = float(os.getenv("SCRAPER_BATCH_DEADLINE", "60"))
+PARSE_WORKERS = int(os.getenv("SCRAPER_PARSE_WORKERS", str(min(4, os.cpu_count() or 1))))
+# Downloads are streamed: non-HTML responses are dropped on their headers, and
+# reading stops after MAX_RESPONSE_BYTES (JSON-LD and the article body sit well
+# before that on a news page; the rest is scripts and footers).
+MAX_RESPONSE_BYTES = int(os.getenv("SCRAPER_MAX_RESPONSE_BYTES", str(2 * 1024 * 1024)))
+CHUNK_SIZE = 64 * 1024
+HTML_CONTENT_TYPES = frozenset({"text/html", "application/xhtml+xml"})
+HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.114 Safari/537.36'
+}
+
+def _cache_response(url: str, body: str, headers, page: Optional[Dict]):
+    http_cache.store(url, body, page, headers.get('ETag'), headers.get('Last-Modified'))
+
+# --- Download / extraction counters ---
+_stats_lock = threading.Lock()
+_download_counts: Dict[str, int] = {
+    "downloads": 0, "bytes_downloaded": 0, "rejected_content_type": 0, "truncated": 0, "bytes_saved": 0,
+}
+_tier_counts: Dict[str, int] = {}
+
+
+def _count(key: str, amount: int = 1):
+    with _stats_lock:
+        _download_counts[key] += amount
+
+
+def _record_tier(url: str, page: Dict):
+    tier = page['tier'] or "none"
+    with _stats_lock:
+        _tier_counts[tier] = _tier_counts.get(tier, 0) + 1
+    if page['tier'] is None:
+        print(f"No article text extracted from {url}")
+
+
+def tier_counts() -> Dict[str, int]:
+    """How many fetched pages each extraction tier has produced since start-up ('none' = nothing found)."""
+    with _stats_lock:
+        return dict(_tier_counts)
+
+
+def stats() -> Dict[str, object]:
+    """Download counters (bytes read, responses rejected or cut short, bytes not downloaded) and extraction tiers."""
+    with _stats_lock:
+        downloads = dict(_download_counts)
+    return {**downloads, "max_response_bytes": MAX_RESPONSE_BYTES, "tiers": tier_counts()}
+
+
+# --- Streaming download ---
+def _content_length(headers) -> Optional[int]:
     try:
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.114 Safari/537.36'
-        }
-        response = requests.get(url, headers=headers, timeout=15, allow_redirects=True)
-        response.raise_for_status()
+        return int(headers.get('Content-Length'))
+    except (TypeError, ValueError):
+        return None
+
+
+def _charset(content_type: str) -> str:
+    for param in content_type.split(';')[1:]:
+        name, _, value = param.strip().partition('=')
+        if name.lower() == 'charset':
+            try:
+                return codecs.lookup(value.strip('"\' ')).name
+            except LookupError:
+                break
+    return 'utf-8'
+
+
+def _accept(url: str, headers) -> bool:
+    """Rejects a response from its headers alone when it isn't an HTML page (PDF, video, JSON...)."""
+    content_type = headers.get('Content-Type') or ''
+    media_type = content_type.split(';')[0].strip().lower()
+    if not media_type or media_type in HTML_CONTENT_TYPES:
+        return True
+    print(f"Skipping {url}: content type {media_type} is not HTML")
+    _count("rejected_content_type")
+    _count("bytes_saved", _content_length(headers) or 0)
+    return False
 
-        soup = BeautifulSoup(response.text, 'lxml')
 
-        # A more robust way to get main content by removing common non-content tags
-        for element in soup(['script', 'style', 'header', 'footer', 'nav', 'aside', 'form', 'button']):
-            element.decompose()
+class _Download:
+    """Decodes a streamed body chunk by chunk, stopping at MAX_RESPONSE_BYTES."""
 
-        # Attempt to find a main content container
-        main_content = soup.find('article') or soup.find('main') or soup.body
+    def __init__(self, headers):
+        self.headers = headers
+        self.decoder = codecs.getincrementaldecoder(_charset(headers.get('Content-Type') or ''))(errors='replace')
+        self.parts: List[str] = []
+        self.size = 0
+        self.truncated = False
 
-        if main_content:
-            # Get text chunks and filter out short, likely irrelevant lines
-            text_chunks = [chunk.strip() for chunk in main_content.get_text(separator='\n').splitlines() if len(chunk.strip()) > 25]
-            content = "\n".join(text_chunks)
-        else:
-            content = ""
+    def feed(self, chunk: bytes) -> bool:
+        """Adds a chunk; returns False once the byte budget is used up."""
+        room = MAX_RESPONSE_BYTES - self.size
+        if len(chunk) >= room:
+            chunk, self.truncated = chunk[:room], True
+        self.size += len(chunk)
+        self.parts.append(self.decoder.decode(chunk))
+        return not self.truncated
 
-        return content
+    def finish(self, url: str) -> str:
+        self.parts.append(self.decoder.decode(b'', final=True))
+        _count("downloads")
+        _count("bytes_downloaded", self.size)
+        if self.truncated:
+            print(f"Stopped reading {url} after {self.size} bytes")
+            _count("truncated")
+            length = _content_length(self.headers)
+            # Content-Length is the encoded size, so with gzip this undercounts.
+            _count("bytes_saved", max(0, (length or 0) - self.size))
+        return ''.join(self.parts)
 
+
+def _needs_amp(page: Dict) -> bool:
+    # The AMP version is a second download, so it's only worth it when the
+    # page itself yielded no article text.
+    return page['tier'] in (None, content_extractor.TIER_META_DESCRIPTION) and bool(page.get('amp_url'))
+
+
+def _with_amp(page: Dict, amp_page: Optional[Dict]) -> Dict:
+    if amp_page and amp_page['tier'] in (content_extractor.TIER_JSON_LD, content_extractor.TIER_HEURISTIC):
+        return {**page, "text": amp_page['text'], "tier": content_extractor.TIER_AMP,
+                "title": page['title'] or amp_page['title']}
+    return page
+
+
+def fetch_article(url: str, follow_amp: bool = True) -> Optional[Dict]:
+    """
+    Fetches a URL and extracts its article with content_extractor.extract:
+    {text, title, published, amp_url, tier}, or None if the download failed or
+    the response was not an HTML page.
+    Falls back to the page's AMP version when the page itself has no text.
+    Served from the HTTP cache while fresh; revalidated with the origin once stale.
+    """
+    # AMP URLs canonicalize to the article's url_hash, so the AMP fetch
+    # (follow_amp=False) bypasses the cache; the article's entry holds the
+    # page with the AMP text already merged in.
+    cached = http_cache.lookup(url) if follow_amp else None
+    if cached and cached['fresh']:
+        return cached['page']
+    try:
+        with http_transport.get_session("scraper").get(
+                url, headers={**HEADERS, **http_cache.conditional_headers(cached)},
+                timeout=(http_transport.CONNECT_TIMEOUT, REQUEST_TIMEOUT), allow_redirects=True,
+                stream=True) as response:
+            if response.status_code == 304 and cached:
+                http_cache.mark_revalidated(url)
+                return cached['page']
+            response.raise_for_status()
+            if not _accept(url, response.headers):
+                return None
+            download = _Download(response.headers)
+            for chunk in response.iter_content(CHUNK_SIZE):
+                if not download.feed(chunk):
+                    break
+            body = download.finish(url)
     except requests.RequestException as e:
         print(f"Error fetching or parsing URL {url}: {e}")
         return None
+    page = content_extractor.extract(body)
+    if follow_amp:
+        if _needs_amp(page):
+            page = _with_amp(page, fetch_article(urljoin(url, page['amp_url']), follow_amp=False))
+        _record_tier(url, page)
+        _cache_response(url, body, response.headers, page)
+    return page
+
+def fetch_and_parse_url(url: str) -> Optional[str]:
+    """
+    Fetches the content from a URL and returns its main article text (see fetch_article).
+    """
+    page = fetch_article(url)
+    return page['text'] if page else None
+
+async def _fetch_article_async(url: str, follow_amp: bool = True, limit: Optional[asyncio.Semaphore] = None,
+                               host_limits: Optional[Dict[str, asyncio.Semaphore]] = None,
+                               executor: Optional[ProcessPoolExecutor] = None) -> Optional[Dict]:
+    # As in fetch_article, the AMP fetch bypasses the cache.
+    cached = await asyncio.to_thread(http_cache.lookup, url) if follow_amp else None
+    if cached and cached['fresh']:
+        return cached['page']
+    try:
+        async with contextlib.AsyncExitStack() as slots:
+            if limit is not None:
+                host = urlsplit(url).hostname or ""
+                await slots.enter_async_context(limit)
+                await slots.enter_async_context(host_limits.setdefault(host, asyncio.Semaphore(PER_HOST_CONCURRENCY)))
+            response = await http_transport.request_async(
+                "scraper", "GET", url, headers={**HEADERS, **http_cache.conditional_headers(cached)},
+                timeout=REQUEST_TIMEOUT, stream=True)
+            try:
+                if response.status_code == 304 and cached:
+                    await asyncio.to_thread(http_cache.mark_revalidated, url)
+                    return cached['page']
+                response.raise_for_status()
+                if not _accept(url, response.headers):
+                    return None
+                download = _Download(response.headers)
+                async for chunk in response.aiter_bytes(CHUNK_SIZE):
+                    if not download.feed(chunk):
+                        break
+                body = download.finish(url)
+            finally:
+                await response.aclose()
+    except httpx.HTTPError as e:
+        print(f"Error fetching or parsing URL {url}: {e}")
+        return None
+    # Parsing happens outside the semaphores so the next download can start.
+    if executor is not None:
+        page = await asyncio.get_running_loop().run_in_executor(executor, content_extractor.extract, body)
+    else:
+        page = await asyncio.to_thread(content_extractor.extract, body)
+    if follow_amp:
+        if _needs_amp(page):
+            amp_page = await _fetch_article_async(urljoin(url, page['amp_url']), follow_amp=False, limit=limit,
+                                                  host_limits=host_limits, executor=executor)
+            page = _with_amp(page, amp_page)
+        _record_tier(url, page)
+        await asyncio.to_thread(_cache_response, url, body, response.headers, page)
+    return page
+
+async def fetch_article_async(url: str) -> Optional[Dict]:
+    """
+    Async version of fetch_article for async request handlers. The download
+    doesn't block the event loop, and extraction (CPU-bound) runs in a worker
+    thread.
+    """
+    return await _fetch_article_async(url)
+
+async def fetch_and_parse_url_async(url: str) -> Optional[str]:
+    """Async version of fetch_and_parse_url."""
+    page = await fetch_article_async(url)
+    return page['text'] if page else None
+
+# --- Batch fetching ---
+_parse_pool: Optional[ProcessPoolExecutor] = None
+
+
+def _get_parse_pool() -> ProcessPoolExecutor:
+    global _parse_pool
+    if _parse_pool is None:
+        # Spawned, not forked: by the time a batch runs, the API process has
+        # DB writer, reader-pool and compactor threads a fork would copy mid-lock.
+        _parse_pool = ProcessPoolExecutor(max_workers=PARSE_WORKERS, mp_context=multiprocessing.get_context("spawn"))
+    return _parse_pool
+
+
+def shutdown():
+    """Stops the parse worker processes. They are recreated on next use."""
+    global _parse_pool
+    if _parse_pool is not None:
+        _parse_pool.shutdown(wait=True, cancel_futures=True)
+        _parse_pool = None
+
+
+async def fetch_many_pages(urls: List[str], deadline: float = BATCH_DEADLINE) -> Dict[str, Optional[Dict]]:
+    """
+    Fetches and parses many URLs concurrently, at most MAX_CONCURRENCY at a
+    time and PER_HOST_CONCURRENCY per host, so one slow site can't take every
+    slot. Extraction runs in a process pool so it doesn't hold up
+    the event loop or the other fetches. Returns {url: page or None} (pages
+    as fetch_article returns them); URLs that fail, or are still running when
+    `deadline` seconds have passed, map to None.
+    """
+    urls = list(dict.fromkeys(urls))
+    if not urls:
+        return {}
+    limit = asyncio.Semaphore(MAX_CONCURRENCY)
+    host_limits: Dict[str, asyncio.Semaphore] = {}
+    started = time.perf_counter()
+    executor = _get_parse_pool()
+    tasks = {asyncio.create_task(_fetch_article_async(url, limit=limit, host_limits=host_limits, executor=executor)): url
+             for url in urls}
+    done, pending = await asyncio.wait(tasks, timeout=deadline)
+    for task in pending:
+        task.cancel()
+    await asyncio.gather(*pending, return_exceptions=True)
+
+    results = {}
+    for task, url in tasks.items():
+        results[url] = None
+        if task in done:
+            if task.exception() is not None:
+                print(f"Error fetching or parsing URL {url}: {task.exception()}")
+            else:
+                results[url] = task.result()
+    if pending:
+        print(f"fetch_many: {len(pending)} of {len(urls)} URLs still running after {deadline:.0f}s deadline")
+    print(f"fetch_many: {sum(v is not None for v in results.values())}/{len(urls)} URLs in {time.perf_counter() - started:.2f}s")
+    return results
+
+
+async def fetch_many(urls: List[str], deadline: float = BATCH_DEADLINE) -> Dict[str, Optional[str]]:
+    """fetch_many_pages returning just each page's text: {url: text or None}."""
+    pages = await fetch_many_pages(urls, deadline)
+    return {url: page['text'] if page else None for url, page in pages.items()}
@@ -236,8 +236,9 @@ def test_summarize_article(client, mocker):
     # 2. Mock the external services
     mock_content = "This is a long article content that needs to be summarized."
     mock_summary = "🎯 Mock Summary: This is a test summary."
-    mocker.patch("services.web_scraper.fetch_and_parse_url", return_value=mock_content)
-    mocker.patch("services.ai_service.get_ai_summary", return_value=mock_summary)
+    # The endpoint is async, so the async variants are the ones to mock (patch() makes these AsyncMocks).
+    mocker.patch("services.web_scraper.fetch_article_async", return_value={"text": mock_content, "title": None, "tier": "heuristic"})
+    mocker.patch("services.ai_service.get_ai_summary_async", return_value={"title": "Mock Title", "summary_body": mock_summary})
 
     # 3. Call the summarize endpoint
     response = client.post("/summarize", json={"article_id": article_id})
@@ -276,6 +277,24 @@ def test_summarize_article(client, mocker):
     print(f"Generated Summary: {summary_data['summary']}")
 
 
+def test_summarize_article_manual(client, mocker):
+    """Test /summarize-manual: the pasted content is summarized without scraping."""
+    article_id = client.post("/articles", json={"url": "http://example.com/paywalled", "title": "Paywalled"}).json()["id"]
+    fetch = mocker.patch("services.web_scraper.fetch_article_async")
+    summary = mocker.patch("services.ai_service.get_ai_summary_async",
+                           return_value={"title": "", "summary_body": "🎯 Manual summary."})
+
+    response = client.post("/summarize-manual", json={"article_id": article_id, "manual_content": " Pasted body. "})
+    assert response.status_code == 200
+    article = response.json()
+    assert article["status"] == "summarized"
+    assert article["summary"] == "🎯 Manual summary."
+    assert article["original_content"] == "Pasted body."
+    assert article["title"] == "Paywalled"
+    assert summary.call_args.kwargs["title"] == "Paywalled"
+    fetch.assert_not_called()
+
+
 def test_newsletter_workflow(client):
     """
     Tests the full newsletter workflow:
@@ -340,3 +359,1066 @@ def test_newsletter_workflow(client):
     assert "## Threat of the Day: T-14 Armata" in markdown
     assert "## 🎙️ Podcast Episode: Air Power Analysis" in markdown
     assert "See you next week!" in markdown
+
+
+def test_db_pool_reuses_connections(client):
+    """Repeated requests should be served from a small set of pooled connections."""
+    for i in range(5):
+        client.post("/articles", json={"url": f"http://example.com/pooled-{i}", "title": f"Pooled {i}"})
+        client.get("/articles")
+
+    response = client.get("/stats/db-pool")
+    assert response.status_code == 200
+    pool = next(p for p in response.json()["pools"] if p["db_path"] == str(db_handler.DB_PATH))
+    assert pool["checkouts"] >= 10
+    assert pool["open_connections"] <= db_handler.DB_POOL_SIZE
+    assert pool["in_use"] == 0
+
+    conn = db_handler.get_db_connection()
+    try:
+        assert conn.execute("PRAGMA journal_mode").fetchone()["journal_mode"] == "wal"
+    finally:
+        conn.close()
+
+
+def test_move_article_rewrites_only_moved_row(client):
+    """Moving an article writes a single sparse key and the list order follows the new rank."""
+    ids = [client.post("/articles", json={"url": f"http://example.com/order-{i}", "title": f"Order {i}"}).json()["id"]
+           for i in range(4)]
+    before = {a["id"]: a["position"] for a in client.get("/articles").json()}
+
+    response = client.patch(f"/articles/{ids[3]}/position", json={"item_id": ids[3], "new_position": 1})
+    assert response.status_code == 200
+
+    articles = client.get("/articles").json()
+    assert [a["id"] for a in articles] == [ids[3], ids[0], ids[1], ids[2]]
+    assert [a["rank"] for a in articles] == [1, 2, 3, 4]
+    changed = [a["id"] for a in articles if a["position"] != before[a["id"]]]
+    assert changed == [ids[3]]
+
+
+def test_move_article_rebalances_when_gap_runs_out(client):
+    """Repeatedly moving into the same gap eventually rebalances without losing order."""
+    ids = [client.post("/articles", json={"url": f"http://example.com/gap-{i}", "title": f"Gap {i}"}).json()["id"]
+           for i in range(3)]
+    # Each move lands between the first two rows, halving that gap.
+    for _ in range(2 * db_handler.POSITION_GAP.bit_length()):
+        last = client.get("/articles").json()[-1]["id"]
+        response = client.patch(f"/articles/{last}/position", json={"item_id": last, "new_position": 2})
+        assert response.status_code == 200
+
+    articles = client.get("/articles").json()
+    assert sorted(a["id"] for a in articles) == sorted(ids)
+    positions = [a["position"] for a in articles]
+    assert positions == sorted(positions)
+    assert len(set(positions)) == len(positions)
+
+    db_handler.run_position_compaction()
+    assert not db_handler.positions_need_rebalance('Articles')
+    assert [a["id"] for a in client.get("/articles").json()] == [a["id"] for a in articles]
+
+
+def test_bulk_reorder_moves_items_to_ranks(client):
+    """/articles/reorder treats positions as ranks and keeps the other rows' sparse keys."""
+    ids = [client.post("/articles", json={"url": f"http://example.com/bulk-{i}", "title": f"Bulk {i}"}).json()["id"]
+           for i in range(5)]
+    before = {a["id"]: a["position"] for a in client.get("/articles").json()}
+
+    response = client.post("/articles/reorder", json={"updates": [{"id": ids[0], "position": 4},
+                                                                  {"id": ids[4], "position": 1}]})
+    assert response.status_code == 200
+
+    articles = client.get("/articles").json()
+    assert [a["id"] for a in articles] == [ids[4], ids[1], ids[2], ids[0], ids[3]]
+    changed = {a["id"] for a in articles if a["position"] != before[a["id"]]}
+    assert changed == {ids[0], ids[4]}
+    assert min(b["position"] - a["position"] for a, b in zip(articles, articles[1:])) > 1
+
+
+def test_init_db_backfills_legacy_null_positions(client):
+    """Rows without a position get one at startup, so cursors work from the first page."""
+    ids = [client.post("/articles", json={"url": f"http://example.com/legacy-{i}", "title": f"Legacy {i}"}).json()["id"]
+           for i in range(3)]
+    conn = db_handler.get_db_connection()
+    try:
+        conn.execute("UPDATE Articles SET position = NULL")
+        conn.commit()
+    finally:
+        conn.close()
+
+    assert db_handler.init_db()
+    assert not db_handler.positions_need_rebalance('Articles')
+
+    seen = []
+    response = client.get("/articles", params={"limit": 1})
+    while True:
+        assert response.status_code == 200
+        seen.extend(a["id"] for a in response.json())
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+        response = client.get("/articles", params={"limit": 1, "cursor": cursor})
+    assert seen == ids
+
+
+def test_migrations_are_recorded_and_applied_once(client):
+    """init_db records each migration in schema_version and skips it on the next boot."""
+    assert db_handler.get_schema_version() >= 1
+    assert db_handler.init_db()
+
+    conn = db_handler.get_db_connection()
+    try:
+        versions = [row["version"] for row in conn.execute("SELECT version FROM schema_version")]
+    finally:
+        conn.close()
+    assert len(versions) == len(set(versions))
+
+
+@pytest.mark.parametrize("query, index", [
+    ("SELECT *, ROW_NUMBER() OVER (ORDER BY position ASC, id ASC) AS rank FROM Articles "
+     "WHERE status != 'archived' ORDER BY position ASC, id ASC", "idx_articles_active_position"),
+    ("SELECT *, ROW_NUMBER() OVER (ORDER BY position ASC, id ASC) AS rank FROM Snapshots "
+     "WHERE status != 'archived' ORDER BY position ASC, id ASC", "idx_snapshots_active_position"),
+    ("SELECT * FROM Articles WHERE status = 'accepted' ORDER BY position", "idx_articles_status_position"),
+    ("SELECT * FROM Snapshots WHERE status = 'accepted' ORDER BY position", "idx_snapshots_status_position"),
+    ("SELECT * FROM Threats ORDER BY created_at DESC", "idx_threats_created_at"),
+    ("SELECT * FROM PodcastEpisodes ORDER BY created_at DESC", "idx_podcast_episodes_created_at"),
+])
+def test_hot_queries_use_indexes(client, query, index):
+    """EXPLAIN QUERY PLAN confirms the hot list queries are served by the migration's indexes."""
+    conn = db_handler.get_db_connection()
+    try:
+        plan = " ".join(row["detail"] for row in conn.execute(f"EXPLAIN QUERY PLAN {query}"))
+    finally:
+        conn.close()
+    assert f"USING INDEX {index}" in plan or f"USING COVERING INDEX {index}" in plan
+    assert "USE TEMP B-TREE FOR ORDER BY" not in plan
+
+
+def test_search_articles_and_snapshots(client):
+    """The FTS index follows inserts and updates and ranks title matches first."""
+    a1 = client.post("/articles", json={"url": "http://example.com/s-1", "title": "Hypersonic missile test", "summary": "Range details."}).json()
+    a2 = client.post("/articles", json={"url": "http://example.com/s-2", "title": "Budget news", "summary": "Funds for hypersonic research."}).json()
+    client.post("/articles", json={"url": "http://example.com/s-3", "title": "Unrelated", "summary": "Nothing here."})
+    client.post("/snapshots", json={"url": "http://example.com/snap-1", "title": "Hypersonic glide vehicle"})
+
+    response = client.get("/search", params={"q": "hypersonic", "kind": "article"})
+    assert response.status_code == 200
+    body = response.json()
+    assert body["total"] == 2
+    assert [r["id"] for r in body["results"]] == [a1["id"], a2["id"]]
+    assert "**" in body["results"][0]["snippet"]
+
+    assert client.get("/search", params={"q": "hyperso"}).json()["total"] == 3
+    assert client.get("/search", params={"q": "hypersonic", "limit": 1, "offset": 1}).json()["results"][0]["id"] in (a1["id"], a2["id"])
+
+    client.patch(f"/articles/{a2['id']}", json={"summary": "Funds for shipbuilding.", "status": "archived"})
+    assert client.get("/search", params={"q": "hypersonic", "kind": "article"}).json()["total"] == 1
+    assert client.get("/search", params={"q": "shipbuilding", "include_archived": True}).json()["total"] == 1
+    assert client.get("/search", params={"q": "!!!"}).json()["total"] == 0
+
+
+def test_list_articles_keyset_pagination_and_fields(client):
+    """List pages follow X-Next-Cursor, keep global ranks, and omit original_content."""
+    ids = [client.post("/articles", json={"url": f"http://example.com/page-{i}", "title": f"Page {i}"}).json()["id"] for i in range(5)]
+
+    full = client.get("/articles").json()
+    assert [a["id"] for a in full] == ids
+    assert all("original_content" not in a for a in full)
+
+    seen, cursor = [], None
+    while True:
+        params = {"limit": 2, "fields": "title,rank"}
+        if cursor:
+            params["cursor"] = cursor
+        response = client.get("/articles", params=params)
+        assert response.status_code == 200
+        page = response.json()
+        assert all(set(a) == {"id", "position", "title", "rank"} for a in page)
+        seen.extend(page)
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+
+    assert [a["id"] for a in seen] == ids
+    assert [a["rank"] for a in seen] == [1, 2, 3, 4, 5]
+
+    assert client.get("/articles", params={"fields": "original_content"}).status_code == 400
+    assert client.get("/snapshots", params={"cursor": "bogus"}).status_code == 400
+
+
+def test_content_store_dedupes_and_hydrates(client):
+    """Bodies are stored once, compressed, served on detail reads and released on delete."""
+    body = "Hypersonic glide vehicles were tested again this week. " * 200
+    article = client.post("/articles", json={"url": "http://example.com/body-1", "title": "Body"}).json()
+    snapshot = client.post("/snapshots", json={"url": "http://example.com/body-2", "title": "Body"}).json()
+    db_handler.update_article(article["id"], original_content=body)
+    assert db_handler.update_snapshot_highlight(snapshot["id"], "Tested again.", body)
+
+    conn = db_handler.get_db_connection()
+    try:
+        inline = conn.execute("SELECT original_content FROM Articles WHERE id = ?", (article["id"],)).fetchone()
+        blobs = conn.execute("SELECT refcount FROM ContentBlobs").fetchall()
+    finally:
+        conn.close()
+    assert inline["original_content"] is None
+    assert [b["refcount"] for b in blobs] == [2]
+
+    assert client.get(f"/articles/{article['id']}").json()["original_content"] == body
+    assert client.get("/search", params={"q": "glide", "kind": "snapshot"}).json()["total"] == 1
+
+    stats = client.get("/stats/content-store").json()
+    assert stats["blobs"] == 1 and stats["references"] == 2
+    assert stats["logical_bytes"] == 2 * len(body) and stats["bytes_saved"] > len(body)
+
+    client.delete(f"/articles/{article['id']}")
+    client.delete(f"/snapshots/{snapshot['id']}")
+    assert client.get("/stats/content-store").json()["blobs"] == 0
+
+
+def test_content_migration_moves_inline_bodies(client):
+    """The 0005 data migration moves legacy inline bodies into the store."""
+    conn = db_handler.get_db_connection()
+    try:
+        conn.execute("INSERT INTO Articles (url, title, original_content, position) VALUES ('http://example.com/legacy', 'Legacy', 'Old body', 1)")
+        db_handler._load_python_migration(db_handler.MIGRATIONS_DIR / "0005_move_content_to_store.py")(conn)
+        conn.commit()
+        row = conn.execute("SELECT id, original_content, content_hash FROM Articles WHERE url = 'http://example.com/legacy'").fetchone()
+    finally:
+        conn.close()
+    assert row["original_content"] is None and row["content_hash"]
+    assert db_handler.get_article_by_id(row["id"])["original_content"] == "Old body"
+
+
+def test_list_etag_not_modified(client):
+    """Unchanged collections answer If-None-Match with 304; any write changes the tag."""
+    client.post("/articles", json={"url": "http://example.com/etag-1", "title": "First"})
+    first = client.get("/articles")
+    etag = first.headers["ETag"]
+    assert first.status_code == 200
+
+    cached = client.get("/articles", headers={"If-None-Match": etag})
+    assert cached.status_code == 304
+    assert cached.content == b""
+    assert client.get("/articles", params={"fields": "title"}).headers["ETag"] != etag
+
+    client.post("/articles", json={"url": "http://example.com/etag-2", "title": "Second"})
+    changed = client.get("/articles", headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["ETag"] != etag
+    assert len(changed.json()) == 2
+
+    snapshot_etag = client.get("/snapshots").headers["ETag"]
+    assert client.get("/snapshots", headers={"If-None-Match": snapshot_etag}).status_code == 304
+
+
+def test_article_change_feed(client):
+    """The change feed returns only rows touched since a revision, with tombstones for deletes."""
+    a1 = client.post("/articles", json={"url": "http://example.com/feed-1", "title": "One"}).json()
+    a2 = client.post("/articles", json={"url": "http://example.com/feed-2", "title": "Two"}).json()
+
+    initial = client.get("/articles/changes").json()
+    assert initial["full_resync"] is True
+    assert [a["id"] for a in initial["changes"]] == [a1["id"], a2["id"]]
+    assert all("original_content" not in a for a in initial["changes"])
+
+    client.patch(f"/articles/{a1['id']}", json={"title": "One (edited)"})
+    client.delete(f"/articles/{a2['id']}")
+    delta = client.get("/articles/changes", params={"since": initial["revision"]}).json()
+    assert delta["full_resync"] is False
+    assert [a["title"] for a in delta["changes"]] == ["One (edited)"]
+    assert delta["deleted"] == [a2["id"]]
+    assert delta["revision"] > initial["revision"]
+
+    quiet = client.get("/articles/changes", params={"since": delta["revision"]}).json()
+    assert quiet["changes"] == [] and quiet["deleted"] == []
+
+    assert db_handler.prune_change_log(retention_days=-1) == 1
+    stale = client.get("/articles/changes", params={"since": initial["revision"]}).json()
+    assert stale["full_resync"] is True
+    assert [a["id"] for a in stale["changes"]] == [a1["id"]]
+
+
+
+def test_archive_moves_rows_out_of_working_table(client):
+    """Archived articles leave Articles but stay searchable, readable and restorable by URL."""
+    article = client.post("/articles", json={"url": "http://example.com/arch-1", "title": "Frigate refit"}).json()
+    db_handler.update_article(article['id'], original_content="Dry dock body.")
+    revision = client.get("/articles/changes").json()["revision"]
+
+    archived = client.patch(f"/articles/{article['id']}", json={"status": "archived"}).json()
+    assert archived["status"] == "archived"
+    conn = db_handler.get_db_connection()
+    try:
+        assert conn.execute("SELECT COUNT(*) AS n FROM Articles").fetchone()["n"] == 0
+        assert conn.execute("SELECT COUNT(*) AS n FROM ArchivedArticles").fetchone()["n"] == 1
+    finally:
+        conn.close()
+
+    assert client.get("/articles").json() == []
+    assert client.get(f"/articles/{article['id']}").json()["original_content"] == "Dry dock body."
+    assert [a["id"] for a in db_handler.get_articles_by_status("archived")] == [article["id"]]
+    assert client.get("/search", params={"q": "frigate"}).json()["total"] == 0
+    assert client.get("/search", params={"q": "frigate", "include_archived": True}).json()["total"] == 1
+    assert client.get("/articles/changes", params={"since": revision}).json()["deleted"] == [article["id"]]
+
+    restored = client.post("/articles", json={"url": "http://example.com/arch-1", "title": "Frigate refit"}).json()
+    assert restored["id"] == article["id"]
+    assert restored["status"] == "pending"
+    assert restored["original_content"] == "Dry dock body."
+    assert client.get("/search", params={"q": "frigate"}).json()["total"] == 1
+
+
+def test_editing_archived_row_updates_it_in_place(client):
+    """A field edit on an archived article stays in the archive table without touching the working list's feed."""
+    article = client.post("/articles", json={"url": "http://example.com/arch-edit", "title": "Old title"}).json()
+    db_handler.update_article(article['id'], original_content="First body.")
+    client.patch(f"/articles/{article['id']}", json={"status": "archived"})
+
+    def snapshot_state():
+        conn = db_handler.get_db_connection()
+        try:
+            return (conn.execute("SELECT archived_at FROM ArchivedArticles WHERE id = ?", (article['id'],)).fetchone()["archived_at"],
+                    conn.execute("SELECT revision FROM CollectionRevisions WHERE collection = 'Articles'").fetchone()["revision"],
+                    conn.execute("SELECT MAX(revision) AS revision FROM ChangeLog").fetchone()["revision"],
+                    [row["refcount"] for row in conn.execute("SELECT refcount FROM ContentBlobs ORDER BY refcount")])
+        finally:
+            conn.close()
+
+    before = snapshot_state()
+    edited = client.patch(f"/articles/{article['id']}", json={"title": "Corvette refit"}).json()
+    assert edited["status"] == "archived" and edited["title"] == "Corvette refit"
+    assert db_handler.update_article(article['id'], original_content="Second body.")["original_content"] == "Second body."
+    after = snapshot_state()
+    assert after[:3] == before[:3]
+    assert before[3] == after[3] == [1]  # the old body was released, the new one referenced once
+    assert client.get("/search", params={"q": "corvette", "include_archived": True}).json()["total"] == 1
+
+    restored = client.patch(f"/articles/{article['id']}", json={"status": "pending"}).json()
+    assert restored["status"] == "pending" and restored["original_content"] == "Second body."
+    assert [a["id"] for a in client.get("/articles").json()] == [article["id"]]
+
+
+def test_bulk_import_articles(client):
+    """One bulk call reports created, conflicting, duplicate and un-archived URLs and keeps paste order."""
+    existing = client.post("/articles", json={"url": "http://example.com/bulk-1", "title": "Existing"}).json()
+    archived = client.post("/articles", json={"url": "http://example.com/bulk-2", "title": "Archived"}).json()
+    client.patch(f"/articles/{archived['id']}", json={"status": "archived"})
+
+    response = client.post("/articles/bulk", json={"urls": [
+        " http://example.com/bulk-3 ", "http://example.com/bulk-1", "http://example.com/bulk-2",
+        "http://example.com/bulk-3", "", "http://example.com/bulk-4",
+    ]})
+    assert response.status_code == 200
+    body = response.json()
+    assert [r["status"] for r in body["results"]] == ["created", "conflict", "unarchived", "duplicate", "invalid", "created"]
+    assert (body["created"], body["unarchived"], body["conflicts"]) == (2, 1, 1)
+    assert body["results"][1]["id"] == existing["id"]
+    assert body["results"][2]["id"] == archived["id"]
+
+    listed = client.get("/articles").json()
+    assert [a["url"] for a in listed] == [f"http://example.com/bulk-{n}" for n in (1, 3, 2, 4)]
+    assert [a["rank"] for a in listed] == [1, 2, 3, 4]
+    assert listed[1]["title"] == "http://example.com/bulk-3"
+
+    snapshots = client.post("/snapshots/bulk", json={"urls": ["http://example.com/snap-b1", "http://example.com/snap-b1"]}).json()
+    assert [r["status"] for r in snapshots["results"]] == ["created", "duplicate"]
+    assert client.post("/articles/bulk", json={"urls": []}).status_code == 422
+
+
+@pytest.mark.parametrize("variant", [
+    "http://www.example.com/defense/story/?utm_source=newsletter&utm_medium=email#comments",
+    "https://example.com/defense/story/amp/",
+    "https://www.google.com/url?q=https://example.com/defense/story&sa=D",
+    "https://example-com.cdn.ampproject.org/c/s/example.com/defense/story",
+])
+def test_canonical_url_duplicates_conflict(client, variant):
+    """Tracking params, www., AMP and redirector variants of a URL are treated as the same article."""
+    original = client.post("/articles", json={"url": "https://example.com/defense/story", "title": "Story"}).json()
+
+    assert client.post("/articles", json={"url": variant, "title": "Again"}).status_code == 409
+    bulk = client.post("/articles/bulk", json={"urls": [variant]}).json()
+    assert bulk["results"][0] == {"url": variant, "status": "conflict", "id": original["id"]}
+    assert client.post("/articles", json={"url": "https://example.com/defense/other-story"}).status_code == 201
+
+
+def test_bulk_status_update(client):
+    """One PATCH sets a status on many rows, archiving and restoring them as needed."""
+    ids = [client.post("/articles", json={"url": f"http://example.com/bulk-status-{n}", "title": f"A{n}"}).json()["id"] for n in range(3)]
+
+    response = client.patch("/articles/status", json={"ids": ids[:2] + [9999], "status": "accepted"})
+    assert response.status_code == 200
+    body = response.json()
+    assert body["updated"] == 2
+    assert [(a["id"], a["status"]) for a in body["items"]] == [(ids[0], "accepted"), (ids[1], "accepted")]
+    assert "original_content" not in body["items"][0]
+
+    archived = client.patch("/articles/status", json={"ids": ids[:2], "status": "archived"}).json()
+    assert archived["updated"] == 2
+    assert [a["id"] for a in client.get("/articles").json()] == [ids[2]]
+
+    restored = client.patch("/articles/status", json={"ids": [ids[1]], "status": "pending"}).json()
+    assert restored["items"][0]["status"] == "pending"
+    assert [a["id"] for a in client.get("/articles").json()] == [ids[2], ids[1]]
+
+    snapshot_id = client.post("/snapshots", json={"url": "http://example.com/bulk-status-snap"}).json()["id"]
+    assert client.patch("/snapshots/status", json={"ids": [snapshot_id], "status": "accepted"}).json()["updated"] == 1
+    assert client.patch("/articles/status", json={"ids": [], "status": "accepted"}).status_code == 422
+
+
+def test_batch_summarize_job(client, mocker):
+    """A batch job processes every pending article in the background, retrying transient failures."""
+    import time
+    from services import job_queue
+
+    ids = [client.post("/articles", json={"url": f"http://example.com/job-{n}", "title": f"Job {n}"}).json()["id"] for n in range(3)]
+    client.patch(f"/articles/{ids[2]}", json={"status": "accepted"})
+
+    calls = {}
+    async def flaky_summary(title, content, url, refresh=False):
+        calls[url] = calls.get(url, 0) + 1
+        if url.endswith("job-1") and calls[url] == 1:
+            raise RuntimeError("rate limited")
+        return {"title": f"{title} (summarized)", "summary_body": "Summary."}
+
+    mocker.patch.object(job_queue, "RETRY_BASE_DELAY", 0)
+    mocker.patch("services.web_scraper.fetch_article_async", return_value={"text": "Body text.", "title": None, "tier": "heuristic"})
+    mocker.patch("services.ai_service.get_ai_summary_async", side_effect=flaky_summary)
+
+    response = client.post("/batch-summarize")
+    assert response.status_code == 202
+    job = response.json()
+    assert job["kind"] == "summarize" and job["total"] == 2
+
+    deadline = time.time() + 10
+    while job["status"] not in ("completed", "partial", "failed") and time.time() < deadline:
+        time.sleep(0.05)
+        job = client.get(f"/jobs/{job['id']}").json()
+    assert job["status"] == "completed"
+    assert job["progress"] == 1.0
+    assert job["counts"]["done"] == 2
+    assert {i["item_id"]: i["attempts"] for i in job["items"]} == {ids[0]: 1, ids[1]: 2}
+    assert client.get(f"/articles/{ids[1]}").json()["status"] == "summarized"
+    assert client.get(f"/articles/{ids[2]}").json()["status"] == "accepted"
+    assert client.get("/jobs/9999").status_code == 404
+
+
+def test_batch_summarize_job_fails_no_content_without_retrying(client, mocker):
+    """A page with no content is a final failure, not a transient one to rescrape."""
+    import time
+    from services import job_queue
+
+    article_id = client.post("/articles", json={"url": "http://example.com/empty", "title": "Empty"}).json()["id"]
+    mocker.patch.object(job_queue, "RETRY_BASE_DELAY", 0)
+    fetch = mocker.patch("services.web_scraper.fetch_article_async", return_value={"text": "", "title": None, "tier": "heuristic"})
+
+    job = client.post("/batch-summarize").json()
+    deadline = time.time() + 10
+    while job["status"] not in ("completed", "partial", "failed") and time.time() < deadline:
+        time.sleep(0.05)
+        job = client.get(f"/jobs/{job['id']}").json()
+    assert job["status"] == "failed"
+    assert [(i["item_id"], i["attempts"]) for i in job["items"]] == [(article_id, 1)]
+    assert fetch.call_count == 1
+    assert client.get(f"/articles/{article_id}").json()["status"] == "scraping_failed"
+
+
+def test_batch_highlight_job_shares_llm_requests(client, mocker):
+    """Pending snapshots are highlighted with one JSON request; a malformed entry falls back to a single call."""
+    import json
+    import time
+    from types import SimpleNamespace
+    from unittest.mock import AsyncMock, MagicMock
+    from services import ai_service
+
+    ids = [client.post("/snapshots", json={"url": f"http://example.com/snap-{n}", "title": ""}).json()["id"] for n in range(4)]
+
+    async def fetch(url):
+        if url.endswith("snap-3"):
+            return None
+        return {"text": f"Body of {url} with the key facts.", "title": f"Title {url[-1]}", "tier": "heuristic"}
+
+    def completion(**request):
+        if "response_format" in request:
+            answer = json.dumps({"highlights": [{"id": ids[0], "highlight": "🚩 First. ([more](http://example.com/snap-0))"},
+                                                {"id": ids[1], "highlight": "missing the flag"},
+                                                {"id": ids[2], "highlight": "🚩 Third. ([more](http://example.com/snap-2))"}]})
+        else:
+            answer = "🚩 Second, on its own. ([more](http://example.com/snap-1))"
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=answer))], usage=None)
+
+    openai_client = MagicMock()
+    openai_client.chat.completions.create = AsyncMock(side_effect=completion)
+    mocker.patch.dict(os.environ, {"OPENAI_API_KEY": "test-key"})
+    mocker.patch.object(ai_service, "get_async_openai_client", return_value=openai_client)
+    async def fetch_many_pages(urls):
+        return {url: await fetch(url) for url in urls}
+    mocker.patch("services.web_scraper.fetch_many_pages", side_effect=fetch_many_pages)
+
+    job = client.post("/batch-highlight").json()
+    deadline = time.time() + 10
+    while job["status"] not in ("completed", "partial", "failed") and time.time() < deadline:
+        time.sleep(0.05)
+        job = client.get(f"/jobs/{job['id']}").json()
+    assert job["status"] == "partial" and job["counts"]["done"] == 3 and job["counts"]["failed"] == 1
+    assert openai_client.chat.completions.create.await_count == 2  # one batch + one fallback
+    assert client.get(f"/snapshots/{ids[0]}").json()["highlight"].startswith("🚩 First.")
+    assert client.get(f"/snapshots/{ids[1]}").json()["highlight"].startswith("🚩 Second")
+    assert client.get(f"/snapshots/{ids[2]}").json()["title"] == "Title 2"
+
+
+def test_fetch_many_limits_per_host_and_honours_deadline(mocker, tmp_path):
+    """fetch_many caps concurrent requests per host and gives up on URLs past the deadline."""
+    import asyncio
+    import threading
+    import time
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+    from services import web_scraper
+
+    state = {"active": 0, "peak": 0}
+    lock = threading.Lock()
+    page = ("<html><body><article><p>" + "A long enough sentence about the program. " * 5 + "</p></article></body></html>").encode()
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            with lock:
+                state["active"] += 1
+                state["peak"] = max(state["peak"], state["active"])
+            time.sleep(2 if self.path == "/slow" else 0.1)
+            with lock:
+                state["active"] -= 1
+            self.send_response(200)
+            self.send_header("Content-Length", str(len(page)))
+            self.end_headers()
+            self.wfile.write(page)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    mocker.patch.object(web_scraper, "PER_HOST_CONCURRENCY", 2)
+    mocker.patch.object(db_handler, "DB_PATH", str(tmp_path / "lowdown.db"))  # keeps the HTTP cache out of the repo
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    try:
+        results = asyncio.run(web_scraper.fetch_many([f"{base}/{n}" for n in range(6)] + [f"{base}/slow"], deadline=1.0))
+    finally:
+        server.shutdown()
+        web_scraper.shutdown()
+
+    assert state["peak"] == 2
+    assert results[f"{base}/slow"] is None
+    assert all("long enough sentence" in results[f"{base}/{n}"] for n in range(6))
+
+
+def test_http_cache_serves_fresh_pages_and_revalidates_stale_ones(client, mocker):
+    """Repeat scrapes of a URL are local reads; stale entries are revalidated with If-None-Match."""
+    import threading
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+    from services import http_cache, web_scraper
+
+    requests_seen = []
+    page = ("<html><body><article><p>" + "Cached paragraph about the carrier group. " * 5 + "</p></article></body></html>").encode()
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            requests_seen.append(self.headers.get("If-None-Match"))
+            if self.headers.get("If-None-Match") == '"v1"':
+                self.send_response(304)
+                self.end_headers()
+                return
+            self.send_response(200)
+            self.send_header("ETag", '"v1"')
+            self.send_header("Content-Length", str(len(page)))
+            self.end_headers()
+            self.wfile.write(page)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}/story"
+    try:
+        first = web_scraper.fetch_and_parse_url(url)
+        assert "Cached paragraph" in first
+        assert web_scraper.fetch_and_parse_url(url + "?utm_source=feed") == first
+        assert requests_seen == [None]
+
+        mocker.patch.object(http_cache, "HTTP_CACHE_TTL", 0)
+        assert web_scraper.fetch_and_parse_url(url) == first
+        assert requests_seen == [None, '"v1"']
+    finally:
+        server.shutdown()
+
+    assert client.get("/stats/http-cache").json()["entries"] == 1
+    mocker.patch.object(http_cache, "HTTP_CACHE_MAX_BYTES", 0)
+    http_cache.store("http://example.com/other", "<html></html>", "")
+    assert client.get("/stats/http-cache").json()["entries"] == 0
+
+
+def test_http_cache_keeps_amp_fetches_out_of_the_article_entry(client, mocker):
+    """The AMP URL shares the article's url_hash, so its fetch must not read or write that cache entry."""
+    import sqlite3
+    import threading
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+    from services import http_cache, web_scraper
+
+    requests_seen = []
+    paragraph = "The AMP copy carries the full story about the carrier group's deployment. " * 3
+    pages = {
+        "/story": ('"main"', '<html><head><link rel="amphtml" href="/story/amp">'
+                             '<meta name="description" content="Teaser only."></head><body></body></html>'),
+        "/story/amp": ('"amp"', f"<html><body><article><p>{paragraph}</p></article></body></html>"),
+    }
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            requests_seen.append((self.path, self.headers.get("If-None-Match")))
+            etag, body = pages[self.path]
+            self.send_response(200)
+            self.send_header("ETag", etag)
+            self.send_header("Content-Type", "text/html")
+            self.end_headers()
+            self.wfile.write(body.encode())
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}/story"
+    try:
+        assert web_scraper.fetch_article(url)["tier"] == "amp"
+        assert http_cache.lookup(url)["etag"] == '"main"'
+        mocker.patch.object(http_cache, "HTTP_CACHE_TTL", 0)
+        assert web_scraper.fetch_article(url)["tier"] == "amp"
+    finally:
+        server.shutdown()
+    assert requests_seen == [("/story", None), ("/story/amp", None), ("/story", '"main"'), ("/story/amp", None)]
+    assert http_cache.lookup(url)["etag"] == '"main"'
+
+    # A blob that can't be decoded is a miss, not an error.
+    conn = sqlite3.connect(http_cache._cache.path())
+    conn.execute("UPDATE HttpCache SET text = ?", (b"not compressed",))
+    conn.commit()
+    conn.close()
+    assert http_cache.lookup(url) is None
+
+
+def test_content_extractor_tiers(client, mocker):
+    """JSON-LD bodies skip the DOM heuristic, thin pages fall back to it, and titles come from metadata."""
+    import json
+    from services import content_extractor
+
+    body = "The Navy awarded the frigate contract after a two-year competition. " * 10
+    json_ld = json.dumps({"@context": "https://schema.org", "@graph": [
+        {"@type": "WebSite", "name": "Defense Daily"},
+        {"@type": "NewsArticle", "headline": "Frigate award", "datePublished": "2025-03-01", "articleBody": body},
+    ]})
+    page = content_extractor.extract(
+        f'<html><head><script type="application/ld+json">{json_ld}</script>'
+        '<meta property="og:title" content="Navy picks frigate builder"></head><body><p>Teaser</p></body></html>')
+    assert page["tier"] == "json-ld" and page["text"] == body.strip()
+    assert page["title"] == "Navy picks frigate builder" and page["published"] == "2025-03-01"
+
+    paragraph = "A paragraph long enough to survive the clutter filter in the heuristic pass."
+    page = content_extractor.extract(
+        f'<html><head><title> Plain page </title><link rel="amphtml" href="/amp/story"></head>'
+        f'<body><nav>Home</nav><article><p>{paragraph}</p></article></body></html>')
+    assert page["tier"] == "heuristic" and page["text"] == paragraph
+    assert page["title"] == "Plain page" and page["amp_url"] == "/amp/story"
+
+    page = content_extractor.extract('<html><head><meta name="description" content="Only a description."></head></html>')
+    assert page["tier"] == "meta-description" and page["text"] == "Only a description."
+
+    # Summarizing an imported article (title = URL) uses the page title in the prompt.
+    url = "http://example.com/imported"
+    article_id = client.post("/articles/bulk", json={"urls": [url]}).json()["results"][0]["id"]
+    mocker.patch("services.web_scraper.fetch_article_async",
+                 return_value={"text": paragraph, "title": "Imported story", "tier": "heuristic"})
+    summary = mocker.patch("services.ai_service.get_ai_summary_async", return_value={"title": "", "summary_body": "S"})
+    response = client.post("/summarize", json={"article_id": article_id})
+    assert response.status_code == 200
+    assert summary.call_args.kwargs["title"] == "Imported story"
+    assert response.json()["title"] == "Imported story"
+
+
+def test_scraper_streams_with_byte_cap_and_rejects_non_html(client, mocker):
+    """PDFs are dropped on their headers; oversized pages are read only up to the byte cap."""
+    import asyncio
+    import threading
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+    from services import http_cache, web_scraper
+
+    paragraph = "<p>" + "Délégation visits the shipyard to review the hull schedule. " * 4 + "</p>"
+    pages = {
+        "/doc.pdf": ("application/pdf", b"%PDF-1.7" + b"0" * 200_000),
+        "/big": ("text/html; charset=utf-8", ("<html><body><article>" + paragraph * 2000).encode()),
+    }
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            content_type, body = pages[self.path]
+            self.send_response(200)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            try:
+                self.wfile.write(body)
+            except (BrokenPipeError, ConnectionResetError):
+                pass
+
+        def log_message(self, *args):
+            pass
+
+    mocker.patch.object(http_cache, "HTTP_CACHE_ENABLED", False)
+    mocker.patch.object(web_scraper, "MAX_RESPONSE_BYTES", 20_000)
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    before = client.get("/stats/scraper").json()
+    try:
+        assert web_scraper.fetch_article(base + "/doc.pdf") is None
+        page = web_scraper.fetch_article(base + "/big")
+        assert page["tier"] == "heuristic" and "Délégation visits the shipyard" in page["text"]
+        assert asyncio.run(web_scraper.fetch_article_async(base + "/doc.pdf")) is None
+        assert asyncio.run(web_scraper.fetch_article_async(base + "/big"))["text"] == page["text"]
+    finally:
+        server.shutdown()
+
+    after = client.get("/stats/scraper").json()
+    assert after["rejected_content_type"] - before["rejected_content_type"] == 2
+    assert after["truncated"] - before["truncated"] == 2
+    assert after["bytes_downloaded"] - before["bytes_downloaded"] == 40_000
+    assert after["bytes_saved"] - before["bytes_saved"] > 2 * 200_000
+
+
+def test_llm_cache_reuses_results_for_same_content(client, mocker):
+    """The same body under a second URL is a cache hit linked to its own URL; refresh=True regenerates."""
+    from unittest.mock import AsyncMock, MagicMock
+    from services import ai_service
+
+    def completion(text):
+        response = MagicMock()
+        response.choices[0].message.content = text
+        return response
+
+    create = AsyncMock(side_effect=lambda **kw: completion(
+        "HEADLINE: Frigates Ahoy\nSUMMARY_BODY: 🎯 **Frigates Ahoy** Body. ([more](" +
+        kw["messages"][1]["content"].split("**Article URL:** ")[1].split("\n")[0] + "))"))
+    openai_client = MagicMock()
+    openai_client.chat.completions.create = create
+    mocker.patch.dict(os.environ, {"OPENAI_API_KEY": "test-key"})
+    mocker.patch.object(ai_service, "get_async_openai_client", return_value=openai_client)
+    mocker.patch("services.web_scraper.fetch_article_async",
+                 return_value={"text": "Same body text.", "title": None, "tier": "heuristic"})
+
+    first_id = client.post("/articles", json={"url": "http://a.example.com/frigate", "title": "Frigate"}).json()["id"]
+    second_id = client.post("/articles", json={"url": "http://b.example.com/frigate", "title": "Frigate"}).json()["id"]
+    first = client.post("/summarize", json={"article_id": first_id}).json()
+    second = client.post("/summarize", json={"article_id": second_id}).json()
+    assert create.await_count == 1
+    assert first["title"] == second["title"] == "Frigates Ahoy"
+    assert "(http://b.example.com/frigate)" in second["summary"] and "a.example.com" not in second["summary"]
+
+    client.post("/summarize", json={"article_id": second_id, "refresh": True})
+    assert create.await_count == 2
+    stats = client.get("/stats/llm-cache").json()
+    assert (stats["hits"], stats["entries"]) >= (1, 1) and stats["bypassed"] >= 1
+
+
+def test_resummarizing_unchanged_content_is_a_cache_hit(client, mocker):
+    """The first summary replaces the title with the AI headline; summarizing again still hits the cache."""
+    from unittest.mock import AsyncMock, MagicMock
+    from services import ai_service
+
+    response = MagicMock()
+    response.choices[0].message.content = "HEADLINE: Frigates Ahoy\nSUMMARY_BODY: 🎯 **Frigates Ahoy** Body."
+    openai_client = MagicMock()
+    openai_client.chat.completions.create = AsyncMock(return_value=response)
+    mocker.patch.dict(os.environ, {"OPENAI_API_KEY": "test-key"})
+    mocker.patch.object(ai_service, "get_async_openai_client", return_value=openai_client)
+    mocker.patch("services.web_scraper.fetch_article_async",
+                 return_value={"text": "Unchanged body text.", "title": "Frigate contract awarded", "tier": "json-ld"})
+
+    article_id = client.post("/articles", json={"url": "http://example.com/resum", "title": "http://example.com/resum"}).json()["id"]
+    assert client.post("/summarize", json={"article_id": article_id}).json()["title"] == "Frigates Ahoy"
+    assert client.post("/summarize", json={"article_id": article_id}).json()["title"] == "Frigates Ahoy"
+    assert openai_client.chat.completions.create.await_count == 1
+
+
+def test_side_caches_skip_a_corrupt_cache_file(client, mocker, tmp_path):
+    """A cache file that isn't a database is treated as a miss and writes are dropped, never raised."""
+    from services import http_cache, llm_cache
+
+    corrupt = tmp_path / "corrupt.db"
+    corrupt.write_bytes(b"this is not an sqlite database" * 100)
+    mocker.patch.dict(os.environ, {"HTTP_CACHE_PATH": str(corrupt), "LLM_CACHE_PATH": str(corrupt)})
+
+    key = llm_cache.make_key("summary-v3", "gpt-4", 0.5, "body")
+    llm_cache.put(key, "summary-v3", "gpt-4", {"summary_body": "S"})
+    assert llm_cache.get(key) is None
+    http_cache.store("http://example.com/cached", "<html></html>", {"text": "T"})
+    assert http_cache.lookup("http://example.com/cached") is None
+    http_cache.mark_revalidated("http://example.com/cached")
+
+
+def test_openai_gateway_queues_within_token_budget_and_honours_retry_after(client, mocker):
+    """Calls over the TPM budget wait instead of failing; a 429 pauses the model for Retry-After."""
+    import asyncio
+    import time
+    import httpx
+    import openai
+    from unittest.mock import AsyncMock, MagicMock
+    from services import openai_gateway
+
+    mocker.patch.dict(os.environ, {"OPENAI_LIMITS_GATEWAY_TEST": "6000,1000"})
+    rate_limited = openai.RateLimitError(
+        "rate limited", body=None,
+        response=httpx.Response(429, headers={"retry-after": "0.3"}, request=httpx.Request("POST", "https://api.openai.com")))
+    openai_client = MagicMock()
+    openai_client.chat.completions.create = AsyncMock(side_effect=[MagicMock(), rate_limited, MagicMock()])
+
+    async def run():
+        request = {"model": "gateway-test", "messages": [{"role": "user", "content": "hi"}]}
+        started = time.monotonic()
+        await openai_gateway.create(openai_client, **request, max_tokens=1000)  # drains the 1000 TPM bucket
+        await openai_gateway.create(openai_client, **request, max_tokens=10)   # waits ~0.6s for refill, then a 429
+        elapsed = time.monotonic() - started
+        with pytest.raises(openai_gateway.OpenAIUnavailable):
+            await openai_gateway.create(openai_client, **request, max_tokens=500, deadline=0.1)
+        return elapsed
+
+    elapsed = asyncio.run(run())
+    assert 0.8 <= elapsed < 5
+    assert openai_client.chat.completions.create.await_count == 3
+    stats = client.get("/stats/openai").json()["models"]["gateway-test"]
+    assert stats["calls"] == 2 and stats["throttled"] >= 1 and stats["queued"] == 0
+    assert stats["rate_limited"] == 1 and stats["retries"] == 1 and stats["deadline_exceeded"] == 1
+    assert stats["tpm_limit"] == 1000
+
+
+def test_openai_gateway_returns_failed_attempts_reservations(client, mocker):
+    """Each retry reserves afresh, so failed attempts must give their request and tokens back."""
+    import asyncio
+    import httpx
+    import openai
+    from unittest.mock import AsyncMock, MagicMock
+    from services import http_transport, openai_gateway
+
+    mocker.patch.dict(os.environ, {"OPENAI_LIMITS_GATEWAY_RETRY_TEST": "60,1000"})
+    mocker.patch.object(http_transport, "retry_delay", lambda attempt, retry_after=None: 0)
+    unreachable = openai.APIConnectionError(request=httpx.Request("POST", "https://api.openai.com"))
+    openai_client = MagicMock()
+    openai_client.chat.completions.create = AsyncMock(side_effect=[unreachable, unreachable, unreachable, MagicMock()])
+
+    request = {"model": "gateway-retry-test", "messages": [{"role": "user", "content": "hi"}], "max_tokens": 200}
+    asyncio.run(openai_gateway.create(openai_client, **request))
+    state = openai_gateway._state("gateway-retry-test")
+    estimated = openai_gateway.estimate_tokens(request)
+    # Only the successful attempt is still held (less a little refill since).
+    assert state.requests.level == pytest.approx(59, abs=0.5)
+    assert state.tokens.level == pytest.approx(1000 - estimated, abs=20)
+
+
+def test_text_compactor_packs_salient_sentences_into_budget():
+    """Boilerplate and repeated lines go; the lead and title-relevant sentences are kept within the budget."""
+    from services import ai_service, text_compactor
+
+    lead = "The Navy awarded the frigate contract to Fincantieri on Tuesday. The deal is worth $5.5 billion."
+    text = "\n".join([
+        "Subscribe to our newsletter for daily updates",
+        lead,
+        "Share this article on social media",
+        "Analysts said the frigate program had faced years of delays. Weather in Washington was mild.",
+        lead,
+        "Unrelated filler about local sports scores and traffic downtown. " * 60,
+    ])
+    compacted = text_compactor.compact(text, 60, "Navy frigate contract awarded")
+    assert text_compactor.count_tokens(compacted) <= 60
+    assert compacted.startswith(lead) and compacted.count("Fincantieri") == 1
+    assert "frigate program had faced years of delays" in compacted
+    assert "Subscribe" not in compacted and "Share this" not in compacted and "sports scores" not in compacted
+
+    # Text within budget is only cleaned, and prompts carry the compacted text.
+    assert text_compactor.compact(lead, 60) == lead
+    prompt = ai_service._summary_prompt("Navy frigate contract", text, "http://example.com/frigate")
+    assert "Subscribe to our newsletter" not in prompt and lead in prompt
+
+
+def test_text_compactor_keeps_story_lines_that_mention_boilerplate_words():
+    """Only lines that open with boilerplate are dropped, and compact() never empties an article."""
+    from services import text_compactor
+
+    story = [
+        "Lockheed Martin said the backlog in F-35 orders grew to a record this quarter.",
+        "The company's bond offering was oversubscribed by pension funds and insurers.",
+        "The Army will share this data with allied forces under the new agreement.",
+        "Officials said the program would sign up two more suppliers next year.",
+        "Analysts expect deliveries to resume once the software upgrade is certified.",
+    ]
+    text = "\n".join(["Sign up for our daily defense newsletter", *story, "© 2024 Defense News. All rights reserved."])
+    assert text_compactor.compact(text, 3000) == "\n".join(story)
+    # Nothing survives cleaning (all short lines): the raw lines are kept rather than an empty string.
+    assert text_compactor.compact("Deliveries resume\nLockheed confirms", 3000) == "Deliveries resume\nLockheed confirms"
+
+
+def test_summarize_stream_relays_deltas_and_saves_result(client, mocker):
+    """/summarize/stream sends status, delta and done events and saves the article like /summarize."""
+    import json
+    from types import SimpleNamespace
+    from unittest.mock import AsyncMock, MagicMock
+    from services import ai_service
+
+    pieces = ["HEADLINE: Frigates", " Ahoy\nSUMMARY_BODY: 🎯 **Frigates Ahoy**", " Body."]
+
+    async def chunks():
+        for piece in pieces:
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=piece))], usage=None)
+        yield SimpleNamespace(choices=[], usage=SimpleNamespace(total_tokens=321))
+
+    openai_client = MagicMock()
+    openai_client.chat.completions.create = AsyncMock(side_effect=lambda **kw: chunks())
+    mocker.patch.dict(os.environ, {"OPENAI_API_KEY": "test-key"})
+    mocker.patch.object(ai_service, "get_async_openai_client", return_value=openai_client)
+    mocker.patch("services.web_scraper.fetch_article_async",
+                 return_value={"text": "Frigate body.", "title": None, "tier": "heuristic"})
+    article_id = client.post("/articles", json={"url": "http://example.com/stream", "title": "Frigate"}).json()["id"]
+
+    response = client.post("/summarize/stream", json={"article_id": article_id})
+    assert response.status_code == 200 and response.headers["content-type"].startswith("text/event-stream")
+    events = [(block.split("\n")[0][len("event: "):], json.loads(block.split("\n")[1][len("data: "):]))
+              for block in response.text.strip().split("\n\n")]
+    assert [e for e, _ in events] == ["status", "status", "delta", "delta", "delta", "done"]
+    assert "".join(d["text"] for e, d in events if e == "delta") == "".join(pieces)
+    done = events[-1][1]
+    assert done["status"] == "summarized" and done["title"] == "Frigates Ahoy" and done["summary"].endswith("Body.")
+    assert client.get(f"/articles/{article_id}").json()["summary"] == done["summary"]
+    assert openai_client.chat.completions.create.call_args.kwargs["stream"] is True
+
+    assert client.post("/summarize/stream", json={"article_id": 9999}).status_code == 404
+    response = client.post("/generate-teleprompter/stream", json={})
+    assert response.text.startswith("event: error")
+
+
+def test_http_transport_retries_and_reuses_connections(client, mocker):
+    """Shared sessions retry a 503 after Retry-After and keep one connection alive across calls."""
+    import asyncio
+    import threading
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+    from services import http_transport
+
+    hits = []
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            hits.append(self.path)
+            if hits.count(self.path) == 1:
+                self.send_response(503)
+                self.send_header("Retry-After", "0")
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            self.send_response(200)
+            self.send_header("Content-Length", "2")
+            self.end_headers()
+            self.wfile.write(b"ok")
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    mocker.patch.object(http_transport, "_metrics", {})
+    try:
+        session = http_transport.get_session("test-sync")
+        assert [session.get(f"{base}/a").text, session.get(f"{base}/b").text] == ["ok", "ok"]
+
+        async def fetch():
+            response = await http_transport.request_async("test-async", "GET", f"{base}/c")
+            await http_transport.aclose()
+            return response
+        assert asyncio.run(fetch()).text == "ok"
+    finally:
+        server.shutdown()
+
+    assert hits == ["/a", "/a", "/b", "/b", "/c", "/c"]
+    stats = client.get("/stats/http-transport").json()["services"]
+    assert stats["test-sync"]["requests"] == 2 and stats["test-sync"]["retries"] == 2
+    assert stats["test-sync"]["connections_opened"] == 1
+    assert stats["test-async"]["retries"] == 1 and stats["test-async"]["connections_opened"] == 1
+
+
+def test_http_transport_retries_connect_errors_in_one_layer(client, mocker):
+    """A dead host costs MAX_RETRIES + 1 connection attempts, not retries stacked in the transport too."""
+    import asyncio
+    import socket
+    import httpx
+    from services import http_transport
+
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]  # closed again, so connections are refused
+
+    attempts = []
+    async def trace(event_name, info):
+        if event_name == "connection.connect_tcp.started":
+            attempts.append(event_name)
+    mocker.patch.object(http_transport, "_async_trace", lambda service: trace)
+    mocker.patch.object(http_transport, "retry_delay", lambda attempt, retry_after=None: 0)
+
+    async def fetch():
+        try:
+            await http_transport.request_async("test-dead", "GET", f"http://127.0.0.1:{port}/")
+        finally:
+            await http_transport.aclose()
+    with pytest.raises(httpx.ConnectError):
+        asyncio.run(fetch())
+    assert len(attempts) == http_transport.MAX_RETRIES + 1
+
+def test_reads_are_served_while_summarize_is_in_flight(client, mocker):
+    """A slow scrape awaits on the event loop instead of blocking reads."""
+    import asyncio
+    import threading
+    import time
+
+    article_id = client.post("/articles", json={"url": "http://example.com/slow", "title": "Slow"}).json()["id"]
+
+    async def slow_fetch(url):
+        await asyncio.sleep(0.5)
+        return {"text": "Slow body.", "title": None, "tier": "heuristic"}
+
+    mocker.patch("services.web_scraper.fetch_article_async", side_effect=slow_fetch)
+    mocker.patch("services.ai_service.get_ai_summary_async", return_value={"title": "T", "summary_body": "S"})
+
+    result = {}
+    worker = threading.Thread(target=lambda: result.setdefault("response", client.post("/summarize", json={"article_id": article_id})))
+    worker.start()
+    time.sleep(0.1)
+    started = time.perf_counter()
+    assert client.get("/health").status_code == 200
+    assert time.perf_counter() - started < 0.3
+    worker.join()
+    assert result["response"].status_code == 200
+    assert result["response"].json()["original_content"] == "Slow body."
+
+
+@pytest.mark.parametrize("has_returning", [True, False])
+def test_write_paths_return_written_rows(client, monkeypatch, has_returning):
+    """Writes return the stored row with or without RETURNING support."""
+    monkeypatch.setattr(db_handler, "HAS_RETURNING", has_returning)
+
+    article = client.post("/articles", json={"url": "http://example.com/ret", "title": "Returned"}).json()
+    assert article["title"] == "Returned" and article["status"] == "pending"
+
+    updated = client.patch(f"/articles/{article['id']}", json={"title": "Edited"}).json()
+    assert updated["title"] == "Edited"
+    assert db_handler.update_article(article["id"], original_content="Body")["original_content"] == "Body"
+    assert client.patch("/articles/999999", json={"title": "Missing"}).status_code == 404
+
+    snapshot = client.post("/snapshots", json={"url": "http://example.com/ret-snap", "title": "Snap"}).json()
+    assert client.patch(f"/snapshots/{snapshot['id']}", json={"highlight": "Hi"}).json()["highlight"] == "Hi"